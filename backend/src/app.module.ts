@@ -30,6 +30,9 @@ import {
   Settlement,
   RentalIssue,
   Notification,
+  ImageVariant,
+  ImageMetadata,
+  ProductImage,
 } from './entities';
 
 @Module({
@@ -55,6 +58,9 @@ import {
         Settlement,
         RentalIssue,
         Notification,
+        ImageVariant,
+        ImageMetadata,
+        ProductImage,
       ],
       synchronize: true,
       logging: false,
@@ -0,0 +1,29 @@
+import { Entity, PrimaryColumn, Column, CreateDateColumn } from 'typeorm';
+
+// 상품 이미지 메타데이터 (scripts/image_metadata.py, pdf_ingest.py가 기록)
+@Entity('image_metadata')
+export class ImageMetadata {
+  @PrimaryColumn({ type: 'varchar' })
+  sourcePath: string; // uploads 기준 원본 경로 (예: products/3f/2a/3f2a...jpeg)
+
+  @Column({ type: 'varchar' })
+  contentHash: string;
+
+  @Column({ type: 'integer' })
+  width: number;
+
+  @Column({ type: 'integer' })
+  height: number;
+
+  @Column({ type: 'integer' })
+  bytes: number;
+
+  @Column({ type: 'text' })
+  placeholder: string; // 흐린 미리보기 data URI (16px 이하)
+
+  @Column({ type: 'varchar' })
+  dominantColor: string; // #rrggbb
+
+  @CreateDateColumn()
+  createdAt: Date;
+}
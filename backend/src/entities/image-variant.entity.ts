@@ -0,0 +1,29 @@
+import { Entity, PrimaryColumn, Column, CreateDateColumn } from 'typeorm';
+
+// 상품 이미지의 반응형 변형 (scripts/image_variants.py가 생성)
+@Entity('image_variants')
+export class ImageVariant {
+  @PrimaryColumn({ type: 'varchar' })
+  sourcePath: string; // uploads 기준 원본 경로 (예: products/3f/3f2a...jpeg)
+
+  @PrimaryColumn({ type: 'integer' })
+  width: number;
+
+  @PrimaryColumn({ type: 'varchar' })
+  format: string; // webp | jpeg
+
+  @Column({ type: 'varchar' })
+  contentHash: string;
+
+  @Column({ type: 'integer' })
+  height: number;
+
+  @Column({ type: 'varchar' })
+  url: string;
+
+  @Column({ type: 'integer' })
+  bytes: number;
+
+  @CreateDateColumn()
+  createdAt: Date;
+}
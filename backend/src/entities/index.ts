@@ -12,3 +12,6 @@ export * from './payment.entity';
 export * from './settlement.entity';
 export * from './rental-issue.entity';
 export * from './notification.entity';
+export * from './image-variant.entity';
+export * from './image-metadata.entity';
+export * from './product-image.entity';
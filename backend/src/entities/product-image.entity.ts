@@ -0,0 +1,37 @@
+import { Entity, PrimaryColumn, Column, ManyToOne, JoinColumn } from 'typeorm';
+import { Product } from './product.entity';
+
+export enum ProductImageRole {
+  MAIN = 'main', // images (0번이 목록 대표 이미지)
+  DETAIL = 'detail', // detailImages
+}
+
+// 상품 이미지 (products.images / detailImages를 풀어 쓴 행, scripts/product_images.py가 채움)
+// 목록 조회는 기본 키(productId, role, position)로만 읽으므로 보조 인덱스는 두지 않는다
+@Entity('product_images')
+export class ProductImage {
+  @PrimaryColumn({ type: 'uuid' })
+  productId: string;
+
+  @ManyToOne(() => Product, { onDelete: 'CASCADE' })
+  @JoinColumn({ name: 'productId' })
+  product: Product;
+
+  @PrimaryColumn({ type: 'varchar' })
+  role: ProductImageRole;
+
+  @PrimaryColumn({ type: 'integer' })
+  position: number;
+
+  @Column({ type: 'varchar' })
+  url: string;
+
+  @Column({ type: 'varchar', nullable: true })
+  contentHash: string | null;
+
+  @Column({ type: 'integer', nullable: true })
+  width: number | null;
+
+  @Column({ type: 'integer', nullable: true })
+  height: number | null;
+}
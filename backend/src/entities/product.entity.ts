@@ -27,6 +27,10 @@ export enum ProductStatus {
 @Index(['supplierId']) // 공급자별 조회용 인덱스
 @Index(['status']) // 상태별 필터링용 인덱스
 @Index(['createdAt']) // 최신순 정렬용 인덱스
+@Index('IDX_products_sourceKey', ['sourceKey'], { unique: true }) // 시드 상품 자연 키 (upsert용)
+@Index('IDX_products_production_status', ['production', 'status']) // 작품별 목록용 인덱스
+@Index('IDX_products_production_character', ['production', 'character']) // 작품+캐릭터 조회용 인덱스
+@Index('IDX_products_production_scene', ['production', 'scene']) // 작품+장면 조회용 인덱스
 export class Product {
   @PrimaryGeneratedColumn('uuid')
   id: string;
@@ -66,6 +70,18 @@ export class Product {
   })
   status: ProductStatus;
 
+  @Column({ type: 'varchar', nullable: true })
+  sourceKey: string; // 시드 원본 자연 키 (뮤지컬|PDF|페이지|이미지 순번), 직접 등록 상품은 null
+
+  @Column({ type: 'varchar', nullable: true })
+  production: string | null; // 작품 (기준 이름, 예: 바람사)
+
+  @Column({ type: 'varchar', nullable: true })
+  character: string | null; // 캐릭터
+
+  @Column({ type: 'varchar', nullable: true })
+  scene: string | null; // 장면
+
   @ManyToMany(() => Tag, (tag) => tag.products)
   @JoinTable({
     name: 'product_tags',
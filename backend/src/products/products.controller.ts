@@ -15,10 +15,14 @@ import { RolesGuard } from '../auth/roles.guard';
 import { Roles } from '../auth/roles.decorator';
 import { UserRole } from '../entities/user.entity';
 import { ProductsService } from './products.service';
+import { SuggestService } from './suggest.service';
 
 @Controller('products')
 export class ProductsController {
-  constructor(private productsService: ProductsService) {}
+  constructor(
+    private productsService: ProductsService,
+    private suggestService: SuggestService,
+  ) {}
 
   @Get()
   async findAll() {
@@ -32,6 +36,9 @@ export class ProductsController {
     @Query('q') query?: string,
     @Query('categoryId') categoryId?: string,
     @Query('includeUnavailable') includeUnavailable?: string,
+    @Query('production') production?: string,
+    @Query('character') character?: string,
+    @Query('scene') scene?: string,
   ) {
     return this.productsService.search(
       startDate,
@@ -39,9 +46,16 @@ export class ProductsController {
       query,
       categoryId,
       includeUnavailable === 'true',
+      { production, character, scene },
     );
   }
 
+  // 검색창 자동완성 (접두어/초성, 메모리 색인)
+  @Get('suggest')
+  async suggest(@Query('q') query = '', @Query('limit') limit?: string) {
+    return this.suggestService.suggest(query, Number(limit) || 10);
+  }
+
   @Get(':id')
   async findOne(@Param('id') id: string) {
     return this.productsService.findOne(id);
@@ -2,21 +2,35 @@ import { Module } from '@nestjs/common';
 import { TypeOrmModule } from '@nestjs/typeorm';
 import { ProductsService } from './products.service';
 import { ProductsController } from './products.controller';
+import { SuggestService } from './suggest.service';
 import { Product } from '../entities/product.entity';
 import { ProductBlockedPeriod } from '../entities/product-blocked-period.entity';
 import { Asset } from '../entities/asset.entity';
 import { Category } from '../entities/category.entity';
 import { Tag } from '../entities/tag.entity';
 import { Rental } from '../entities/rental.entity';
+import { ImageVariant } from '../entities/image-variant.entity';
+import { ImageMetadata } from '../entities/image-metadata.entity';
+import { ProductImage } from '../entities/product-image.entity';
 import { AuthModule } from '../auth/auth.module';
 
 @Module({
   imports: [
-    TypeOrmModule.forFeature([Product, ProductBlockedPeriod, Asset, Category, Tag, Rental]),
+    TypeOrmModule.forFeature([
+      Product,
+      ProductBlockedPeriod,
+      Asset,
+      Category,
+      Tag,
+      Rental,
+      ImageVariant,
+      ImageMetadata,
+      ProductImage,
+    ]),
     AuthModule,
   ],
   controllers: [ProductsController],
-  providers: [ProductsService],
-  exports: [ProductsService],
+  providers: [ProductsService, SuggestService],
+  exports: [ProductsService, SuggestService],
 })
 export class ProductsModule {}
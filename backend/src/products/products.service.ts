@@ -1,4 +1,4 @@
-import { Injectable, NotFoundException, BadRequestException } from '@nestjs/common';
+import { Injectable, NotFoundException, BadRequestException, OnModuleInit } from '@nestjs/common';
 import { InjectRepository } from '@nestjs/typeorm';
 import { Repository, In, Not } from 'typeorm';
 import { Product, ProductStatus } from '../entities/product.entity';
@@ -6,9 +6,31 @@ import { ProductBlockedPeriod } from '../entities/product-blocked-period.entity'
 import { Asset, AssetStatus } from '../entities/asset.entity';
 import { Rental, RentalStatus } from '../entities/rental.entity';
 import { Tag } from '../entities/tag.entity';
+import { ImageVariant } from '../entities/image-variant.entity';
+import { ImageMetadata } from '../entities/image-metadata.entity';
+import { ProductImage, ProductImageRole } from '../entities/product-image.entity';
+import { SuggestService } from './suggest.service';
+import { SEARCH_TABLES, SEARCH_TRIGGERS, SEARCH_REBUILD_SQL } from './search-index';
+
+// 목록 조회 결과 (대표 이미지 행이 붙음)
+type ListedProduct = Product & { primaryImage?: ProductImage | null };
+
+// 검색 속성 필터 (작품은 기준 이름, scripts/product_attributes.py 참고)
+export type ProductAttributeFilter = { production?: string; character?: string; scene?: string };
+
+// 목록 조회에서 읽지 않는 긴 컬럼 (대표 이미지는 product_images에서)
+const LIST_EXCLUDED_COLUMNS = ['images', 'detailImages'];
+
+// 검색 색인 (scripts/search_index.py가 만드는 FTS5 trigram 색인, 트리거로 동기화 - 트리거는 시작할 때 확인)
+// trigram은 3글자 이상만 색인으로 찾으므로 짧은 검색어는 색인 테이블을 LIKE로 훑는다
+const SEARCH_MIN_MATCH_LENGTH = 3;
+const SEARCH_FROM = 'FROM "product_search" s JOIN "product_search_rows" r ON r."id" = s.rowid';
+const SEARCH_MATCH_SQL = `SELECT r."productId" AS "productId", s.rank AS "rank" ${SEARCH_FROM} WHERE s."product_search" MATCH :match`;
+const SEARCH_LIKE_SQL = `SELECT r."productId" AS "productId", NULL AS "rank" ${SEARCH_FROM}
+  WHERE s.title LIKE :like OR s.description LIKE :like OR s.tags LIKE :like OR s.category LIKE :like`;
 
 @Injectable()
-export class ProductsService {
+export class ProductsService implements OnModuleInit {
   constructor(
     @InjectRepository(Product)
     private productRepository: Repository<Product>,
@@ -20,29 +42,202 @@ export class ProductsService {
     private rentalRepository: Repository<Rental>,
     @InjectRepository(Tag)
     private tagRepository: Repository<Tag>,
+    @InjectRepository(ImageVariant)
+    private imageVariantRepository: Repository<ImageVariant>,
+    @InjectRepository(ImageMetadata)
+    private imageMetadataRepository: Repository<ImageMetadata>,
+    @InjectRepository(ProductImage)
+    private productImageRepository: Repository<ProductImage>,
+    private suggestService: SuggestService,
   ) {}
 
+  // 검색 색인과 동기화 트리거가 준비됐는지 (준비되면 다시 확인하지 않음)
+  private searchIndexReady: Promise<boolean> | null = null;
+
+  onModuleInit() {
+    this.searchIndexReady = this.ensureSearchIndex();
+  }
+
   async findAll() {
-    const products = await this.productRepository.find({
-      where: { status: ProductStatus.ACTIVE },
-      relations: ['category', 'tags', 'assets', 'supplier'],
-    });
+    const products = await this.listQuery().getMany();
+    await this.applyPrimaryImages(products);
+
+    // 이미지 반응형 변형과 메타데이터 (각각 한 번의 쿼리로 조회)
+    const variants = await this.getImageVariants(products);
+    const metadata = await this.getImageMetadata(products);
 
     // 각 상품의 대여 가능 수량 계산 (대략적인 계산)
     const productsWithAvailability = products.map((product) => ({
       ...product,
       availableCount: product.assets?.filter((a) => a.status === AssetStatus.AVAILABLE).length || 0,
+      imageVariants: this.pickByUrl(product.images, variants),
+      imageMetadata: this.pickByUrl(product.images, metadata),
     }));
 
     return productsWithAvailability;
   }
 
+  // 목록 조회 쿼리: images/detailImages 대신 대표 이미지 한 행만 조인 (product_images 기본 키로 조회)
+  private listQuery() {
+    const columns = this.productRepository.metadata.columns
+      .filter((column) => !LIST_EXCLUDED_COLUMNS.includes(column.propertyName))
+      .map((column) => `product.${column.propertyName}`);
+
+    return this.productRepository
+      .createQueryBuilder('product')
+      .select(columns)
+      .leftJoinAndMapOne(
+        'product.primaryImage',
+        ProductImage,
+        'primaryImage',
+        'primaryImage.productId = product.id AND primaryImage.role = :mainRole AND primaryImage.position = 0',
+        { mainRole: ProductImageRole.MAIN },
+      )
+      .leftJoinAndSelect('product.category', 'category')
+      .leftJoinAndSelect('product.tags', 'tags')
+      .leftJoinAndSelect('product.assets', 'assets')
+      .leftJoinAndSelect('product.supplier', 'supplier')
+      .where('product.status = :status', { status: ProductStatus.ACTIVE });
+  }
+
+  // 목록 상품의 images를 대표 이미지 하나로 (product_images를 아직 채우지 않은 상품은 images 컬럼에서)
+  private async applyPrimaryImages(products: ListedProduct[]) {
+    const missing = products.filter((product) => !product.primaryImage).map((product) => product.id);
+    const fallback = new Map<string, string[]>();
+    for (let i = 0; i < missing.length; i += 500) {
+      const rows = await this.productRepository.find({
+        select: { id: true, images: true },
+        where: { id: In(missing.slice(i, i + 500)) },
+      });
+      for (const row of rows) {
+        fallback.set(row.id, row.images || []);
+      }
+    }
+
+    for (const product of products) {
+      product.images = product.primaryImage
+        ? [product.primaryImage.url]
+        : (fallback.get(product.id) || []).slice(0, 1);
+    }
+  }
+
+  // 상품의 images/detailImages를 product_images 행으로 다시 기록 (크기/해시는 image_metadata에서)
+  private async syncImages(product: Product) {
+    const rows = [
+      ...(product.images || []).map((url, position) => ({ role: ProductImageRole.MAIN, position, url })),
+      ...(product.detailImages || []).map((url, position) => ({ role: ProductImageRole.DETAIL, position, url })),
+    ];
+    const paths = rows.map((row) => this.uploadPath(row.url)).filter((path): path is string => path !== null);
+    const metadata = paths.length
+      ? await this.imageMetadataRepository.find({ where: { sourcePath: In(paths) } })
+      : [];
+    const byPath = new Map(metadata.map((row) => [row.sourcePath, row]));
+
+    await this.productImageRepository.manager.transaction(async (manager) => {
+      await manager.delete(ProductImage, { productId: product.id });
+      if (rows.length === 0) return;
+      await manager.insert(
+        ProductImage,
+        rows.map((row) => {
+          const meta = byPath.get(this.uploadPath(row.url) ?? '');
+          return {
+            ...row,
+            productId: product.id,
+            contentHash: meta?.contentHash ?? null,
+            width: meta?.width ?? null,
+            height: meta?.height ?? null,
+          };
+        }),
+      );
+    });
+  }
+
+  // 업로드 URL -> uploads 기준 경로 (업로드 파일이 아니면 null)
+  private uploadPath(url: string) {
+    const index = url.indexOf('/uploads/');
+    return index === -1 ? null : url.slice(index + '/uploads/'.length).split('?')[0];
+  }
+
+  // 이미지 URL -> uploads 기준 경로별 URL 목록 (같은 파일을 여러 상품이 쓸 수 있음)
+  private imagePaths(products: Product[]) {
+    const urlsByPath = new Map<string, string[]>();
+    for (const product of products) {
+      for (const url of product.images || []) {
+        const path = this.uploadPath(url);
+        if (path === null) continue;
+        urlsByPath.set(path, [...(urlsByPath.get(path) || []), url]);
+      }
+    }
+    return urlsByPath;
+  }
+
+  // 상품 이미지 URL 중 조회 결과가 있는 것만 { url: 값 } 객체로
+  private pickByUrl<T>(urls: string[] | undefined, byUrl: Map<string, T>) {
+    return Object.fromEntries((urls || []).filter((url) => byUrl.has(url)).map((url) => [url, byUrl.get(url)]));
+  }
+
+  // 이미지 URL -> 크기/미리보기/대표 색 (image_metadata 테이블)
+  private async getImageMetadata(products: Product[]) {
+    const urlsByPath = this.imagePaths(products);
+    const result = new Map<
+      string,
+      { width: number; height: number; bytes: number; placeholder: string; dominantColor: string }
+    >();
+    if (urlsByPath.size === 0) {
+      return result;
+    }
+
+    const rows = await this.imageMetadataRepository.find({
+      where: { sourcePath: In([...urlsByPath.keys()]) },
+    });
+
+    for (const row of rows) {
+      const meta = {
+        width: row.width,
+        height: row.height,
+        bytes: row.bytes,
+        placeholder: row.placeholder,
+        dominantColor: row.dominantColor,
+      };
+      for (const url of urlsByPath.get(row.sourcePath) || []) {
+        result.set(url, meta);
+      }
+    }
+
+    return result;
+  }
+
+  // 이미지 URL -> 변형 목록 (scripts/image_variants.py가 생성한 image_variants 테이블)
+  private async getImageVariants(products: Product[]) {
+    const urlsByPath = this.imagePaths(products);
+
+    const result = new Map<string, { width: number; height: number; format: string; url: string }[]>();
+    if (urlsByPath.size === 0) {
+      return result;
+    }
+
+    const rows = await this.imageVariantRepository.find({
+      where: { sourcePath: In([...urlsByPath.keys()]) },
+      order: { width: 'ASC' },
+    });
+
+    for (const row of rows) {
+      const variant = { width: row.width, height: row.height, format: row.format, url: row.url };
+      for (const url of urlsByPath.get(row.sourcePath) || []) {
+        result.set(url, [...(result.get(url) || []), variant]);
+      }
+    }
+
+    return result;
+  }
+
   async search(
     startDate?: string,
     endDate?: string,
     query?: string,
     categoryId?: string,
     includeUnavailable = false,
+    attributes: ProductAttributeFilter = {},
   ) {
     // 날짜 유효성 검증
     if (startDate || endDate) {
@@ -77,28 +272,48 @@ export class ProductsService {
       }
     }
 
-    const queryBuilder = this.productRepository
-      .createQueryBuilder('product')
-      .leftJoinAndSelect('product.category', 'category')
-      .leftJoinAndSelect('product.tags', 'tags')
-      .leftJoinAndSelect('product.assets', 'assets')
-      .leftJoinAndSelect('product.supplier', 'supplier')
-      .where('product.status = :status', { status: ProductStatus.ACTIVE });
+    const queryBuilder = this.listQuery();
 
     // 카테고리 필터
     if (categoryId) {
       queryBuilder.andWhere('product.categoryId = :categoryId', { categoryId });
     }
 
-    // 검색어 (상품명, 설명, 태그, 카테고리)
-    if (query) {
-      queryBuilder.andWhere(
-        '(product.title LIKE :query OR product.description LIKE :query OR tags.name LIKE :query OR category.name LIKE :query)',
-        { query: `%${query}%` },
-      );
+    // 작품/캐릭터/장면 필터 (production 복합 인덱스)
+    if (attributes.production) {
+      queryBuilder.andWhere('product.production = :production', { production: attributes.production });
+    }
+    if (attributes.character) {
+      queryBuilder.andWhere('product.character = :character', { character: attributes.character });
+    }
+    if (attributes.scene) {
+      queryBuilder.andWhere('product.scene = :scene', { scene: attributes.scene });
+    }
+
+    // 검색어 (상품명, 설명, 태그, 카테고리) - 색인이 있으면 색인에서 찾은 상품만, BM25 순위순
+    let ranks: Map<string, number | null> | null = null;
+    if (query?.trim()) {
+      const search = await this.searchIndexQuery(query);
+      if (search) {
+        ranks = await this.searchRanks(search.sql, search.parameters);
+        if (ranks.size === 0) {
+          return [];
+        }
+        // 색인 서브쿼리를 조인하지 않고 IN으로 거른다 (조인하면 플래너가 전체 상품을 바깥 루프로 고를 수 있음)
+        queryBuilder.andWhere(`product.id IN (SELECT "productId" FROM (${search.sql}))`, search.parameters);
+      } else {
+        queryBuilder.andWhere(
+          '(product.title LIKE :query OR product.description LIKE :query OR tags.name LIKE :query OR category.name LIKE :query)',
+          { query: `%${query}%` },
+        );
+      }
     }
 
     const products = await queryBuilder.getMany();
+    await this.applyPrimaryImages(products);
+    if (ranks) {
+      products.sort((a, b) => (ranks.get(a.id) ?? 0) - (ranks.get(b.id) ?? 0));
+    }
 
     // 날짜가 제공된 경우에만 대여 가능 수량 계산
     if (startDate && endDate) {
@@ -134,6 +349,68 @@ export class ProductsService {
     }
   }
 
+  // 검색 색인 확인 - 테이블이 없으면 false (예전 LIKE 검색)
+  // TypeORM synchronize가 테이블을 다시 만들며 지운 트리거는 다시 만들고 색인을 새로 채운다
+  private async ensureSearchIndex() {
+    const triggers = Object.keys(SEARCH_TRIGGERS);
+    try {
+      const rows: { name: string }[] = await this.productRepository.query(
+        `SELECT name FROM sqlite_master WHERE (type = 'table' AND name IN (${SEARCH_TABLES.map(() => '?').join(', ')}))
+          OR (type = 'trigger' AND name IN (${triggers.map(() => '?').join(', ')}))`,
+        [...SEARCH_TABLES, ...triggers],
+      );
+      const present = new Set(rows.map((row) => row.name));
+      if (!SEARCH_TABLES.every((name) => present.has(name))) return false;
+
+      const missing = triggers.filter((name) => !present.has(name));
+      if (missing.length === 0) return true;
+
+      await this.productRepository.manager.transaction(async (manager) => {
+        for (const [name, [event, body]] of Object.entries(SEARCH_TRIGGERS)) {
+          await manager.query(`DROP TRIGGER IF EXISTS "${name}"`);
+          await manager.query(`CREATE TRIGGER "${name}" ${event} BEGIN ${body} END`);
+        }
+        for (const sql of SEARCH_REBUILD_SQL) {
+          await manager.query(sql);
+        }
+      });
+      console.log(`검색 색인 트리거 ${missing.length}개를 다시 만들고 색인을 새로 채웠습니다`);
+      return true;
+    } catch (error) {
+      console.warn(`검색 색인을 확인하지 못했습니다 (LIKE 검색 사용): ${error.message}`);
+      return false;
+    }
+  }
+
+  // 검색어 -> 색인 조회 SQL (색인이 없으면 null, 예전 LIKE 검색으로)
+  private async searchIndexQuery(query: string) {
+    this.searchIndexReady ??= this.ensureSearchIndex();
+    if (!(await this.searchIndexReady)) {
+      // 나중에 scripts/search_index.py로 색인을 만들 수 있으므로 다음 검색에서 다시 확인
+      this.searchIndexReady = null;
+      return null;
+    }
+
+    // 색인과 같은 NFC로 (macOS 등에서 자모가 분리된 입력)
+    const term = query.trim().normalize('NFC');
+    if (term.length >= SEARCH_MIN_MATCH_LENGTH) {
+      // 검색어 전체를 한 구절로 (예전 LIKE '%검색어%'와 같은 의미)
+      return { sql: SEARCH_MATCH_SQL, parameters: { match: `"${term.replace(/"/g, '""')}"` } };
+    }
+    return { sql: SEARCH_LIKE_SQL, parameters: { like: `%${term}%` } };
+  }
+
+  // 색인에서 찾은 상품 ID -> 순위 (짧은 검색어는 순위 없음)
+  private async searchRanks(sql: string, parameters: Record<string, string>) {
+    const [escaped, values] = this.productRepository.manager.connection.driver.escapeQueryWithParameters(
+      sql,
+      parameters,
+      {},
+    );
+    const rows: { productId: string; rank: number | null }[] = await this.productRepository.query(escaped, values);
+    return new Map(rows.map((row) => [row.productId, row.rank]));
+  }
+
   async getAvailableAssetCount(
     productId: string,
     startDate: string,
@@ -183,10 +460,12 @@ export class ProductsService {
 
     // availableCount 계산
     const availableCount = product.assets?.filter((a) => a.status === AssetStatus.AVAILABLE).length || 0;
+    const metadata = await this.getImageMetadata([product]);
 
     return {
       ...product,
       availableCount,
+      imageMetadata: this.pickByUrl(product.images, metadata),
     };
   }
 
@@ -254,6 +533,8 @@ export class ProductsService {
 
     // Save product first
     const savedProduct = (await this.productRepository.save(product)) as unknown as Product;
+    await this.syncImages(savedProduct);
+    await this.suggestService.refreshProduct(savedProduct.id);
 
     // If tagIds provided, fetch and attach tags
     if (tagIds && tagIds.length > 0) {
@@ -273,6 +554,17 @@ export class ProductsService {
     // Update regular columns
     await this.productRepository.update(id, data);
 
+    // 자동완성 색인 (제목/작품/캐릭터/상태)
+    await this.suggestService.refreshProduct(id);
+
+    // 이미지가 바뀌었으면 product_images도 다시 기록
+    if (data.images !== undefined || data.detailImages !== undefined) {
+      const updated = await this.productRepository.findOneBy({ id });
+      if (updated) {
+        await this.syncImages(updated);
+      }
+    }
+
     // If tagIds provided, fetch and attach tags
     if (tagIds && tagIds.length > 0) {
       const product = await this.productRepository.findOne({
@@ -294,6 +586,7 @@ export class ProductsService {
 
   async delete(id: string) {
     await this.productRepository.delete(id);
+    this.suggestService.removeProduct(id);
   }
 
   // Blocked Period Management
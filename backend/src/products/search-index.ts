@@ -0,0 +1,70 @@
+// 상품 검색 색인(FTS5) 동기화 트리거 - scripts/search_index.py의 TRIGGERS와 같은 정의 (바꾸면 함께 바꿀 것)
+// TypeORM synchronize가 products/product_tags/tags/categories를 다시 만들면 테이블에 붙은 트리거가 함께 사라지므로
+// ProductsService가 시작할 때 확인해 빠진 트리거를 다시 만들고, 그 사이 놓친 변경이 없도록 색인을 새로 채운다
+
+export const SEARCH_TABLES = ['product_search', 'product_search_rows'];
+
+// 상품 p의 색인 행 (태그는 공백으로 이어 붙임)
+const DOCUMENT = `
+    SELECT r."id", p."title", p."description",
+        (SELECT group_concat(t."name", ' ') FROM "product_tags" pt JOIN "tags" t ON t."id" = pt."tagId"
+         WHERE pt."productId" = p."id"),
+        (SELECT c."name" FROM "categories" c WHERE c."id" = p."categoryId")
+    FROM "products" p JOIN "product_search_rows" r ON r."productId" = p."id"
+`;
+
+// where(상품 p 조건)에 해당하는 상품들의 색인 행을 다시 쓰는 트리거 본문
+function refreshSql(where: string) {
+  return `
+        INSERT OR IGNORE INTO "product_search_rows" ("productId") SELECT p."id" FROM "products" p WHERE ${where};
+        DELETE FROM "product_search" WHERE rowid IN (
+            SELECT r."id" FROM "product_search_rows" r JOIN "products" p ON p."id" = r."productId" WHERE ${where}
+        );
+        INSERT INTO "product_search" (rowid, title, description, tags, category) ${DOCUMENT} WHERE ${where};
+    `;
+}
+
+// 트리거 이름 -> [이벤트, 본문]
+export const SEARCH_TRIGGERS: Record<string, [string, string]> = {
+  TRG_product_search_insert: ['AFTER INSERT ON "products"', refreshSql('p."id" = new."id"')],
+  TRG_product_search_update: [
+    'AFTER UPDATE OF "title", "description", "categoryId" ON "products"',
+    refreshSql('p."id" = new."id"'),
+  ],
+  TRG_product_search_delete: [
+    'AFTER DELETE ON "products"',
+    `
+        DELETE FROM "product_search" WHERE rowid = (
+            SELECT "id" FROM "product_search_rows" WHERE "productId" = old."id"
+        );
+        DELETE FROM "product_search_rows" WHERE "productId" = old."id";
+    `,
+  ],
+  TRG_product_search_tag_insert: ['AFTER INSERT ON "product_tags"', refreshSql('p."id" = new."productId"')],
+  TRG_product_search_tag_delete: ['AFTER DELETE ON "product_tags"', refreshSql('p."id" = old."productId"')],
+  TRG_product_search_tag_rename: [
+    'AFTER UPDATE OF "name" ON "tags"',
+    refreshSql('p."id" IN (SELECT "productId" FROM "product_tags" WHERE "tagId" = new."id")'),
+  ],
+  TRG_product_search_category_rename: [
+    'AFTER UPDATE OF "name" ON "categories"',
+    refreshSql('p."categoryId" = new."id"'),
+  ],
+};
+
+// 트리거를 다시 만든 뒤 전체 색인 새로 채우기 (scripts/search_index.py rebuild()와 같은 순서)
+export const SEARCH_REBUILD_SQL = [
+  'DELETE FROM "product_search"',
+  'DELETE FROM "product_search_rows"',
+  'INSERT INTO "product_search_rows" ("productId") SELECT "id" FROM "products" ORDER BY "id"',
+  `INSERT INTO "product_search" (rowid, title, description, tags, category)
+    SELECT r."id", p."title", p."description", t."names", c."name"
+    FROM "products" p
+    JOIN "product_search_rows" r ON r."productId" = p."id"
+    LEFT JOIN "categories" c ON c."id" = p."categoryId"
+    LEFT JOIN (
+      SELECT pt."productId", group_concat(t."name", ' ') AS "names"
+      FROM "product_tags" pt JOIN "tags" t ON t."id" = pt."tagId"
+      GROUP BY pt."productId"
+    ) t ON t."productId" = p."id"`,
+];
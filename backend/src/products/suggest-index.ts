@@ -0,0 +1,268 @@
+// 검색어 자동완성 색인 (접두어 + 한글 초성)
+// 항목(상품 제목, 작품/캐릭터 이름, 태그)의 키를 정렬된 배열 두 개(원문 키, 초성 키)에 두고 이진 탐색한다
+// 상품 제목은 단어 시작 위치마다 키를 두어 "드레" -> "[바람사] 스칼렛 - 초록 드레스"도 찾는다
+// 이름(작품/캐릭터/태그)은 범위 전체를 상품 수로 순위를 매기고, 상품 제목은 남은 자리만큼만 앞에서부터 채운다
+
+export enum SuggestKind {
+  PRODUCTION = 'production',
+  CHARACTER = 'character',
+  TAG = 'tag',
+  PRODUCT = 'product',
+}
+
+export interface Suggestion {
+  text: string;
+  kind: SuggestKind;
+  count: number; // 이 항목을 가진 상품 수 (정렬용)
+}
+
+// 원본(상품/태그) 하나가 넣는 항목
+export interface SuggestEntry {
+  text: string;
+  kind: SuggestKind;
+  keys?: string[]; // 찾을 표기 (기본: text)
+  wordStarts?: boolean; // text의 단어 시작 위치마다 키 (상품 제목)
+  weight?: number; // count에 더할 값 (기본: 1)
+}
+
+interface Term extends Suggestion {
+  id: string;
+  refs: number; // 이 항목을 넣은 원본 수 (0이 되면 색인에서 제거)
+  keys: SuggestKey[];
+  tier: KeyTier;
+}
+
+interface SuggestKey {
+  key: string; // 정규화한 표기 (공백/문장 부호 제거, 소문자)
+  cho: string; // key의 한글 음절을 초성으로 바꾼 것
+  term: Term;
+}
+
+interface KeyTier {
+  byKey: SuggestKey[];
+  byCho: SuggestKey[];
+}
+
+const HANGUL_FIRST = 0xac00;
+const HANGUL_LAST = 0xd7a3;
+const SYLLABLES_PER_CHOSEONG = 588; // 중성 21 x 종성 28
+const SYLLABLES_PER_VOWEL = 28;
+const CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ';
+
+// 키에서 빼는 문자 (공백, 제목 태그 괄호, 문장 부호)
+const SEPARATORS = /[\s[\]()\-_.,·:'"!?/]+/g;
+
+// 한 번의 조회에서 훑는 키 수 상한 (한 글자 검색어처럼 범위가 넓을 때)
+const MAX_SCAN = 5000;
+
+const KIND_ORDER: Record<SuggestKind, number> = {
+  [SuggestKind.PRODUCTION]: 0,
+  [SuggestKind.CHARACTER]: 1,
+  [SuggestKind.TAG]: 2,
+  [SuggestKind.PRODUCT]: 3,
+};
+
+export function normalizeKey(text: string) {
+  return text.normalize('NFC').toLowerCase().replace(SEPARATORS, '');
+}
+
+function isSyllable(code: number) {
+  return code >= HANGUL_FIRST && code <= HANGUL_LAST;
+}
+
+function choseongIndex(ch: string) {
+  return CHOSEONG.indexOf(ch);
+}
+
+// 음절 -> 초성 (음절이 아니면 그대로)
+function choseongOf(ch: string) {
+  const code = ch.charCodeAt(0);
+  return isSyllable(code) ? CHOSEONG[Math.floor((code - HANGUL_FIRST) / SYLLABLES_PER_CHOSEONG)] : ch;
+}
+
+export function choseongKey(key: string) {
+  let result = '';
+  for (const ch of key) {
+    result += choseongOf(ch);
+  }
+  return result;
+}
+
+// 제목의 단어 시작 위치마다 그 뒤 전체를 [키, 초성 키]로 (전체 키의 slice라 문자열을 새로 만들지 않음)
+function wordStartKeys(text: string): [string, string][] {
+  const key = normalizeKey(text);
+  const cho = choseongKey(key);
+  const keys: [string, string][] = [];
+  let offset = 0;
+  for (const word of text.split(SEPARATORS)) {
+    const length = normalizeKey(word).length;
+    if (length === 0) continue;
+    keys.push([key.slice(offset), cho.slice(offset)]);
+    offset += length;
+  }
+  return keys;
+}
+
+// 입력 중인 마지막 글자가 덮는 문자 범위 [from, to)
+// 초성(ㅅ)은 그 초성의 모든 음절, 받침 없는 음절(스)은 받침을 더한 음절까지 (입력 중 "스칼레" -> "스칼렛")
+function lastCharRange(ch: string): [number, number] {
+  const code = ch.charCodeAt(0);
+  const index = choseongIndex(ch);
+  if (index !== -1) {
+    const from = HANGUL_FIRST + index * SYLLABLES_PER_CHOSEONG;
+    return [from, from + SYLLABLES_PER_CHOSEONG];
+  }
+  if (isSyllable(code) && (code - HANGUL_FIRST) % SYLLABLES_PER_VOWEL === 0) {
+    return [code, code + SYLLABLES_PER_VOWEL];
+  }
+  return [code, code + 1];
+}
+
+function lowerBound(list: SuggestKey[], field: 'key' | 'cho', value: string) {
+  let lo = 0;
+  let hi = list.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (list[mid][field] < value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function compareKeys(field: 'key' | 'cho') {
+  return (a: SuggestKey, b: SuggestKey) => (a[field] < b[field] ? -1 : a[field] > b[field] ? 1 : 0);
+}
+
+export class SuggestIndex {
+  private terms = new Map<string, Term>();
+  private sources = new Map<string, [Term, number][]>(); // 원본 -> (항목, 더한 count)
+  private names: KeyTier = { byKey: [], byCho: [] }; // 작품/캐릭터/태그
+  private titles: KeyTier = { byKey: [], byCho: [] }; // 상품 제목
+  private loading = false;
+
+  get size() {
+    return this.terms.size;
+  }
+
+  // 전체를 한 번에 채우기 (정렬은 마지막에 한 번)
+  load(sources: Iterable<[string, SuggestEntry[]]>) {
+    this.loading = true;
+    for (const [source, entries] of sources) {
+      this.set(source, entries);
+    }
+    this.loading = false;
+    for (const tier of [this.names, this.titles]) {
+      tier.byKey.sort(compareKeys('key'));
+      tier.byCho.sort(compareKeys('cho'));
+    }
+  }
+
+  // 원본 하나의 항목을 바꿈 (빈 목록이면 원본 제거)
+  set(source: string, entries: SuggestEntry[]) {
+    for (const [term, weight] of this.sources.get(source) || []) {
+      this.release(term, weight);
+    }
+    const terms = entries
+      .filter((entry) => entry.text?.trim())
+      .map((entry): [Term, number] => [this.retain(entry), entry.weight ?? 1]);
+    if (terms.length) this.sources.set(source, terms);
+    else this.sources.delete(source);
+  }
+
+  suggest(query: string, limit = 10): Suggestion[] {
+    const q = normalizeKey(query);
+    if (!q) return [];
+
+    const names = [...this.scan(this.names, q, MAX_SCAN)]
+      .sort((a, b) => b.count - a.count || KIND_ORDER[a.kind] - KIND_ORDER[b.kind] || a.text.length - b.text.length)
+      .slice(0, limit);
+    const titles = names.length < limit ? [...this.scan(this.titles, q, limit - names.length)] : [];
+    return [...names, ...titles].map(({ text, kind, count }) => ({ text, kind, count }));
+  }
+
+  // 검색어에 맞는 항목을 키 순서로 최대 max개
+  private scan(tier: KeyTier, q: string, max: number) {
+    const head = q.slice(0, -1);
+    const [from, to] = lastCharRange(q[q.length - 1]);
+    const found = new Set<Term>();
+    if (![...head].some((ch) => choseongIndex(ch) !== -1)) {
+      // 마지막 글자만 입력 중 - 원문 키에서 연속 범위
+      const lo = lowerBound(tier.byKey, 'key', head + String.fromCharCode(from));
+      const hi = lowerBound(tier.byKey, 'key', head + String.fromCharCode(to));
+      for (let i = lo; i < hi && i - lo < MAX_SCAN && found.size < max; i++) {
+        found.add(tier.byKey[i].term);
+      }
+    } else {
+      // 초성이 섞인 검색어 (ㅂㄹㅅ, 스ㅋㄹ) - 초성 키 범위에서 원문 글자를 다시 확인
+      const prefix = choseongKey(q);
+      const lo = lowerBound(tier.byCho, 'cho', prefix);
+      const hi = lowerBound(tier.byCho, 'cho', prefix + '\uffff');
+      for (let i = lo; i < hi && i - lo < MAX_SCAN && found.size < max; i++) {
+        const item = tier.byCho[i];
+        if (!found.has(item.term) && this.matches(item.key, q, from, to)) found.add(item.term);
+      }
+    }
+    return found;
+  }
+
+  // 초성 키가 같은 키 중 검색어의 음절/마지막 글자 범위까지 맞는지
+  private matches(key: string, q: string, from: number, to: number) {
+    const last = q.length - 1;
+    for (let i = 0; i < last; i++) {
+      if (q[i] !== key[i] && choseongIndex(q[i]) === -1) return false;
+    }
+    const code = key.charCodeAt(last);
+    return (code >= from && code < to) || key[last] === q[last];
+  }
+
+  private retain(entry: SuggestEntry) {
+    const id = `${entry.kind}:${entry.text}`;
+    let term = this.terms.get(id);
+    if (!term) {
+      const tier = entry.kind === SuggestKind.PRODUCT ? this.titles : this.names;
+      term = { id, text: entry.text, kind: entry.kind, count: 0, refs: 0, keys: [], tier };
+      const keys = entry.wordStarts
+        ? wordStartKeys(entry.text)
+        : [...new Set((entry.keys || [entry.text]).map(normalizeKey))].map((key): [string, string] => [
+            key,
+            choseongKey(key),
+          ]);
+      for (const [key, cho] of keys) {
+        if (!key) continue;
+        const item = { key, cho, term };
+        term.keys.push(item);
+        this.insert(tier.byKey, 'key', item);
+        this.insert(tier.byCho, 'cho', item);
+      }
+      this.terms.set(id, term);
+    }
+    term.refs += 1;
+    term.count += entry.weight ?? 1;
+    return term;
+  }
+
+  private release(term: Term, weight: number) {
+    term.refs -= 1;
+    term.count -= weight;
+    if (term.refs > 0) return;
+    for (const item of term.keys) {
+      this.remove(term.tier.byKey, 'key', item);
+      this.remove(term.tier.byCho, 'cho', item);
+    }
+    this.terms.delete(term.id);
+  }
+
+  private insert(list: SuggestKey[], field: 'key' | 'cho', item: SuggestKey) {
+    if (this.loading) list.push(item);
+    else list.splice(lowerBound(list, field, item[field]), 0, item);
+  }
+
+  private remove(list: SuggestKey[], field: 'key' | 'cho', item: SuggestKey) {
+    for (let i = lowerBound(list, field, item[field]); i < list.length && list[i][field] === item[field]; i++) {
+      if (list[i] === item) {
+        list.splice(i, 1);
+        return;
+      }
+    }
+  }
+}
@@ -0,0 +1,84 @@
+import { Test, TestingModule } from '@nestjs/testing';
+import { getRepositoryToken } from '@nestjs/typeorm';
+import { Product, ProductStatus } from '../entities/product.entity';
+import { Tag } from '../entities/tag.entity';
+import { SuggestService } from './suggest.service';
+
+type ProductRow = Pick<Product, 'id' | 'title' | 'production' | 'character' | 'status'>;
+
+const product = (id: string, title: string, character: string): ProductRow => ({
+  id,
+  title,
+  production: '레미제라블',
+  character,
+  status: ProductStatus.ACTIVE,
+});
+
+// 비동기로 시작된 색인 재구성이 끝날 때까지 기다림
+const settle = () => new Promise((resolve) => setImmediate(resolve));
+
+describe('SuggestService', () => {
+  let service: SuggestService;
+  let products: ProductRow[];
+  let signature: Record<string, unknown>;
+  let find: jest.Mock;
+
+  beforeEach(async () => {
+    products = [product('p1', '[레미제] 장발장 - 죄수복', '장발장')];
+    signature = { products: 1 };
+    find = jest.fn(() => Promise.resolve(products.filter((p) => p.status === ProductStatus.ACTIVE)));
+
+    const app: TestingModule = await Test.createTestingModule({
+      providers: [
+        SuggestService,
+        {
+          provide: getRepositoryToken(Product),
+          useValue: {
+            find,
+            findOne: ({ where }: { where: { id: string } }) =>
+              Promise.resolve(products.find((p) => p.id === where.id) ?? null),
+            query: () => Promise.resolve([signature]),
+          },
+        },
+        {
+          provide: getRepositoryToken(Tag),
+          useValue: {
+            find: () => Promise.resolve([]),
+            query: () => Promise.resolve([]),
+          },
+        },
+      ],
+    }).compile();
+
+    jest.spyOn(console, 'log').mockImplementation(() => undefined);
+    service = app.get<SuggestService>(SuggestService);
+    service.onModuleInit();
+    await service.suggest('장');
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it('should keep external changes visible to the stale check after a partial refresh', async () => {
+    // 시드 스크립트가 상품을 추가한 뒤 백엔드에서 다른 상품을 수정
+    products.push(product('p2', '[레미제] 자베르 - 제복', '자베르'));
+    signature = { products: 2 };
+    await service.refreshProduct('p1');
+
+    const now = Date.now();
+    jest.spyOn(Date, 'now').mockReturnValue(now + 60_000);
+    await service.suggest('자베');
+    await settle();
+
+    expect(find).toHaveBeenCalledTimes(2);
+    expect((await service.suggest('자베')).map((s) => s.text)).toContain('자베르');
+  });
+
+  it('should drop a removed product without a rebuild', async () => {
+    service.removeProduct('p1');
+
+    expect((await service.suggest('장발')).map((s) => s.text)).not.toContain('장발장');
+    expect(find).toHaveBeenCalledTimes(1);
+  });
+});
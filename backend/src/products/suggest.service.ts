@@ -0,0 +1,141 @@
+import { Injectable, OnModuleInit } from '@nestjs/common';
+import { InjectRepository } from '@nestjs/typeorm';
+import { Repository } from 'typeorm';
+import { Product, ProductStatus } from '../entities/product.entity';
+import { Tag, TagStatus } from '../entities/tag.entity';
+import { SuggestEntry, SuggestIndex, SuggestKind } from './suggest-index';
+
+// 자동완성 결과 최대 개수
+const MAX_SUGGESTIONS = 20;
+
+// 백엔드 밖(시드 스크립트 등)에서 바뀐 상품/태그를 확인하는 간격
+const STALE_CHECK_MS = 30_000;
+
+// 검색창 자동완성 (상품 제목, 작품/캐릭터, 승인된 태그) - 메모리 색인에서 조회해 SQLite를 거치지 않는다
+@Injectable()
+export class SuggestService implements OnModuleInit {
+  private index = new SuggestIndex();
+  private building: Promise<void> | null = null;
+  private signature = '';
+  private checkedAt = 0;
+
+  constructor(
+    @InjectRepository(Product)
+    private productRepository: Repository<Product>,
+    @InjectRepository(Tag)
+    private tagRepository: Repository<Tag>,
+  ) {}
+
+  // 시작을 늦추지 않도록 색인은 백그라운드에서 만든다 (첫 조회는 완료를 기다림)
+  onModuleInit() {
+    this.rebuild();
+  }
+
+  async suggest(query: string, limit = 10) {
+    if (this.building) {
+      await this.building;
+    }
+    this.checkStale();
+    return this.index.suggest(query, Math.min(Math.max(limit, 1), MAX_SUGGESTIONS));
+  }
+
+  // 상품 하나를 색인에 다시 반영 (생성/수정 후, 비활성/삭제면 제거)
+  // 부분 갱신은 signature를 바꾸지 않는다 - 그 사이 백엔드 밖에서 바뀐 것은 다음 확인 때 전체 재구성으로 반영
+  async refreshProduct(id: string) {
+    const product = await this.productRepository.findOne({
+      select: { id: true, title: true, production: true, character: true, status: true },
+      where: { id },
+    });
+    this.index.set(`product:${id}`, product ? this.productEntries(product) : []);
+  }
+
+  removeProduct(id: string) {
+    this.index.set(`product:${id}`, []);
+  }
+
+  // 태그 하나를 색인에 다시 반영 (승인된 태그만)
+  async refreshTag(id: string) {
+    const tag = await this.tagRepository.findOneBy({ id });
+    const [{ count }] = await this.tagRepository.query(
+      'SELECT COUNT(*) AS "count" FROM "product_tags" WHERE "tagId" = ?',
+      [id],
+    );
+    this.index.set(`tag:${id}`, tag ? this.tagEntries(tag, Number(count)) : []);
+  }
+
+  removeTag(id: string) {
+    this.index.set(`tag:${id}`, []);
+  }
+
+  // 전체 색인을 새로 만들어 교체 (만드는 동안에는 이전 색인으로 응답)
+  private rebuild() {
+    if (!this.building) {
+      this.building = this.load()
+        .catch((error) => console.warn(`자동완성 색인을 만들지 못했습니다: ${error.message}`))
+        .finally(() => {
+          this.building = null;
+        });
+    }
+    return this.building;
+  }
+
+  private async load() {
+    const started = Date.now();
+    const signature = await this.readSignature();
+    const products = await this.productRepository.find({
+      select: { id: true, title: true, production: true, character: true, status: true },
+      where: { status: ProductStatus.ACTIVE },
+    });
+    const tags = await this.tagRepository.find({ where: { status: TagStatus.APPROVED } });
+    const counts: { tagId: string; count: number }[] = await this.tagRepository.query(
+      'SELECT "tagId", COUNT(*) AS "count" FROM "product_tags" GROUP BY "tagId"',
+    );
+    const byTag = new Map(counts.map((row) => [row.tagId, Number(row.count)]));
+
+    const index = new SuggestIndex();
+    index.load([
+      ...products.map((product): [string, SuggestEntry[]] => [`product:${product.id}`, this.productEntries(product)]),
+      ...tags.map((tag): [string, SuggestEntry[]] => [`tag:${tag.id}`, this.tagEntries(tag, byTag.get(tag.id) ?? 0)]),
+    ]);
+    this.index = index;
+    this.signature = signature;
+    console.log(`자동완성 색인: 항목 ${index.size}개, ${Date.now() - started}ms`);
+  }
+
+  private productEntries(product: Pick<Product, 'title' | 'production' | 'character' | 'status'>): SuggestEntry[] {
+    if (product.status !== ProductStatus.ACTIVE) return [];
+    const entries: SuggestEntry[] = [{ text: product.title, kind: SuggestKind.PRODUCT, wordStarts: true }];
+    if (product.production) entries.push({ text: product.production, kind: SuggestKind.PRODUCTION });
+    if (product.character) entries.push({ text: product.character, kind: SuggestKind.CHARACTER });
+    return entries;
+  }
+
+  // 태그는 동의어로도 찾고, 태그가 붙은 상품 수로 순위를 매긴다
+  private tagEntries(tag: Tag, products: number): SuggestEntry[] {
+    if (tag.status !== TagStatus.APPROVED) return [];
+    return [{ text: tag.name, kind: SuggestKind.TAG, keys: [tag.name, ...(tag.synonyms || [])], weight: products }];
+  }
+
+  // 일정 간격으로 상품/태그의 개수와 최종 수정 시각을 확인해 바뀌었으면 다시 만든다
+  private checkStale() {
+    const now = Date.now();
+    if (now - this.checkedAt < STALE_CHECK_MS) return;
+    this.checkedAt = now;
+    this.readSignature()
+      .then((signature) => {
+        if (signature !== this.signature) this.rebuild();
+      })
+      .catch((error) => console.warn(`자동완성 색인 확인 실패: ${error.message}`));
+  }
+
+  private async readSignature() {
+    const [row] = await this.productRepository.query(`
+      SELECT
+        (SELECT COUNT(*) FROM "products") AS "products",
+        (SELECT MAX("updatedAt") FROM "products") AS "productsUpdatedAt",
+        (SELECT COUNT(*) FROM "tags") AS "tags",
+        (SELECT MAX("updatedAt") FROM "tags") AS "tagsUpdatedAt"
+    `);
+    return JSON.stringify(row);
+  }
+}
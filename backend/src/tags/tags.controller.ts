@@ -1,9 +1,10 @@
-import { Controller, Get, Post, Body, UseGuards } from '@nestjs/common';
+import { Controller, Get, Post, Patch, Delete, Body, Param, UseGuards } from '@nestjs/common';
 import { TagsService } from './tags.service';
 import { JwtAuthGuard } from '../auth/jwt-auth.guard';
 import { RolesGuard } from '../auth/roles.guard';
 import { Roles } from '../auth/roles.decorator';
 import { UserRole } from '../entities/user.entity';
+import { TagStatus, TagType } from '../entities/tag.entity';
 
 @Controller('tags')
 export class TagsController {
@@ -20,4 +21,28 @@ export class TagsController {
   async create(@Body() tagData: any) {
     return this.tagsService.create(tagData);
   }
+
+  @Patch(':id')
+  @UseGuards(JwtAuthGuard, RolesGuard)
+  @Roles(UserRole.ADMIN)
+  async update(
+    @Param('id') id: string,
+    @Body() tagData: { name?: string; type?: TagType; synonyms?: string[]; status?: TagStatus },
+  ) {
+    return this.tagsService.update(id, tagData);
+  }
+
+  @Patch(':id/approve')
+  @UseGuards(JwtAuthGuard, RolesGuard)
+  @Roles(UserRole.ADMIN)
+  async approve(@Param('id') id: string) {
+    return this.tagsService.approve(id);
+  }
+
+  @Delete(':id')
+  @UseGuards(JwtAuthGuard, RolesGuard)
+  @Roles(UserRole.ADMIN)
+  async delete(@Param('id') id: string) {
+    return this.tagsService.delete(id);
+  }
 }
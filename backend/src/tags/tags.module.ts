@@ -1,11 +1,12 @@
 import { Module } from '@nestjs/common';
 import { TypeOrmModule } from '@nestjs/typeorm';
 import { Tag } from '../entities/tag.entity';
+import { ProductsModule } from '../products/products.module';
 import { TagsController } from './tags.controller';
 import { TagsService } from './tags.service';
 
 @Module({
-  imports: [TypeOrmModule.forFeature([Tag])],
+  imports: [TypeOrmModule.forFeature([Tag]), ProductsModule],
   controllers: [TagsController],
   providers: [TagsService],
   exports: [TagsService],
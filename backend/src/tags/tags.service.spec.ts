@@ -0,0 +1,69 @@
+import { NotFoundException } from '@nestjs/common';
+import { Test, TestingModule } from '@nestjs/testing';
+import { getRepositoryToken } from '@nestjs/typeorm';
+import { Tag, TagStatus, TagType } from '../entities/tag.entity';
+import { SuggestService } from '../products/suggest.service';
+import { TagsService } from './tags.service';
+
+describe('TagsService', () => {
+  let service: TagsService;
+  let tag: Tag;
+  const save = jest.fn((saved: Tag) => Promise.resolve(saved));
+  const remove = jest.fn((removed: Tag) => Promise.resolve(removed));
+  const refreshTag = jest.fn(() => Promise.resolve());
+  const removeTag = jest.fn();
+
+  beforeEach(async () => {
+    jest.clearAllMocks();
+    tag = Object.assign(new Tag(), {
+      id: 't1',
+      name: '빅토리아',
+      type: TagType.ERA,
+      synonyms: [],
+      status: TagStatus.PENDING,
+    });
+
+    const app: TestingModule = await Test.createTestingModule({
+      providers: [
+        TagsService,
+        {
+          provide: getRepositoryToken(Tag),
+          useValue: {
+            findOneBy: ({ id }: { id: string }) => Promise.resolve(id === tag.id ? tag : null),
+            save,
+            remove,
+          },
+        },
+        { provide: SuggestService, useValue: { refreshTag, removeTag } },
+      ],
+    }).compile();
+
+    service = app.get<TagsService>(TagsService);
+  });
+
+  it('should refresh the suggest index when a tag is approved', async () => {
+    await service.approve('t1');
+
+    expect(save).toHaveBeenCalledWith(expect.objectContaining({ status: TagStatus.APPROVED }));
+    expect(refreshTag).toHaveBeenCalledWith('t1');
+  });
+
+  it('should refresh the suggest index when a tag is renamed', async () => {
+    await service.update('t1', { name: '빅토리아 시대', synonyms: ['빅토리안'] });
+
+    expect(save).toHaveBeenCalledWith(expect.objectContaining({ name: '빅토리아 시대' }));
+    expect(refreshTag).toHaveBeenCalledWith('t1');
+  });
+
+  it('should drop a deleted tag from the suggest index', async () => {
+    await service.delete('t1');
+
+    expect(remove).toHaveBeenCalledWith(tag);
+    expect(removeTag).toHaveBeenCalledWith('t1');
+  });
+
+  it('should not touch the suggest index for an unknown tag', async () => {
+    await expect(service.delete('missing')).rejects.toBeInstanceOf(NotFoundException);
+    expect(removeTag).not.toHaveBeenCalled();
+  });
+});
@@ -1,13 +1,15 @@
-import { Injectable } from '@nestjs/common';
+import { Injectable, NotFoundException } from '@nestjs/common';
 import { InjectRepository } from '@nestjs/typeorm';
 import { Repository } from 'typeorm';
-import { Tag, TagStatus } from '../entities/tag.entity';
+import { Tag, TagStatus, TagType } from '../entities/tag.entity';
+import { SuggestService } from '../products/suggest.service';
 
 @Injectable()
 export class TagsService {
   constructor(
     @InjectRepository(Tag)
     private tagRepository: Repository<Tag>,
+    private suggestService: SuggestService,
   ) {}
 
   async findAll() {
@@ -22,6 +24,35 @@ export class TagsService {
       ...tagData,
       status: TagStatus.APPROVED, // Auto-approve tags created by admin
     });
-    return this.tagRepository.save(tag);
+    const saved = (await this.tagRepository.save(tag)) as unknown as Tag;
+    await this.suggestService.refreshTag(saved.id);
+    return saved;
+  }
+
+  async update(id: string, tagData: { name?: string; type?: TagType; synonyms?: string[]; status?: TagStatus }) {
+    const tag = await this.findOne(id);
+    Object.assign(tag, tagData);
+    const saved = await this.tagRepository.save(tag);
+    await this.suggestService.refreshTag(id);
+    return saved;
+  }
+
+  approve(id: string) {
+    return this.update(id, { status: TagStatus.APPROVED });
+  }
+
+  async delete(id: string) {
+    const tag = await this.findOne(id);
+    await this.tagRepository.remove(tag);
+    this.suggestService.removeTag(id);
+    return { message: '태그가 삭제되었습니다' };
+  }
+
+  private async findOne(id: string) {
+    const tag = await this.tagRepository.findOneBy({ id });
+    if (!tag) {
+      throw new NotFoundException('태그를 찾을 수 없습니다');
+    }
+    return tag;
   }
 }
@@ -4,21 +4,21 @@ AI 기반 PDF 분석 및 시드 데이터 생성 스크립트
 각 PDF 페이지의 의상 정보를 분석하여 정확한 상품 데이터 생성
 """
 
-import fitz  # PyMuPDF
 import os
 import json
+import argparse
 import sqlite3
-import uuid
-import hashlib
-from pathlib import Path
-from datetime import datetime
 import re
 
-# 경로 설정
-BASE_DIR = Path("c:/Users/parkm/stage-equipment-rental")
-SOURCE_DIR = BASE_DIR / "source"
-UPLOAD_DIR = BASE_DIR / "backend" / "uploads" / "products"
-DB_PATH = BASE_DIR / "backend" / "stage_rental.db"
+from ingest_config import SOURCE_DIR, UPLOAD_DIR, DB_PATH, UPLOAD_URL
+from pdf_ingest import make_job, ingest, group_by_page, extract_page_images
+from ingest_state import open_state, needs_seeding, mark_seeded
+from bulk_loader import open_loader, finish_loader, supplier_id, add_product, source_key, retire_missing
+from image_metadata import save_metadata
+from ingest_metrics import enable_trace, add_arguments, write_run
+
+# 매니페스트에서 이 스크립트의 상품 반영 기록을 구분하는 이름
+SEEDER = "ai_seed_generator"
 
 # 업로드 디렉토리 생성
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -567,93 +567,13 @@ BARAMSA_COSTUMES = [
     },
 ]
 
-def get_category_id(conn, category_name):
-    """카테고리 ID 조회 또는 생성"""
-    cursor = conn.cursor()
-
-    # 카테고리 이름 매핑
-    cat_map = {
-        "의상": "의상",
-        "신발": "신발",
-        "악세서리": "악세서리",
-        "소품": "소품",
-        "대도구": "대도구"
-    }
-
-    search_name = cat_map.get(category_name, category_name)
-    cursor.execute("SELECT id FROM categories WHERE name LIKE ?", (f"%{search_name}%",))
-    result = cursor.fetchone()
-
-    if result:
-        return result[0]
-
-    # 카테고리가 없으면 생성
-    cat_id = str(uuid.uuid4())
-    cursor.execute(
-        "INSERT INTO categories (id, name, slug, description, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?, ?)",
-        (cat_id, category_name, category_name.lower(), f"{category_name} 카테고리", datetime.now().isoformat(), datetime.now().isoformat())
-    )
-    return cat_id
-
-def get_supplier_id(conn):
-    """공급자 ID 조회"""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM users WHERE role = 'supplier' OR role = 'admin' LIMIT 1")
-    result = cursor.fetchone()
-    return result[0] if result else None
-
 def extract_images_from_page(doc, page_num, output_dir, musical_name, prefix=""):
-    """특정 페이지에서 이미지 추출"""
-    images = []
-    page = doc[page_num]
-    image_list = page.get_images()
-
-    for img_index, img in enumerate(image_list):
-        xref = img[0]
-        try:
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            image_ext = base_image["ext"]
-
-            # 최소 크기 필터 (5KB 이상)
-            if len(image_bytes) < 5000:
-                continue
-
-            # 파일명 생성
-            img_hash = hashlib.md5(image_bytes).hexdigest()[:8]
-            filename = f"{musical_name}_p{page_num+1}_img{img_index+1}_{img_hash}.{image_ext}"
-            filepath = output_dir / filename
-
-            # 이미지 저장
-            with open(filepath, "wb") as f:
-                f.write(image_bytes)
-
-            images.append({
-                "filename": filename,
-                "path": str(filepath),
-                "index": img_index,
-                "size": len(image_bytes)
-            })
-        except Exception as e:
-            print(f"    이미지 추출 실패: {e}")
-
-    return images
-
-def clear_old_products(conn, musical_keyword):
-    """기존 상품 삭제"""
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM products WHERE title LIKE ?", (f"%{musical_keyword}%",))
-    deleted = cursor.rowcount
-    print(f"  삭제된 상품: {deleted}개")
-    return deleted
-
-def create_product(conn, costume_data, image_url, supplier_id):
-    """상품 생성"""
-    cursor = conn.cursor()
-
-    category_id = get_category_id(conn, costume_data["category"])
-    product_id = str(uuid.uuid4())
+    """특정 페이지에서 이미지 추출 (메타데이터 필터 통과분만 저장)"""
+    records = extract_page_images(doc, page_num, output_dir)
+    return [r for r in records if r["filename"]]
 
+def create_product(loader, costume_data, image_url, supplier_id, pdf_path):
+    """상품 생성 또는 갱신 (PDF/페이지/이미지 순번이 같은 기존 상품은 ID 유지)"""
     # 상품 제목 생성
     title = f"[{costume_data['musical'][:4]}] {costume_data['character']} - {costume_data['costume']}"
 
@@ -670,52 +590,39 @@ def create_product(conn, costume_data, image_url, supplier_id):
     # 기본 가격
     price = 50000
 
-    now = datetime.now().isoformat()
-
-    cursor.execute("""
-        INSERT INTO products (id, supplierId, title, description, images, categoryId, baseDailyPrice, status, createdAt, updatedAt)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        product_id,
-        supplier_id,
-        title,
-        description,
-        image_url,
-        category_id,
-        price,
-        "active",
-        now,
-        now
-    ))
-
-    return product_id
-
-def process_baramsa(conn, supplier_id):
-    """바람사 PDF 처리"""
+    key = source_key(costume_data["musical"], pdf_path, costume_data["page"], costume_data["image_index"])
+    return add_product(
+        loader, supplier_id, title, description, image_url, costume_data["category"], price, key=key,
+        production=costume_data["musical"], character=costume_data["character"], scene=costume_data["scene"],
+    )
+
+def process_baramsa(loader, supplier_id, state, seeded, force=False):
+    """바람사 PDF 처리 (PDF가 바뀌지 않았으면 기존 상품 유지)"""
     print("\n" + "=" * 60)
     print("바람과 함께 사라지다 - AI 분석 기반 상품 생성")
     print("=" * 60)
 
-    # 기존 바람사 상품 삭제
-    clear_old_products(conn, "바람")
-
     pdf_path = SOURCE_DIR / "바람사 의상파트 바이블" / "바람사 장면별 PHOTO LIST -주조연 (1).pdf"
 
     if not pdf_path.exists():
         print(f"  PDF 파일 없음: {pdf_path}")
         return 0
 
-    doc = fitz.open(pdf_path)
-    print(f"  PDF 열기 성공: {len(doc)} 페이지")
+    # 페이지 샤드 단위 병렬 추출 (이미 추출된 페이지는 매니페스트에서 읽음)
+    job = make_job("바람사", pdf_path)
+    records = ingest([job], UPLOAD_DIR, state=state)[job["path"]]
+    save_metadata(loader["conn"], records)
 
-    created_count = 0
-    page_images = {}
+    if not force and not needs_seeding(state, SEEDER, pdf_path):
+        print("  PDF 변경 없음, 기존 상품 유지")
+        return 0
+
+    seeded.append(pdf_path)
 
-    # 각 페이지별 이미지 추출
-    for page_num in range(len(doc)):
-        images = extract_images_from_page(doc, page_num, UPLOAD_DIR, "바람사")
-        page_images[page_num + 1] = images
-        print(f"  페이지 {page_num + 1}: {len(images)}개 이미지 추출")
+    created_count = 0
+    page_images = group_by_page(records)
+    for page, images in sorted(page_images.items()):
+        print(f"  페이지 {page}: {len(images)}개 이미지 추출")
 
     # 의상 데이터와 이미지 매칭하여 상품 생성
     for costume in BARAMSA_COSTUMES:
@@ -725,43 +632,54 @@ def process_baramsa(conn, supplier_id):
         images = page_images.get(page, [])
 
         if img_idx < len(images):
-            image_url = f"http://localhost:3001/uploads/products/{images[img_idx]['filename']}"
+            image_url = f"{UPLOAD_URL}/{images[img_idx]['filename']}"
         else:
             # 이미지가 없으면 해당 페이지의 첫 번째 이미지 사용
             if images:
-                image_url = f"http://localhost:3001/uploads/products/{images[0]['filename']}"
+                image_url = f"{UPLOAD_URL}/{images[0]['filename']}"
             else:
                 image_url = ""
 
         try:
-            create_product(conn, costume, image_url, supplier_id)
+            create_product(loader, costume, image_url, supplier_id, pdf_path)
             created_count += 1
         except Exception as e:
             print(f"    상품 생성 실패: {costume['costume']} - {e}")
 
-    doc.close()
-    print(f"\n  생성된 상품: {created_count}개")
+    retired = retire_missing(loader, BARAMSA_COSTUMES[0]["musical"], pdf_path)
+    print(f"\n  반영된 상품: {created_count}개 (비활성화 {retired}개)")
     return created_count
 
 def main():
+    parser = argparse.ArgumentParser(description="AI 기반 PDF 분석 및 시드 데이터 생성")
+    parser.add_argument("--full", action="store_true", help="PDF 변경 여부와 관계없이 전체 재생성")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
     print("=" * 70)
     print("AI 기반 PDF 분석 및 시드 데이터 생성")
     print("=" * 70)
 
     conn = sqlite3.connect(DB_PATH)
+    state = open_state()
+    seeded = []
 
     try:
-        supplier_id = get_supplier_id(conn)
-        if not supplier_id:
+        # 적재/갱신 전체를 한 트랜잭션으로
+        loader = open_loader(conn)
+        supplier = supplier_id(loader)
+        if not supplier:
             print("오류: 공급자를 찾을 수 없습니다.")
             return
 
-        print(f"공급자 ID: {supplier_id}")
+        print(f"공급자 ID: {supplier}")
 
         # 바람사 처리
-        baramsa_count = process_baramsa(conn, supplier_id)
+        baramsa_count = process_baramsa(loader, supplier, state, seeded, args.full)
 
-        conn.commit()
+        finish_loader(loader)
+        mark_seeded(state, SEEDER, seeded)
 
         print("\n" + "=" * 70)
         print("처리 완료!")
@@ -775,6 +693,8 @@ def main():
         conn.rollback()
     finally:
         conn.close()
+        state.close()
+        write_run(SEEDER, args.metrics, args.trace)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+PDF -> 상품 수집 경로 벤치마크
+PyMuPDF로 합성 바이블(페이지 수, 페이지당 이미지, 크기/형식, 중복 xref 비율)을 만들고
+extract_images_from_pdf / extract_images_from_page / create_product의 처리량과 최대 RSS를
+기준 파일(bench_baseline.json)과 비교 - 기준보다 나빠지면 종료 코드 1
+오프라인 리눅스 환경에서 실행 가능 (네트워크, 실제 PDF 불필요)
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from ingest_config import DB_PATH
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = SCRIPTS_DIR / "bench_baseline.json"
+
+# 스키마를 복사해 올 DB (저장소에 포함된 개발 DB 우선)
+SCHEMA_DB_PATHS = [SCRIPTS_DIR.parent / "backend" / "stage_rental.db", DB_PATH]
+
+# 기준 대비 허용 오차 (처리량은 이만큼 느려지면, RSS는 이만큼 늘면 실패)
+TOLERANCE = 0.25
+
+SCENARIOS = {
+    "pdf-jpeg": {
+        "target": "extract_images_from_pdf",
+        "pages": 200, "images_per_page": 3, "size": (640, 480), "format": "jpeg", "duplicates": 0.0,
+    },
+    "pdf-png-large": {
+        "target": "extract_images_from_pdf",
+        "pages": 6, "images_per_page": 2, "size": (1600, 1200), "format": "png", "duplicates": 0.0,
+    },
+    "pdf-duplicate-xrefs": {
+        "target": "extract_images_from_pdf",
+        "pages": 200, "images_per_page": 4, "size": (800, 600), "format": "jpeg", "duplicates": 0.6,
+    },
+    "page-jpeg": {
+        "target": "extract_images_from_page",
+        "pages": 200, "images_per_page": 3, "size": (640, 480), "format": "jpeg", "duplicates": 0.0,
+    },
+    "create-product": {
+        "target": "create_product",
+        "rows": 20000,
+    },
+}
+
+
+def synthetic_image(rng, size, fmt):
+    """합성 이미지 바이트 (그라데이션 + 잡음, 실제 사진 정도의 압축률)"""
+    width, height = size
+    base = Image.linear_gradient("L").resize(size).convert("RGB")
+    noise = Image.effect_noise(size, rng.randint(20, 60)).convert("RGB")
+    img = Image.blend(base, noise, 0.5)
+    buf = io.BytesIO()
+    if fmt == "jpeg":
+        img.save(buf, "JPEG", quality=85)
+    else:
+        img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def make_bible(path, pages, images_per_page, size, format, duplicates, seed=0):
+    """합성 바이블 PDF 생성 - duplicates 비율만큼 이미 넣은 xref를 다시 배치"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    xrefs = []
+    cols = 2
+    cell_w, cell_h = 595 / cols, 842 / ((images_per_page + cols - 1) // cols)
+
+    for page_num in range(pages):
+        page = doc.new_page(width=595, height=842)
+        for i in range(images_per_page):
+            x, y = (i % cols) * cell_w, (i // cols) * cell_h
+            rect = fitz.Rect(x + 10, y + 10, x + cell_w - 10, y + cell_h - 30)
+            if xrefs and rng.random() < duplicates:
+                page.insert_image(rect, xref=rng.choice(xrefs))
+            else:
+                xrefs.append(page.insert_image(rect, stream=synthetic_image(rng, size, format)))
+            page.insert_text((x + 10, y + cell_h - 15), f"캐릭터{i} / 장면{page_num} / 의상", fontname="helv")
+
+    doc.save(path)
+    doc.close()
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)
+
+    ru_maxrss는 fork 이전 부모 값이 남아 있을 수 있어 /proc의 VmHWM을 우선 사용한다.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def stored_bytes(images):
+    """저장된 이미지 바이트 (같은 해시는 한 번만)"""
+    return sum({r["hash"]: r["size"] for r in images}.values())
+
+
+def bench_pdf(workdir, scenario, pdf_path):
+    """extract_images_from_pdf 처리량"""
+    from extract_and_seed import extract_images_from_pdf
+
+    started = time.perf_counter()
+    images = extract_images_from_pdf(pdf_path, workdir / "uploads", "벤치")
+    elapsed = time.perf_counter() - started
+    return elapsed, scenario["pages"], len(images), stored_bytes(images)
+
+
+def bench_page(workdir, scenario, pdf_path):
+    """extract_images_from_page 처리량 (페이지마다 호출)"""
+    from ai_seed_generator import extract_images_from_page
+
+    images = []
+    started = time.perf_counter()
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(len(doc)):
+            images.extend(extract_images_from_page(doc, page_num, workdir / "uploads", "벤치"))
+    elapsed = time.perf_counter() - started
+    return elapsed, scenario["pages"], len(images), stored_bytes(images)
+
+
+def bench_create_product(workdir, scenario, pdf_path=None):
+    """create_product 처리량 (일괄 적재기, 스키마만 복사한 임시 DB)"""
+    from ai_seed_generator import create_product
+    from bulk_loader import open_loader, finish_loader
+
+    source = next((p for p in SCHEMA_DB_PATHS if p.exists()), None)
+    if source is None:
+        raise RuntimeError("스키마를 복사할 DB가 없습니다: " + ", ".join(map(str, SCHEMA_DB_PATHS)))
+
+    conn = sqlite3.connect(str(workdir / "bench.db"))
+    with sqlite3.connect(str(source)) as src:
+        for (sql,) in src.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN ('users', 'categories', 'products')"
+        ):
+            conn.execute(sql)
+    conn.execute(
+        "INSERT INTO users (id, email, passwordHash, role, name) VALUES ('bench', 'bench@example.com', '-', 'supplier', '벤치')"
+    )
+    conn.commit()
+
+    costume = {
+        "musical": "벤치마크", "character": "캐릭터", "costume": "의상", "scene": "장면",
+        "description": "합성 상품", "shoes": "", "accessories": "", "category": "의상",
+    }
+    started = time.perf_counter()
+    loader = open_loader(conn)
+    for i in range(scenario["rows"]):
+        item = {**costume, "page": i + 1, "image_index": 0}
+        create_product(loader, item, f"http://localhost:3001/uploads/bench/{i}.jpeg", "bench", "bench.pdf")
+    finish_loader(loader)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed, 0, scenario["rows"], 0
+
+
+TARGETS = {
+    "extract_images_from_pdf": bench_pdf,
+    "extract_images_from_page": bench_page,
+    "create_product": bench_create_product,
+}
+
+
+def run_scenario(scenario, workdir, pdf_path=None):
+    """시나리오 하나 실행 - 최대 RSS를 따로 재도록 새 프로세스에서 호출"""
+    workdir = Path(workdir)
+    # seed 스크립트는 import 시 (윈도우 경로의) UPLOAD_DIR을 만들므로 임시 디렉토리 안에서
+    os.chdir(workdir)
+    elapsed, pages, items, size = TARGETS[scenario["target"]](workdir, scenario, pdf_path)
+
+    elapsed = max(elapsed, 1e-9)
+    result = {
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(items / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    if pages:
+        result["pages_per_sec"] = round(pages / elapsed, 1)
+        result["mb_per_sec"] = round(size / 1024 / 1024 / elapsed, 2)
+    return result
+
+
+def compare(name, result, baseline, tolerance=TOLERANCE):
+    """기준 대비 회귀 목록"""
+    failures = []
+    for metric in ("items_per_sec", "pages_per_sec", "mb_per_sec"):
+        if metric in baseline and metric in result and result[metric] < baseline[metric] * (1 - tolerance):
+            failures.append(f"{name}: {metric} {result[metric]} < 기준 {baseline[metric]}")
+    if "peak_rss_mb" in baseline and result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        failures.append(f"{name}: peak_rss_mb {result['peak_rss_mb']} > 기준 {baseline['peak_rss_mb']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 수집 경로 벤치마크")
+    parser.add_argument("scenarios", nargs="*", help=f"실행할 시나리오 (기본: 전체 - {', '.join(SCENARIOS)})")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="기준 파일 경로")
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과를 기준으로 저장")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="허용 오차 비율")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+
+    baseline = {}
+    if Path(args.baseline).exists():
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    results = {}
+    failures = []
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        scenario = SCENARIOS[name]
+        with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+            # 합성 PDF는 측정 프로세스 밖에서 생성 (RSS에 포함되지 않도록)
+            pdf_path = None
+            if "pages" in scenario:
+                pdf_path = str(Path(workdir) / "bible.pdf")
+                make_bible(pdf_path, scenario["pages"], scenario["images_per_page"], tuple(scenario["size"]),
+                           scenario["format"], scenario["duplicates"])
+
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[name] = pool.submit(run_scenario, scenario, workdir, pdf_path).result()
+        print(f"{name}: {json.dumps(results[name], ensure_ascii=False)}")
+        if name in baseline:
+            failures.extend(compare(name, results[name], baseline[name], args.tolerance))
+
+    if args.update_baseline:
+        baseline.update(results)
+        Path(args.baseline).write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n기준 저장: {args.baseline}")
+        return
+
+    if failures:
+        print("\n성능 회귀:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\n기준 대비 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
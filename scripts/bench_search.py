@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+상품 검색 지연 시간 벤치마크 (예전 LIKE 경로 vs FTS5 색인)
+합성 카탈로그(작품/캐릭터/의상 제목, 태그, 자산)를 임시 DB에 적재하고
+ProductsService.search가 만드는 쿼리 두 가지를 검색어마다 반복 실행해 중앙값/p95와
+찾은 상품 집합이 같은지 비교한다 (오프라인, 실제 DB 불필요)
+
+  python scripts/bench_search.py
+  python scripts/bench_search.py --products 100000 --repeat 10 드레스 모자
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+from bench_ingest import SCHEMA_DB_PATHS
+from bulk_loader import open_loader, add_product, finish_loader
+from product_images import ensure_schema
+from search_index import rebuild, search_query
+
+# 검색어 (3글자 이상은 색인 MATCH, 1~2글자는 색인 테이블 LIKE)
+QUERIES = ["드레스", "스칼렛", "나폴레옹 황제", "대관식", "모자", "군", "없는검색어"]
+
+PRODUCTIONS = {
+    "바람사": [("스칼렛 오하라", ["초록 드레스", "바비큐 파티 드레스", "상복"]), ("레트 버틀러", ["연미복", "모자"])],
+    "나폴레옹": [("나폴레옹", ["대관식 황제 예복", "포병 군복", "이각 모자"]), ("조세핀", ["엠파이어 드레스"])],
+    "오캐롤": [("에스더", ["원피스", "웨딩 드레스"]), ("강진", ["가죽 재킷", "청바지"])],
+    "에드거앨런포": [("포", ["검은 코트", "조끼"]), ("버지니아", ["레이스 드레스"])],
+}
+CATEGORIES = ["의상", "신발", "악세서리", "소품"]
+TAGS = ["18세기", "19세기", "군복", "드레스", "예복", "코트", "빈티지", "레이스", "가죽", "흑백"]
+
+# 예전 search: 목록 조인 + 네 컬럼 LIKE (태그/자산 조인으로 행이 불어남)
+LIST_JOINS = """
+    FROM "products" product
+    LEFT JOIN "product_images" "primaryImage"
+        ON "primaryImage"."productId" = product."id" AND "primaryImage"."role" = 'main'
+        AND "primaryImage"."position" = 0
+    LEFT JOIN "categories" category ON category."id" = product."categoryId"
+    LEFT JOIN "product_tags" pt ON pt."productId" = product."id"
+    LEFT JOIN "tags" tags ON tags."id" = pt."tagId"
+    LEFT JOIN "assets" assets ON assets."productId" = product."id"
+    LEFT JOIN "users" supplier ON supplier."id" = product."supplierId"
+"""
+SELECT = 'SELECT product."id", product."title", category."name", tags."name", assets."id", "primaryImage"."url"'
+
+LIKE_PATH = f"""
+    {SELECT} {LIST_JOINS}
+    WHERE product."status" = 'active' AND (product."title" LIKE :q OR product."description" LIKE :q
+        OR tags."name" LIKE :q OR category."name" LIKE :q)
+"""
+
+
+def fts_search(conn, text):
+    """색인 경로 - 색인에서 찾은 상품만 목록 조인하고 순위순 정렬
+
+    색인 서브쿼리를 조인하면 플래너가 (선택도가 낮은) status 인덱스를 바깥 루프로 골라
+    상품 수 x 결과 수가 되므로 IN으로 거르고 순위는 색인 조회 결과로 정렬한다.
+    """
+    sql, params = search_query(text)
+    ranks = dict(conn.execute(sql, params).fetchall())
+    if not ranks:
+        return []
+    rows = conn.execute(
+        f'{SELECT} {LIST_JOINS} WHERE product."status" = \'active\' '
+        f'AND product."id" IN (SELECT "productId" FROM ({sql}))',
+        params,
+    ).fetchall()
+    rows.sort(key=lambda row: ranks[row[0]] or 0)
+    return rows
+
+
+def make_catalog(path, count, seed=0):
+    """합성 카탈로그 적재 후 검색 색인 생성"""
+    rng = random.Random(seed)
+    source = next((p for p in SCHEMA_DB_PATHS if p.exists()), None)
+    if source is None:
+        raise RuntimeError("스키마를 복사할 DB가 없습니다: " + ", ".join(map(str, SCHEMA_DB_PATHS)))
+
+    conn = sqlite3.connect(str(path))
+    with sqlite3.connect(str(source)) as src:
+        for (sql,) in src.execute(
+            "SELECT sql FROM sqlite_master WHERE type IN ('table', 'index') AND sql IS NOT NULL "
+            "AND tbl_name IN ('users', 'categories', 'products', 'tags', 'product_tags', 'assets') "
+            "ORDER BY type = 'index'"
+        ):
+            conn.execute(sql)
+    conn.execute(
+        "INSERT INTO users (id, email, passwordHash, role, name) VALUES ('bench', 'bench@example.com', '-', 'supplier', '벤치')"
+    )
+    conn.executemany("INSERT INTO tags (id, name) VALUES (?, ?)", [(f"tag-{i}", name) for i, name in enumerate(TAGS)])
+    ensure_schema(conn)
+    conn.commit()
+
+    loader = open_loader(conn)
+    products = list(PRODUCTIONS.items())
+    ids = []
+    for i in range(count):
+        production, characters = products[i % len(products)]
+        character, costumes = rng.choice(characters)
+        costume = rng.choice(costumes)
+        description = f"뮤지컬 '{production}'의 {character} 캐릭터 의상입니다.\n\n■ 장면: {i % 12 + 1}장\n■ 의상: {costume}"
+        ids.append(add_product(
+            loader, "bench", f"[{production}] {character} - {costume}", description,
+            f"http://localhost:3001/uploads/bench/{i}.jpeg", rng.choice(CATEGORIES), 50000,
+            production=production, character=character,
+        ))
+    finish_loader(loader)
+
+    conn.executemany(
+        'INSERT INTO product_tags ("productId", "tagId") VALUES (?, ?)',
+        [(product_id, f"tag-{t}") for product_id in ids for t in rng.sample(range(len(TAGS)), rng.randint(0, 3))],
+    )
+    conn.executemany(
+        'INSERT INTO assets (id, "productId", "assetCode") VALUES (?, ?, ?)',
+        [(f"{product_id}-{n}", product_id, f"A-{i}-{n}") for i, product_id in enumerate(ids) for n in range(2)],
+    )
+    conn.commit()
+    rebuild(conn)
+    return conn
+
+
+def timed(run, repeat):
+    """(찾은 상품 ID 집합, 반환 행 수, 실행 시간 ms 리스트)"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = run()
+        times.append((time.perf_counter() - started) * 1000)
+    return {row[0] for row in rows}, len(rows), times
+
+
+def p95(values):
+    return sorted(values)[max(0, round(len(values) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 검색 지연 시간 (LIKE vs FTS5)")
+    parser.add_argument("queries", nargs="*", help=f"검색어 (기본: {' '.join(QUERIES)})")
+    parser.add_argument("--products", type=int, default=20000, help="합성 상품 수")
+    parser.add_argument("--repeat", type=int, default=5, help="검색어마다 반복 횟수")
+    args = parser.parse_args()
+
+    mismatched = []
+    with tempfile.TemporaryDirectory(prefix="bench-search-") as workdir:
+        # ingest_config의 (윈도우) 상대 경로가 작업 디렉토리에 생기지 않도록
+        os.chdir(workdir)
+        started = time.perf_counter()
+        conn = make_catalog(Path(workdir) / "search.db", args.products)
+        print(f"합성 상품 {args.products}개 적재/색인 {time.perf_counter() - started:.1f}초\n")
+
+        print(f"{'검색어':<14}{'상품':>7}{'LIKE 행':>9}{'FTS 행':>9}{'LIKE ms':>10}{'FTS ms':>9}{'p95':>8}{'색인 ms':>9}{'배':>7}")
+        for text in args.queries or QUERIES:
+            like_ids, like_rows, like_times = timed(
+                lambda: conn.execute(LIKE_PATH, {"q": f"%{text}%"}).fetchall(), args.repeat
+            )
+            fts_ids, fts_rows, fts_times = timed(lambda: fts_search(conn, text), args.repeat)
+            # 색인 조회만 (나머지는 목록 조인 비용)
+            sql, params = search_query(text)
+            _, _, index_times = timed(lambda: conn.execute(sql, params).fetchall(), args.repeat)
+            like_ms, fts_ms = statistics.median(like_times), statistics.median(fts_times)
+            print(f"{text:<14}{len(fts_ids):>7}{like_rows:>9}{fts_rows:>9}{like_ms:>10.1f}{fts_ms:>9.1f}"
+                  f"{p95(fts_times):>8.1f}{statistics.median(index_times):>9.1f}{like_ms / max(fts_ms, 1e-6):>7.1f}")
+            if like_ids != fts_ids:
+                mismatched.append(f"{text}: LIKE {len(like_ids)}개, FTS {len(fts_ids)}개")
+        conn.close()
+        os.chdir(Path(__file__).resolve().parent)
+
+    # 태그 LIKE는 조인된 행에서 검사하므로 찾는 상품 집합은 두 경로가 같아야 한다
+    if mismatched:
+        print("\n검색 결과가 다른 검색어:")
+        for line in mismatched:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
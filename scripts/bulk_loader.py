@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+상품 일괄 적재
+seed 스크립트들이 함께 쓰는 적재기 - 카테고리/공급자 캐시, executemany 배치,
+적재용 PRAGMA, 단일 트랜잭션, 초당 적재 행 수 보고
+자연 키(sourceKey)를 준 상품은 기존 행을 찾아 바뀐 것만 갱신 (상품 ID 유지)
+삽입/갱신한 상품의 이미지는 product_images에도 반영
+작품/캐릭터/장면(production/character/scene)은 시드 스크립트가 의상 정보에서 바로 넘긴다
+"""
+
+import os
+import uuid
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+
+from ingest_config import DB_PATH, UPLOAD_URL
+from db_session import apply_pragmas
+from product_images import ensure_schema, replace_images
+from product_attributes import production_name, ensure_attribute_columns
+from ingest_metrics import stage
+
+# executemany 한 번에 넣는 행 수
+BATCH_SIZE = 5000
+
+PRODUCT_COLUMNS = (
+    "id", "supplierId", "title", "description", "images",
+    "categoryId", "baseDailyPrice", "status", "createdAt", "updatedAt", "sourceKey",
+    "production", "character", "scene",
+)
+
+IMAGES_INDEX = PRODUCT_COLUMNS.index("images")
+
+INSERT_PRODUCT = (
+    f"INSERT INTO products ({', '.join(PRODUCT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in PRODUCT_COLUMNS)})"
+)
+
+# 자연 키가 같은 기존 상품의 내용 갱신 (ID, 생성일, 장바구니/주문 참조 유지)
+UPDATE_PRODUCT = (
+    "UPDATE products SET title = ?, description = ?, images = ?, categoryId = ?, "
+    "baseDailyPrice = ?, status = ?, production = ?, character = ?, scene = ?, updatedAt = ? WHERE id = ?"
+)
+
+# Product 엔티티의 @Index 이름과 같아야 TypeORM 동기화와 겹치지 않음
+SOURCE_KEY_INDEX = "IDX_products_sourceKey"
+
+
+def source_key(musical, pdf_path, page, index):
+    """시드 상품의 자연 키 (뮤지컬|PDF 파일명|페이지|이미지 순번)"""
+    return f"{musical}|{os.path.basename(os.fspath(pdf_path))}|{page}|{index}"
+
+
+def new_id():
+    """uuid4 문자열 (uuid.uuid4()와 같은 형식 - 행마다 UUID 객체를 만들지 않음)"""
+    h = os.urandom(16).hex()
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+
+def ensure_source_key(conn):
+    """products.sourceKey 컬럼과 유니크 인덱스가 없으면 생성"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+    if "sourceKey" not in columns:
+        conn.execute('ALTER TABLE products ADD COLUMN "sourceKey" varchar')
+    conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{SOURCE_KEY_INDEX}" ON products ("sourceKey")')
+
+
+def open_loader(conn, batch_size=BATCH_SIZE):
+    """적재기 생성 - 카테고리를 한 번에 읽어 캐시하고 트랜잭션 시작
+
+    적재기는 finish_loader를 부를 때까지 커밋하지 않는다 (전체가 한 트랜잭션).
+    이미 트랜잭션이 열려 있으면 그 트랜잭션을 그대로 이어 쓴다.
+    """
+    if not conn.in_transaction:
+        apply_pragmas(conn)
+        conn.execute("BEGIN")
+    ensure_source_key(conn)
+    ensure_attribute_columns(conn)
+    ensure_schema(conn)
+    return {
+        "conn": conn,
+        "categories": dict(conn.execute("SELECT name, id FROM categories")),
+        "suppliers": {},
+        "productions": {},
+        "rows": [],
+        "updates": [],
+        "existing": None,
+        "seen": set(),
+        "now": datetime.now().isoformat(),
+        "batch_size": batch_size,
+        "count": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "retired": 0,
+        "started": time.perf_counter(),
+    }
+
+
+def category_id(loader, category_name):
+    """카테고리 ID (캐시 -> 이름에 포함된 카테고리 -> 새로 생성)
+
+    캐시 적중은 행마다 일어나므로 계측하지 않고 바로 돌려준다 (계측 비용이 조회보다 큼).
+    """
+    cat_id = loader["categories"].get(category_name)
+    if cat_id is not None:
+        return cat_id
+    with stage("category_lookup"):
+        return lookup_category(loader, category_name)
+
+
+def lookup_category(loader, category_name):
+    """category_id 본체"""
+    categories = loader["categories"]
+    if category_name in categories:
+        return categories[category_name]
+
+    # 예전 LIKE '%이름%' 조회와 같은 규칙
+    for name, cat_id in categories.items():
+        if category_name.lower() in name.lower():
+            categories[category_name] = cat_id
+            return cat_id
+
+    cat_id = str(uuid.uuid4())
+    now = datetime.now().isoformat()
+    loader["conn"].execute(
+        "INSERT INTO categories (id, name, slug, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?)",
+        (cat_id, category_name, category_name.lower(), now, now),
+    )
+    categories[category_name] = cat_id
+    return cat_id
+
+
+def supplier_id(loader, roles=("supplier", "admin")):
+    """상품을 등록할 공급자 ID (역할별로 한 번만 조회)"""
+    if roles not in loader["suppliers"]:
+        row = loader["conn"].execute(
+            f"SELECT id FROM users WHERE role IN ({', '.join('?' for _ in roles)}) LIMIT 1", roles
+        ).fetchone()
+        loader["suppliers"][roles] = row[0] if row else None
+    return loader["suppliers"][roles]
+
+
+def existing_products(loader):
+    """기존 상품 색인 (처음 필요할 때 한 번만 읽음)
+
+    keyed는 자연 키 -> (ID, 내용 해시, 상태), loose는 키 없이 예전 방식으로 시드된
+    상품의 제목 -> ID 리스트 (같은 제목이면 키를 붙여 그대로 이어 씀).
+    """
+    if loader["existing"] is None:
+        keyed, loose = {}, {}
+        rows = loader["conn"].execute(
+            'SELECT id, "sourceKey", title, description, images, categoryId, baseDailyPrice, status, '
+            'production, character, scene FROM products'
+        )
+        for product_id, key, title, description, images, cat_id, price, status, *attributes in rows:
+            if key:
+                digest = hash((title, description, images, cat_id, float(price), status, *attributes))
+                keyed[key] = (product_id, digest, status)
+            else:
+                loose.setdefault(title, []).append(product_id)
+        loader["existing"] = {"keyed": keyed, "loose": loose}
+    return loader["existing"]
+
+
+def add_product(loader, supplier, title, description, images, category_name, price, status="active", key=None,
+                production=None, character=None, scene=None, legacy_title=None):
+    """상품 한 행 추가 (배치가 차면 executemany) - 상품 ID 반환
+
+    images는 simple-array 형식 문자열 (쉼표 구분) 또는 URL 리스트.
+    production은 작품 기준 이름으로 통일해 저장한다 (production_name).
+    key(source_key)를 주면 같은 키의 기존 상품을 찾아 내용이 바뀐 경우만 갱신하고
+    기존 ID를 돌려준다. 키 없이 시드된 예전 상품은 제목으로 찾는데, 제목 형식이
+    바뀐 시드 스크립트는 예전 형식 제목을 legacy_title로 넘긴다.
+    """
+    if isinstance(images, (list, tuple)):
+        images = ",".join(images)
+    if production not in loader["productions"]:
+        loader["productions"][production] = production_name(production)
+    production = loader["productions"][production]
+    character = character or None
+    scene = scene or None
+
+    cat_id = category_id(loader, category_name)
+    now = loader["now"]
+
+    if key is not None:
+        existing = existing_products(loader)
+        # 같은 이미지를 쓰는 상품이 여럿이면 두 번째부터 #2, #3 ... (목록 순서 기준)
+        base, n = key, 1
+        while key in loader["seen"]:
+            n += 1
+            key = f"{base}#{n}"
+        loader["seen"].add(key)
+        digest = hash((title, description, images, cat_id, float(price), status, production, character, scene))
+        loose = existing["loose"].get(legacy_title or title)
+        if key not in existing["keyed"] and loose:
+            # 예전에 키 없이 시드된 상품은 키만 붙여 ID 유지 (내용은 아래에서 새 제목으로 갱신)
+            product_id = loose.pop(0)
+            loader["conn"].execute('UPDATE products SET "sourceKey" = ? WHERE id = ?', (key, product_id))
+            existing["keyed"][key] = (product_id, None, None)
+
+        if key in existing["keyed"]:
+            product_id, current, _ = existing["keyed"][key]
+            if current == digest:
+                loader["unchanged"] += 1
+                return product_id
+            existing["keyed"][key] = (product_id, digest, status)
+            loader["updates"].append((
+                title, description, images, cat_id, price, status, production, character, scene, now, product_id,
+            ))
+            if len(loader["updates"]) >= loader["batch_size"]:
+                flush_products(loader)
+            return product_id
+
+    product_id = new_id()
+    loader["rows"].append((
+        product_id, supplier, title, description, images,
+        cat_id, price, status, now, now, key,
+        production, character, scene,
+    ))
+    if key is not None:
+        existing["keyed"][key] = (product_id, digest, status)
+    if len(loader["rows"]) >= loader["batch_size"]:
+        flush_products(loader)
+    return product_id
+
+
+def retire_missing(loader, musical, pdf_path):
+    """이번 실행에서 다시 나오지 않은 PDF 상품을 비활성화 (삭제하지 않아 주문/장바구니 참조 유지)"""
+    prefix = source_key(musical, pdf_path, "", "")[:-1]
+    ids = [
+        product_id for key, (product_id, _, status) in existing_products(loader)["keyed"].items()
+        if key.startswith(prefix) and key not in loader["seen"] and status == "active"
+    ]
+    if ids:
+        now = datetime.now().isoformat()
+        loader["conn"].executemany(
+            "UPDATE products SET status = 'inactive', updatedAt = ? WHERE id = ?", [(now, i) for i in ids]
+        )
+        loader["retired"] += len(ids)
+    return len(ids)
+
+
+def flush_products(loader):
+    """쌓인 행을 executemany로 삽입/갱신하고 product_images(대표 이미지) 반영 (커밋하지 않음)
+
+    생성/수정 시각은 배치마다 한 번 잡는다 (행마다 datetime.now()를 부르지 않도록).
+    """
+    conn = loader["conn"]
+    if loader["rows"]:
+        with stage("insert", items=len(loader["rows"])):
+            conn.executemany(INSERT_PRODUCT, loader["rows"])
+        replace_images(conn, [(row[0], row[IMAGES_INDEX]) for row in loader["rows"]], ("images",), new=True)
+        loader["count"] += len(loader["rows"])
+        loader["rows"].clear()
+    if loader["updates"]:
+        with stage("update", items=len(loader["updates"])):
+            conn.executemany(UPDATE_PRODUCT, loader["updates"])
+        replace_images(conn, [(row[-1], row[2]) for row in loader["updates"]], ("images",))
+        loader["updated"] += len(loader["updates"])
+        loader["updates"].clear()
+    loader["now"] = datetime.now().isoformat()
+
+
+def finish_loader(loader, commit=True):
+    """남은 행 삽입 후 커밋 (또는 롤백)하고 적재 통계 반환"""
+    flush_products(loader)
+    if commit:
+        with stage("commit"):
+            loader["conn"].commit()
+    else:
+        loader["conn"].rollback()
+
+    elapsed = time.perf_counter() - loader["started"]
+    stats = {
+        "rows": loader["count"],
+        "updated": loader["updated"],
+        "unchanged": loader["unchanged"],
+        "retired": loader["retired"],
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(loader["count"] / elapsed) if elapsed > 0 else 0,
+    }
+    print(f"  적재: 상품 {stats['rows']}개, {stats['seconds']}초 ({stats['rows_per_sec']} rows/s)")
+    if loader["seen"] or loader["retired"]:
+        print(f"  갱신 {stats['updated']}개, 변경 없음 {stats['unchanged']}개, 비활성화 {stats['retired']}개")
+    return stats
+
+
+def load_synthetic(conn, count):
+    """합성 상품 카탈로그 적재 (적재 속도 측정용)"""
+    loader = open_loader(conn)
+    supplier = supplier_id(loader)
+    if not supplier:
+        raise RuntimeError("공급자(supplier/admin) 사용자가 없습니다")
+
+    categories = ["의상", "신발", "악세서리", "소품", "대도구"]
+    for i in range(count):
+        category = categories[i % len(categories)]
+        add_product(
+            loader, supplier,
+            f"[합성] {category} #{i}",
+            f"적재 테스트용 합성 상품 {i}",
+            f"{UPLOAD_URL}/synthetic/{i:06d}.jpeg",
+            category,
+            25000,
+        )
+    return finish_loader(loader)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 상품 카탈로그 일괄 적재 (속도 측정)")
+    parser.add_argument("--db", required=True, help="적재할 DB 경로 (운영 DB 복사본 권장, 기본 DB: %s)" % DB_PATH)
+    parser.add_argument("--count", type=int, default=100000, help="합성 상품 수")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        load_synthetic(conn, args.count)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+페이지 레이아웃 기반 이미지 <-> 캡션 매칭
+page.get_text("dict")의 텍스트 블록과 page.get_image_rects의 이미지 위치를 페이지당 한 번 읽어
+격자 공간 인덱스로 이미지마다 가장 가까운 캡션(캐릭터, 장면, 의상)을 붙인다
+"""
+
+import re
+
+from ingest_config import CAPTION_RULES
+
+# 캡션 구분자 (예: "스칼렛 / 바비큐 파티 / 초록 드레스")
+CAPTION_SEPARATORS = re.compile(r"\s*(?:/|\||·|:|\s-\s)\s*")
+
+# 페이지 번호, 쪽 표시 등 캡션이 아닌 텍스트
+NON_CAPTION = re.compile(r"^[\d\s.\-/()]*$")
+
+
+def text_blocks(page):
+    """페이지의 텍스트 블록 (사각형, 줄 목록)"""
+    blocks = []
+    for block in page.get_text("dict")["blocks"]:
+        if block["type"] != 0:
+            continue
+        lines = []
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                lines.append(text)
+        if lines and not NON_CAPTION.match(" ".join(lines)):
+            blocks.append({"rect": tuple(block["bbox"]), "lines": lines})
+    return blocks
+
+
+def parse_caption(lines):
+    """캡션 텍스트 -> 캐릭터/장면/의상
+
+    구분자로 나뉘면 (캐릭터, 장면, 의상) 순서, 구분자 없이 여러 줄이면
+    줄 순서를 그대로 쓴다. 한 조각뿐이면 의상 이름으로 본다.
+    """
+    text = " ".join(lines)
+    parts = [p for p in CAPTION_SEPARATORS.split(text) if p]
+    if len(parts) < 2 and len(lines) > 1:
+        parts = lines
+
+    caption = {"character": "", "scene": "", "costume": "", "text": text}
+    if len(parts) >= 3:
+        caption.update(character=parts[0], scene=parts[1], costume=" ".join(parts[2:]))
+    elif len(parts) == 2:
+        caption.update(character=parts[0], costume=parts[1])
+    elif parts:
+        caption.update(costume=parts[0])
+    return caption
+
+
+def build_grid(rects, cell):
+    """사각형 목록의 격자 공간 인덱스 (칸 -> 사각형 번호 목록)"""
+    grid = {}
+    for i, (x0, y0, x1, y1) in enumerate(rects):
+        for cx in range(int(x0 // cell), int(x1 // cell) + 1):
+            for cy in range(int(y0 // cell), int(y1 // cell) + 1):
+                grid.setdefault((cx, cy), []).append(i)
+    return grid
+
+
+def rect_gap(a, b):
+    """두 사각형 사이 거리와 가로로 겹치는지 여부"""
+    dx = max(b[0] - a[2], a[0] - b[2], 0)
+    dy = max(b[1] - a[3], a[1] - b[3], 0)
+    return (dx * dx + dy * dy) ** 0.5, dx == 0
+
+
+def nearest(grid, rects, rect, rules):
+    """rect에서 max_distance 안의 가장 가까운 사각형 번호 (없으면 None)
+
+    위/아래로 겹치는 캡션을 옆에 있는 캡션보다 우선한다 (side_penalty 배).
+    """
+    cell, reach = rules["cell"], rules["max_distance"]
+    candidates = set()
+    for cx in range(int((rect[0] - reach) // cell), int((rect[2] + reach) // cell) + 1):
+        for cy in range(int((rect[1] - reach) // cell), int((rect[3] + reach) // cell) + 1):
+            candidates.update(grid.get((cx, cy), ()))
+
+    best, best_score = None, None
+    for i in sorted(candidates):
+        gap, stacked = rect_gap(rect, rects[i])
+        if gap > reach:
+            continue
+        score = gap if stacked else gap * rules["side_penalty"]
+        if best_score is None or score < best_score:
+            best, best_score = i, score
+    return best
+
+
+def page_layout(page, images, rules=None):
+    """페이지 레이아웃을 한 번 읽어 xref -> {rect, caption} 매핑 생성
+
+    images는 page.get_images(full=True) 결과 (추출과 같은 목록을 재사용).
+    """
+    rules = rules or CAPTION_RULES
+    blocks = text_blocks(page)
+    rects = [b["rect"] for b in blocks]
+    grid = build_grid(rects, rules["cell"])
+
+    layout = {}
+    for img in images:
+        xref = img[0]
+        placements = page.get_image_rects(xref)
+        if not placements:
+            layout[xref] = {"rect": None, "caption": None}
+            continue
+
+        # 같은 이미지가 여러 번 배치되면 첫 배치 기준
+        rect = tuple(round(v, 1) for v in placements[0])
+        match = nearest(grid, rects, rect, rules)
+        layout[xref] = {
+            "rect": rect,
+            "caption": parse_caption(blocks[match]["lines"]) if match is not None else None,
+        }
+    return layout
+
+
+def caption_costumes(records):
+    """캡션이 붙은 추출 기록 -> seeder가 쓰는 의상 레코드 (페이지/이미지 순서)
+
+    image_index는 group_by_page와 같이 저장된 이미지만 센 페이지 안 순번이다
+    (수작업 의상 목록과 같은 기준이라 모드를 바꿔도 상품 자연 키가 그대로).
+    """
+    costumes = []
+    positions = {}
+    for record in records:
+        if not record["filename"]:
+            continue
+        position = positions.get(record["page"], 0)
+        positions[record["page"]] = position + 1
+        caption = record.get("caption")
+        if not caption or not caption["costume"]:
+            continue
+        costumes.append({
+            "character": caption["character"] or "공용",
+            "scene": caption["scene"],
+            "costume": caption["costume"],
+            "page": record["page"],
+            "image_index": position,
+            "filename": record["filename"],
+        })
+    return costumes
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+운영 DB 데이터 이전(data migration) 실행기
+products를 id 키셋 페이지로 읽고, 행 변환은 프로세스 풀에서, 쓰기는 페이지마다 짧은
+트랜잭션으로 나눠 대형 카탈로그에서도 DB를 오래 잠그지 않는다
+진행 위치(마지막 id)는 같은 트랜잭션에서 data_migrations 테이블에 기록하므로 중단해도 이어서 실행
+
+이전 하나는 MIGRATIONS에 이름 -> {columns, transform, description}으로 등록한다.
+transform은 프로세스 풀에서 돌도록 모듈 최상위 함수로: 컬럼 값 튜플 -> 바뀐 값 튜플 (그대로면 None)
+읽는 컬럼 중 일부만 쓰면 writes에 쓸 컬럼을, 컬럼/인덱스 준비가 필요하면 prepare(conn)를 함께 둔다.
+
+  python scripts/data_migration.py normalize-images --dry-run --diff diff.txt
+  python scripts/data_migration.py normalize-images
+"""
+
+import sys
+import argparse
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from ingest_config import DB_PATH
+from image_urls import CSV, parse_images, format_images
+from product_attributes import ATTRIBUTE_COLUMNS, fill_attributes, ensure_attribute_columns
+from db_session import apply_pragmas
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+# 한 페이지(트랜잭션 하나)에 읽는 행 수
+PAGE_SIZE = 500
+
+# 프로세스 풀 작업 하나에 넘기는 행 수
+CHUNK_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS "data_migrations" (
+    "name" varchar PRIMARY KEY NOT NULL,
+    "lastId" varchar NOT NULL DEFAULT '',
+    "scanned" integer NOT NULL DEFAULT 0,
+    "changed" integer NOT NULL DEFAULT 0,
+    "startedAt" datetime NOT NULL,
+    "updatedAt" datetime NOT NULL,
+    "finishedAt" datetime
+)
+"""
+
+
+def normalize_images(values):
+    """images / detailImages를 TypeORM simple-array(쉼표 구분) 형식으로
+
+    JSON 배열, 이중 인코딩, 중첩 JSON(예전 fix_image_urls.py가 고치던 형식)을 모두 풀어 쓴다.
+    URL 안에 쉼표가 있으면 simple-array로 표현할 수 없으므로 그 값은 그대로 둔다.
+    """
+    updated = []
+    for value in values:
+        urls, fmt = parse_images(value)
+        if value is None or (fmt == CSV and format_images(urls) == value) or any("," in url for url in urls):
+            updated.append(value)
+        else:
+            updated.append(format_images(urls) or None)
+    return tuple(updated) if tuple(updated) != tuple(values) else None
+
+
+MIGRATIONS = {
+    "normalize-images": {
+        "description": "상품 이미지 컬럼을 simple-array 형식으로 통일",
+        "columns": ("images", "detailImages"),
+        "transform": normalize_images,
+    },
+    "product-attributes": {
+        "description": "제목/설명에서 작품/캐릭터/장면 속성 채우기",
+        "columns": ("title", "description", *ATTRIBUTE_COLUMNS),
+        "writes": ATTRIBUTE_COLUMNS,
+        "transform": fill_attributes,
+        "prepare": ensure_attribute_columns,
+    },
+}
+
+
+def open_checkpoint(conn, name, restart=False):
+    """이전 진행 기록 (없거나 restart면 처음부터)"""
+    conn.execute(SCHEMA)
+    now = datetime.now().isoformat()
+    if restart:
+        conn.execute('DELETE FROM "data_migrations" WHERE "name" = ?', (name,))
+    conn.execute(
+        'INSERT OR IGNORE INTO "data_migrations" ("name", "startedAt", "updatedAt") VALUES (?, ?, ?)',
+        (name, now, now),
+    )
+    conn.commit()
+    row = conn.execute(
+        'SELECT "lastId", "scanned", "changed", "finishedAt" FROM "data_migrations" WHERE "name" = ?', (name,)
+    ).fetchone()
+    return {"name": name, "last_id": row[0], "scanned": row[1], "changed": row[2], "finished": row[3]}
+
+
+def transform_rows(transform, rows, picks=None):
+    """프로세스 풀 작업 하나 - [(id, 값...)] -> [(id, 기존 값, 새 값)] (바뀐 행만)
+
+    picks는 쓰는 컬럼의 읽은 값 위치 (기존 값도 쓰는 컬럼만 남김).
+    """
+    changed = []
+    for product_id, *values in rows:
+        updated = transform(tuple(values))
+        if updated is not None:
+            old = tuple(values[i] for i in picks) if picks is not None else tuple(values)
+            changed.append((product_id, old, updated))
+    return changed
+
+
+def iter_pages(conn, columns, last_id, page_size):
+    """products를 id 순서로 page_size씩 (id > last_id)"""
+    select = ", ".join(f'"{c}"' for c in columns)
+    while True:
+        rows = conn.execute(
+            f'SELECT "id", {select} FROM "products" WHERE "id" > ? ORDER BY "id" LIMIT ?', (last_id, page_size)
+        ).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+def write_diff(out, columns, changes):
+    """바뀔 행을 컬럼별 -/+ 줄로"""
+    for product_id, old, new in changes:
+        out.write(f"@@ {product_id}\n")
+        for column, before, after in zip(columns, old, new):
+            if before != after:
+                out.write(f"- {column}: {before}\n+ {column}: {after}\n")
+
+
+def run_migration(conn, name, page_size=PAGE_SIZE, workers=None, dry_run=False, diff=None, restart=False):
+    """등록된 이전 하나를 실행 (dry_run이면 쓰지 않고 diff만)
+
+    dry_run이면 스키마 준비(prepare)도 트랜잭션 안에서 하고 끝나면 롤백한다.
+    페이지마다 UPDATE와 진행 위치 기록을 한 트랜잭션으로 커밋한다.
+    workers=0이면 풀 없이 현재 프로세스에서 변환한다. 반환값은 진행 기록 dict.
+    """
+    migration = MIGRATIONS[name]
+    columns = migration["columns"]
+    writes = migration.get("writes", columns)
+    picks = [columns.index(c) for c in writes]
+    transform = migration["transform"]
+    if dry_run and not conn.in_transaction:
+        # sqlite3 모듈은 DDL 앞에서 트랜잭션을 열지 않으므로 직접 열어야 롤백된다
+        conn.execute("BEGIN")
+    if migration.get("prepare"):
+        migration["prepare"](conn)
+        if not dry_run:
+            conn.commit()
+    if dry_run:
+        # 진행 기록을 건드리지 않고 처음부터 훑는다
+        checkpoint = {"name": name, "last_id": "", "scanned": 0, "changed": 0, "finished": None}
+    else:
+        checkpoint = open_checkpoint(conn, name, restart)
+        if checkpoint["finished"]:
+            return checkpoint
+
+    assignments = ", ".join(f'"{c}" = ?' for c in writes)
+    update_sql = f'UPDATE "products" SET {assignments} WHERE "id" = ?'
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+    try:
+        for rows in iter_pages(conn, columns, checkpoint["last_id"], page_size):
+            with stage("transform", items=len(rows)):
+                if pool:
+                    chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+                    changes = [
+                        c for part in pool.map(transform_rows, [transform] * len(chunks), chunks, [picks] * len(chunks))
+                        for c in part
+                    ]
+                else:
+                    changes = transform_rows(transform, rows, picks)
+
+            checkpoint["scanned"] += len(rows)
+            checkpoint["changed"] += len(changes)
+            checkpoint["last_id"] = rows[-1][0]
+            if diff:
+                write_diff(diff, writes, changes)
+            if dry_run:
+                continue
+
+            with stage("update", items=len(changes)):
+                conn.executemany(update_sql, [(*new, product_id) for product_id, _, new in changes])
+                conn.execute(
+                    'UPDATE "data_migrations" SET "lastId" = ?, "scanned" = ?, "changed" = ?, "updatedAt" = ? '
+                    'WHERE "name" = ?',
+                    (checkpoint["last_id"], checkpoint["scanned"], checkpoint["changed"],
+                     datetime.now().isoformat(), name),
+                )
+            with stage("commit"):
+                conn.commit()
+    finally:
+        if pool:
+            pool.shutdown()
+        if dry_run:
+            conn.rollback()
+
+    if not dry_run:
+        checkpoint["finished"] = datetime.now().isoformat()
+        conn.execute('UPDATE "data_migrations" SET "finishedAt" = ? WHERE "name" = ?', (checkpoint["finished"], name))
+        conn.commit()
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 데이터 이전 (키셋 페이지, 이어서 실행 가능)")
+    parser.add_argument("migration", nargs="?", choices=list(MIGRATIONS), help="실행할 이전")
+    parser.add_argument("--list", action="store_true", help="등록된 이전과 진행 상황")
+    parser.add_argument("--dry-run", action="store_true", help="쓰지 않고 바뀔 행만 집계")
+    parser.add_argument("--diff", default=None, help="바뀔 행을 기록할 파일 ('-'면 표준 출력)")
+    parser.add_argument("--restart", action="store_true", help="진행 기록을 지우고 처음부터")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="트랜잭션 하나에 처리할 행 수")
+    parser.add_argument("--workers", type=int, default=None, help="변환 프로세스 수 (0: 풀 없이, 기본: CPU 코어 수)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    conn = sqlite3.connect(str(DB_PATH))
+    apply_pragmas(conn)
+    try:
+        if args.list or not args.migration:
+            conn.execute(SCHEMA)
+            progress = {row[0]: row[1:] for row in conn.execute(
+                'SELECT "name", "scanned", "changed", "finishedAt" FROM "data_migrations"'
+            )}
+            for name, migration in MIGRATIONS.items():
+                scanned, changed, finished = progress.get(name, (0, 0, None))
+                state = f"완료 {finished}" if finished else (f"진행 중 ({scanned}행)" if scanned else "미실행")
+                print(f"  {name:<20} {migration['description']} - {state}, 변경 {changed}행")
+            return
+
+        diff = None
+        if args.diff:
+            diff = sys.stdout if args.diff == "-" else open(args.diff, "w", encoding="utf-8")
+        try:
+            result = run_migration(conn, args.migration, args.page_size, args.workers,
+                                   args.dry_run, diff, args.restart)
+        finally:
+            if diff and diff is not sys.stdout:
+                diff.close()
+
+        label = "바뀔" if args.dry_run else "바뀐"
+        print(f"\n[{args.migration}] {result['scanned']}행 확인, {label} 행 {result['changed']}개"
+              + ("" if args.dry_run else f" (완료 {result['finished']})"))
+    finally:
+        conn.close()
+        write_run("data_migration", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
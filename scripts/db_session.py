@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Python 도구 공용 DB 세션
+긴 수명의 연결 하나로 준비된 문장(statement 캐시)을 재사용하고,
+갱신은 executemany로 묶어 chunk_size 행마다 한 번만 커밋
+"""
+
+import re
+import sqlite3
+
+from ingest_config import DB_PATH
+from ingest_metrics import stage
+
+# 대량 적재/갱신 중 SQLite 설정 (WAL, 커밋 시 fsync 최소화, 페이지 캐시 64MB)
+LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+}
+
+# 커밋 한 번에 묶는 갱신 행 수
+CHUNK_SIZE = 500
+
+# 상품 제목의 대괄호 태그 (예: "[나폴레옹] 나폴레옹 - 포병 군복")
+TITLE_TAG = re.compile(r"\[[^\]]+\]")
+
+
+def apply_pragmas(conn, pragmas=LOAD_PRAGMAS):
+    """적재용 PRAGMA 적용 (트랜잭션 밖에서 호출)"""
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def open_session(db_path=DB_PATH, chunk_size=CHUNK_SIZE, pragmas=LOAD_PRAGMAS):
+    """DB 세션 열기"""
+    conn = sqlite3.connect(str(db_path), cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    apply_pragmas(conn, pragmas)
+    return {
+        "conn": conn,
+        "chunk_size": chunk_size,
+        "pending": {},
+        "queued": 0,
+        "written": 0,
+        "commits": 0,
+    }
+
+
+def queue(session, sql, params):
+    """갱신 문장 하나를 대기열에 추가 (chunk_size가 차면 flush)"""
+    session["pending"].setdefault(sql, []).append(params)
+    session["queued"] += 1
+    if session["queued"] >= session["chunk_size"]:
+        flush(session)
+
+
+def flush(session):
+    """대기 중인 갱신을 문장별 executemany로 실행하고 한 번 커밋"""
+    if not session["queued"]:
+        return
+    conn = session["conn"]
+    for sql, rows in session["pending"].items():
+        with stage("update", items=len(rows)):
+            conn.executemany(sql, rows)
+    with stage("commit"):
+        conn.commit()
+    session["written"] += session["queued"]
+    session["commits"] += 1
+    session["pending"].clear()
+    session["queued"] = 0
+
+
+def close_session(session):
+    """남은 갱신을 반영하고 연결 닫기"""
+    try:
+        flush(session)
+    finally:
+        session["conn"].close()
+
+
+def product_index(session, status="active"):
+    """상품을 제목의 대괄호 태그별로 묶은 색인 (전체 상품을 한 번만 읽음)
+
+    반환값은 {"[나폴레옹]": [상품 dict, ...], ...}. 태그가 여러 개인 상품은
+    각 태그에 모두 들어간다.
+    """
+    index = {}
+    rows = session["conn"].execute(
+        "SELECT id, title, images FROM products WHERE status = ?", (status,)
+    )
+    for row in rows:
+        product = dict(row)
+        for tag in dict.fromkeys(TITLE_TAG.findall(product["title"])):
+            index.setdefault(tag, []).append(product)
+    return index
@@ -4,20 +4,21 @@ PDF 이미지 추출 및 시드 데이터 생성 스크립트
 무대장비 대여 플랫폼 - 바람사, 오캐롤, 나폴레옹, 에드거 앨런 포
 """
 
-import fitz  # PyMuPDF
 import os
 import json
+import argparse
 import sqlite3
-import uuid
-import hashlib
 from pathlib import Path
-from datetime import datetime
 
-# 경로 설정
-BASE_DIR = Path("c:/Users/parkm/stage-equipment-rental")
-SOURCE_DIR = BASE_DIR / "source"
-UPLOAD_DIR = BASE_DIR / "backend" / "uploads" / "products"
-DB_PATH = BASE_DIR / "backend" / "stage_rental.db"
+from ingest_config import SOURCE_DIR, UPLOAD_DIR, DB_PATH, UPLOAD_URL, MUSICAL_PDFS
+from pdf_ingest import build_jobs, iter_pdf_images, ingest
+from ingest_state import open_state, needs_seeding, mark_seeded
+from bulk_loader import open_loader, finish_loader, supplier_id, add_product, source_key, retire_missing
+from image_metadata import save_metadata
+from ingest_metrics import enable_trace, add_arguments, write_run
+
+# 매니페스트에서 이 스크립트의 상품 반영 기록을 구분하는 이름
+SEEDER = "extract_and_seed"
 
 # 업로드 디렉토리 생성
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -32,95 +33,13 @@ CATEGORIES = {
     "기타": "etc"
 }
 
-# 뮤지컬별 PDF 파일 매핑
-MUSICAL_PDFS = {
-    "바람사": [
-        "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST -주조연 (1).pdf",
-        "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST - FE (1).pdf",
-        "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST - ME.pdf",
-        "바람사 의상파트 바이블/바람사 신발 및 액세서리 PHOTO LIST.pdf",
-        "40. 바람_2016_소품 BIBLE_0129.pdf",
-    ],
-    "오캐롤": [
-        "오캐롤 의상파트 바이블/8.2017 오!캐롤 -신발 바이블.pdf",
-        "오캐롤 의상파트 바이블/7.2017 오!캐롤 -악세사리 바이블.pdf",
-    ],
-    "나폴레옹": [
-        "나폴레옹 의상 파트 바이블/2017 나폴레옹 신발 바이블.pdf",
-        "나폴레옹 의상 파트 바이블/2017 나폴레옹 악세서리 바이블.pdf",
-        "나폴레옹 의상 파트 바이블/2017 나폴레옹 캐릭터별 사진 리스트.pdf",
-    ],
-    "에드거앨런포": [
-        "포_2016_소품 BIBLE_0719.pdf",
-        "포 대도구.pdf",
-        "2016 사람별의상바이블.pdf",
-    ],
-}
-
-def get_category_id(conn, category_name):
-    """카테고리 ID 조회 또는 생성"""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM categories WHERE name LIKE ?", (f"%{category_name}%",))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
-
-    # 카테고리가 없으면 생성
-    cat_id = str(uuid.uuid4())
-    cursor.execute(
-        "INSERT INTO categories (id, name, slug, description, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?, ?)",
-        (cat_id, category_name, category_name.lower(), f"{category_name} 카테고리", datetime.now().isoformat(), datetime.now().isoformat())
-    )
-    return cat_id
-
-def get_supplier_id(conn):
-    """공급자 ID 조회"""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM users WHERE role = 'supplier' OR role = 'admin' LIMIT 1")
-    result = cursor.fetchone()
-    return result[0] if result else None
-
 def extract_images_from_pdf(pdf_path, output_dir, musical_name, prefix=""):
-    """PDF에서 이미지 추출"""
+    """PDF에서 이미지 추출 (메타데이터 필터 통과분만 저장)"""
     images = []
 
     try:
-        doc = fitz.open(pdf_path)
-        print(f"  처리 중: {pdf_path.name} ({len(doc)} 페이지)")
-
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            image_list = page.get_images()
-
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
-
-                try:
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-
-                    # 파일명 생성 (해시 기반)
-                    img_hash = hashlib.md5(image_bytes).hexdigest()[:12]
-                    filename = f"{musical_name}_{prefix}_p{page_num+1}_{img_index+1}_{img_hash}.{image_ext}"
-                    filepath = output_dir / filename
-
-                    # 이미지 저장
-                    with open(filepath, "wb") as f:
-                        f.write(image_bytes)
-
-                    images.append({
-                        "filename": filename,
-                        "path": str(filepath),
-                        "page": page_num + 1,
-                        "size": len(image_bytes),
-                        "ext": image_ext
-                    })
-
-                except Exception as e:
-                    print(f"    이미지 추출 실패 (페이지 {page_num+1}, 이미지 {img_index+1}): {e}")
-
-        doc.close()
+        print(f"  처리 중: {Path(pdf_path).name}")
+        images = [r for r in iter_pdf_images(pdf_path, output_dir, musical_name) if r["filename"]]
         print(f"    추출된 이미지: {len(images)}개")
 
     except Exception as e:
@@ -146,21 +65,18 @@ def determine_category(filename, content_hint=""):
     else:
         return "의상"  # 기본값
 
-def create_product_from_image(conn, image_info, musical_name, category_name, supplier_id):
-    """이미지로부터 상품 생성"""
-    cursor = conn.cursor()
-
-    # 카테고리 ID 조회
-    category_id = get_category_id(conn, category_name)
-
-    # 상품 ID 생성
-    product_id = str(uuid.uuid4())
-
+def create_product_from_image(loader, image_info, musical_name, category_name, supplier_id, pdf_path):
+    """이미지로부터 상품 생성 또는 갱신 (PDF/페이지/이미지 순번이 같은 기존 상품은 ID 유지)"""
     # 이미지 URL 생성
-    image_url = f"http://localhost:3001/uploads/products/{image_info['filename']}"
+    image_url = f"{UPLOAD_URL}/{image_info['filename']}"
 
     # 상품 제목 생성
-    title = f"{musical_name} - {category_name} #{image_info['page']}-{image_info['filename'][:8]}"
+    title = f"{musical_name} - {category_name} #{image_info['page']}-{image_info['hash'][:8]}"
+
+    # 해시 저장소 이전의 제목 (파일명 앞 8글자) - 키 없이 시드된 예전 상품을 이어 쓰기 위해
+    prefix = Path(pdf_path).stem[:20].replace(" ", "_")
+    legacy_name = f"{musical_name}_{prefix}_p{image_info['page']}_{image_info['index'] + 1}_"
+    legacy_title = f"{musical_name} - {category_name} #{image_info['page']}-{legacy_name[:8]}"
 
     # 상품 설명
     description = f"뮤지컬 '{musical_name}'에서 사용된 {category_name}입니다. PDF 페이지 {image_info['page']}에서 추출됨."
@@ -175,28 +91,18 @@ def create_product_from_image(conn, image_info, musical_name, category_name, sup
     }
     base_price = price_map.get(category_name, 25000)
 
-    now = datetime.now().isoformat()
-
-    cursor.execute("""
-        INSERT INTO products (id, supplierId, title, description, images, categoryId, baseDailyPrice, status, createdAt, updatedAt)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        product_id,
-        supplier_id,
-        title,
-        description,
-        image_url,  # simple-array 형식 (쉼표 구분)
-        category_id,
-        base_price,
-        "active",
-        now,
-        now
-    ))
-
-    return product_id
-
-def process_musical(conn, musical_name, pdf_files, supplier_id):
-    """뮤지컬별 PDF 처리"""
+    # images는 simple-array 형식 (쉼표 구분)
+    key = source_key(musical_name, pdf_path, image_info["page"], image_info["index"])
+    return add_product(loader, supplier_id, title, description, image_url, category_name, base_price, key=key,
+                       production=musical_name, legacy_title=legacy_title)
+
+def process_musical(loader, musical_name, pdf_files, supplier_id, extracted, pending, canonical=None, used=None):
+    """뮤지컬별 추출 결과로 상품 생성 (pending에 있는 변경된 PDF만)
+
+    canonical(콘텐츠 해시 -> 대표 해시)을 넘기면 같은 사진(근사 중복 포함)은
+    대표 이미지로 상품 하나만 만든다 (대표가 변경 없는 PDF에 있어도 그 파일로).
+    used는 이번 실행에서 상품이 된 대표 해시 집합.
+    """
     print(f"\n{'='*60}")
     print(f"뮤지컬: {musical_name}")
     print(f"{'='*60}")
@@ -204,6 +110,11 @@ def process_musical(conn, musical_name, pdf_files, supplier_id):
     total_images = 0
     total_products = 0
 
+    # 콘텐츠 해시 -> 저장된 기록 (클러스터 대표의 파일을 찾기 위해 모든 PDF에서)
+    stored = {}
+    if canonical is not None:
+        stored = {r["hash"]: r for records in extracted.values() for r in records if r["filename"]}
+
     for pdf_file in pdf_files:
         pdf_path = SOURCE_DIR / pdf_file
 
@@ -211,42 +122,72 @@ def process_musical(conn, musical_name, pdf_files, supplier_id):
             print(f"  파일 없음: {pdf_file}")
             continue
 
+        if str(pdf_path) not in pending:
+            print(f"  {pdf_path.name}: 변경 없음, 건너뜀")
+            continue
+
         # 카테고리 결정
         category_name = determine_category(pdf_file)
 
-        # 이미지 추출
-        prefix = pdf_path.stem[:20].replace(" ", "_")
-        images = extract_images_from_pdf(pdf_path, UPLOAD_DIR, musical_name, prefix)
+        # 추출 결과 중 저장된 이미지만 (메타데이터 필터 통과분)
+        images = [r for r in extracted.get(str(pdf_path), []) if r["filename"]]
         total_images += len(images)
+        print(f"  {pdf_path.name}: 이미지 {len(images)}개")
 
-        # 상품 생성 (큰 이미지만 - 최소 5KB 이상)
         for img in images:
-            if img["size"] > 5000:  # 5KB 이상만
-                try:
-                    create_product_from_image(conn, img, musical_name, category_name, supplier_id)
-                    total_products += 1
-                except Exception as e:
-                    print(f"    상품 생성 실패: {e}")
+            key = None
+            if canonical is not None:
+                key = canonical.get(img["hash"], img["hash"])
+                if key in used:
+                    continue
+                # 대표 이미지로 상품을 만든다 (자연 키는 이 PDF의 페이지/순번 그대로)
+                representative = stored.get(key)
+                if representative is not None:
+                    img = {**img, "hash": representative["hash"], "filename": representative["filename"]}
+
+            try:
+                create_product_from_image(loader, img, musical_name, category_name, supplier_id, pdf_path)
+                total_products += 1
+            except Exception as e:
+                print(f"    상품 생성 실패: {e}")
+                continue
+            if key is not None:
+                used.add(key)
+
+        retired = retire_missing(loader, musical_name, pdf_path)
+        if retired:
+            print(f"    PDF에서 사라진 상품 {retired}개 비활성화")
 
     print(f"\n  결과: 이미지 {total_images}개 추출, 상품 {total_products}개 생성")
     return total_products
 
 def main():
+    parser = argparse.ArgumentParser(description="PDF 이미지 추출 및 시드 데이터 생성")
+    parser.add_argument("--full", action="store_true", help="PDF 변경 여부와 관계없이 전체 상품 생성")
+    parser.add_argument("--collapse-duplicates", action="store_true", help="근사 중복 이미지는 상품 하나로 합침")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
     print("=" * 70)
     print("무대장비 대여 플랫폼 - PDF 이미지 추출 및 시드 데이터 생성")
     print("=" * 70)
 
     # 데이터베이스 연결
     conn = sqlite3.connect(DB_PATH)
+    state = open_state()
 
     try:
+        # 상품 적재 전체를 한 트랜잭션으로 (카테고리/공급자는 캐시)
+        loader = open_loader(conn)
+
         # 공급자 ID 조회
-        supplier_id = get_supplier_id(conn)
-        if not supplier_id:
+        supplier = supplier_id(loader)
+        if not supplier:
             print("오류: 공급자를 찾을 수 없습니다.")
             return
 
-        print(f"공급자 ID: {supplier_id}")
+        print(f"공급자 ID: {supplier}")
 
         # 기존 상품 개수 확인
         cursor = conn.cursor()
@@ -254,15 +195,36 @@ def main():
         before_count = cursor.fetchone()[0]
         print(f"기존 상품 수: {before_count}개")
 
+        # 전체 PDF를 페이지 샤드 단위로 병렬 추출 (변경 없는 PDF/페이지는 건너뜀)
+        jobs = build_jobs(MUSICAL_PDFS)
+        extracted = ingest(jobs, UPLOAD_DIR, state=state)
+        save_metadata(conn, [r for records in extracted.values() for r in records])
+        pending = {
+            job["path"] for job in jobs
+            if os.path.exists(job["path"]) and (args.full or needs_seeding(state, SEEDER, job["path"]))
+        }
+        print(f"상품 반영이 필요한 PDF: {len(pending)}개")
+
+        canonical = None
+        if args.collapse_duplicates:
+            # 지각 해시 인덱스 갱신 (새 이미지만 계산) 후 중복 클러스터 대표로 매핑
+            from image_phash import collapse_records
+
+            canonical = collapse_records(state, [r for records in extracted.values() for r in records])
+            print(f"근사 중복 이미지: {len(canonical)}개 (클러스터 대표로 합침)")
+
         total_new_products = 0
+        used = set()
 
         # 각 뮤지컬 처리
         for musical_name, pdf_files in MUSICAL_PDFS.items():
-            products = process_musical(conn, musical_name, pdf_files, supplier_id)
+            products = process_musical(loader, musical_name, pdf_files, supplier, extracted, pending,
+                                       canonical, used)
             total_new_products += products
 
-        # 커밋
-        conn.commit()
+        # 커밋 후 반영 완료 기록
+        finish_loader(loader)
+        mark_seeded(state, SEEDER, pending)
 
         # 최종 결과
         cursor.execute("SELECT COUNT(*) FROM products")
@@ -279,6 +241,8 @@ def main():
         conn.rollback()
     finally:
         conn.close()
+        state.close()
+        write_run(SEEDER, args.metrics, args.trace)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+고아 업로드 파일 정리
+uploads 트리를 os.scandir로 훑어 어느 업로드 URL 컬럼(상품 이미지, 자산 사진, 분쟁 증빙 사진,
+대표 이미지 목록, 알림 링크)도 참조하지 않는 파일을 찾아 격리(기본) 또는 삭제. --dry-run이면 보고만 한다
+참조 중인 원본의 변형(image_variants)은 살리고, 고아 원본의 변형 기록은 함께 지운다
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from ingest_config import DB_PATH, UPLOADS_ROOT, QUARANTINE_DIR
+from image_urls import UPLOAD_COLUMNS, referenced_relpaths
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+# 업로드 URL이 들어 있는 컬럼 (테이블 -> 컬럼) - URL 목록 컬럼과 URL 하나짜리 컬럼
+# 여기 없는 컬럼이 참조하는 파일은 고아로 보고 지우므로 새 업로드 컬럼은 반드시 추가
+REFERENCE_COLUMNS = {
+    **UPLOAD_COLUMNS,
+    "product_images": ("url",),
+    "notifications": ("linkUrl",),
+}
+
+# 한 번에 격리/삭제하는 파일 수
+BATCH_SIZE = 500
+
+# 이보다 최근에 바뀐 파일은 건드리지 않음 (추출 직후 아직 상품에 연결되기 전)
+MIN_AGE_HOURS = 24
+
+
+def table_columns(conn, table):
+    """테이블의 컬럼 이름 집합 (테이블이 없으면 빈 집합)"""
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def referenced_paths(conn):
+    """DB가 참조하는 uploads 상대 경로 집합과 고아가 된 변형 원본 목록
+
+    테이블마다 참조 컬럼을 한 번의 SELECT로 훑는다 (컬럼 값 형식과 무관).
+    """
+    refs = set()
+    with stage("references"):
+        for table, columns in REFERENCE_COLUMNS.items():
+            present = [c for c in columns if c in table_columns(conn, table)]
+            if not present:
+                continue
+            select = ", ".join(f'"{c}"' for c in present)
+            for row in conn.execute(f'SELECT {select} FROM "{table}"'):
+                for value in row:
+                    refs.update(referenced_relpaths(value))
+
+        stale_sources = set()
+        if table_columns(conn, "image_variants"):
+            for source, url in conn.execute('SELECT "sourcePath", "url" FROM "image_variants"'):
+                if source in refs:
+                    refs.update(referenced_relpaths(url))
+                else:
+                    stale_sources.add(source)
+
+    return refs, sorted(stale_sources)
+
+
+def scan_uploads(root=UPLOADS_ROOT):
+    """uploads 트리의 파일 (상대 경로, 크기, 수정시각) - 임시/숨김 파일 제외"""
+    root = os.path.abspath(root)
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.name[0] == ".":
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    yield os.path.relpath(entry.path, root).replace(os.sep, "/"), st.st_size, st.st_mtime
+
+
+def find_orphans(refs, root=UPLOADS_ROOT, min_age_hours=MIN_AGE_HOURS):
+    """참조되지 않고 충분히 오래된 파일 목록과 훑은 파일 수"""
+    cutoff = time.time() - min_age_hours * 3600
+    orphans = []
+    scanned = 0
+    with stage("scan"):
+        for relpath, size, mtime in scan_uploads(root):
+            scanned += 1
+            if relpath not in refs and mtime < cutoff:
+                orphans.append((relpath, size))
+    return orphans, scanned
+
+
+def move_file(src, dst):
+    """파일 이동 (다른 드라이브면 복사 후 삭제)"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.move(str(src), str(dst))
+
+
+def prune_dirs(root, relpaths):
+    """파일을 옮긴 뒤 빈 샤드 디렉토리 정리 (uploads 루트는 남김)"""
+    root = Path(root)
+    for parent in sorted({Path(p).parent for p in relpaths}, key=lambda p: len(p.parts), reverse=True):
+        while parent.parts:
+            try:
+                (root / parent).rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+
+def collect(orphans, root=UPLOADS_ROOT, quarantine=None, batch_size=BATCH_SIZE):
+    """고아 파일을 batch_size씩 격리(quarantine 디렉토리로 이동) 또는 삭제
+
+    반환값은 (처리한 파일 수, 회수한 바이트).
+    """
+    files = 0
+    reclaimed = 0
+    for start in range(0, len(orphans), batch_size):
+        batch = orphans[start:start + batch_size]
+        with stage("quarantine" if quarantine else "delete", sum(size for _, size in batch), len(batch)):
+            for relpath, size in batch:
+                src = Path(root) / relpath
+                try:
+                    if quarantine:
+                        move_file(src, Path(quarantine) / relpath)
+                    else:
+                        os.remove(src)
+                except FileNotFoundError:
+                    continue
+                files += 1
+                reclaimed += size
+            prune_dirs(root, [relpath for relpath, _ in batch])
+        print(f"  {min(start + batch_size, len(orphans))}/{len(orphans)} 처리")
+    return files, reclaimed
+
+
+def drop_variant_rows(conn, sources, batch_size=BATCH_SIZE):
+    """고아 원본의 image_variants 기록 삭제"""
+    for start in range(0, len(sources), batch_size):
+        conn.executemany(
+            'DELETE FROM "image_variants" WHERE "sourcePath" = ?', [(s,) for s in sources[start:start + batch_size]]
+        )
+        conn.commit()
+
+
+def report(orphans, scanned, refs):
+    """최상위 디렉토리별 고아 파일 수/용량"""
+    by_dir = {}
+    for relpath, size in orphans:
+        top = relpath.split("/", 1)[0] if "/" in relpath else "."
+        count, total = by_dir.get(top, (0, 0))
+        by_dir[top] = (count + 1, total + size)
+    return {
+        "scanned": scanned,
+        "referenced": len(refs),
+        "orphans": len(orphans),
+        "bytes": sum(size for _, size in orphans),
+        "by_dir": {d: {"files": c, "bytes": b} for d, (c, b) in sorted(by_dir.items())},
+    }
+
+
+def format_bytes(n):
+    """사람이 읽기 쉬운 용량"""
+    if n < 1024:
+        return f"{n}B"
+    for unit in ("KB", "MB", "GB"):
+        n /= 1024
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f}{unit}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참조되지 않는 업로드 파일 정리")
+    parser.add_argument("--dry-run", action="store_true", help="옮기거나 지우지 않고 보고만")
+    parser.add_argument("--delete", action="store_true", help="격리하지 않고 바로 삭제")
+    parser.add_argument("--min-age-hours", type=float, default=MIN_AGE_HOURS,
+                        help="이보다 최근에 바뀐 파일은 건너뜀")
+    parser.add_argument("--report", default=None, help="고아 파일 목록을 JSON으로 저장할 경로")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    print("=" * 60)
+    print("고아 업로드 파일 정리" + (" (dry-run)" if args.dry_run else ""))
+    print("=" * 60)
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        refs, stale_sources = referenced_paths(conn)
+        orphans, scanned = find_orphans(refs, min_age_hours=args.min_age_hours)
+        summary = report(orphans, scanned, refs)
+
+        print(f"\n파일 {summary['scanned']}개 중 참조 {summary['referenced']}개")
+        print(f"고아 파일: {summary['orphans']}개 ({format_bytes(summary['bytes'])})")
+        for top, stats in summary["by_dir"].items():
+            print(f"  {top:<20} {stats['files']:>8}개 {format_bytes(stats['bytes']):>10}")
+
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump({**summary, "files": [p for p, _ in orphans]}, f, ensure_ascii=False, indent=2)
+
+        if args.dry_run or not orphans:
+            return
+
+        quarantine = None
+        if not args.delete:
+            quarantine = QUARANTINE_DIR / datetime.now().strftime("%Y%m%d-%H%M%S")
+        files, reclaimed = collect(orphans, quarantine=quarantine)
+        orphan_paths = {p for p, _ in orphans}
+        drop_variant_rows(conn, [s for s in stale_sources if s in orphan_paths])
+
+        where = f"격리 -> {quarantine}" if quarantine else "삭제"
+        print(f"\n{files}개 {where}, {format_bytes(reclaimed)} 회수")
+    finally:
+        conn.close()
+        write_run("gc_uploads", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
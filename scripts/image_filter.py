@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+디코딩 전 이미지 메타데이터 필터
+page.get_images(full=True)의 크기/비트심도/필터/마스크 정보만으로
+아이콘, 로고, 괘선 등을 걸러 extract_image 호출 자체를 줄인다
+"""
+
+from ingest_config import IMAGE_FILTER_RULES
+
+# 1bpc 흑백 전용 압축 필터 (글리프, 스캔 선화)
+BILEVEL_FILTERS = {"JBIG2Decode", "CCITTFaxDecode"}
+
+
+def image_info(img):
+    """get_images(full=True) 항목을 딕셔너리로 변환
+
+    항목 형식: (xref, smask, width, height, bpc, colorspace, alt_colorspace, name, filter, referencer)
+    """
+    return {
+        "xref": img[0],
+        "smask": img[1],
+        "width": img[2],
+        "height": img[3],
+        "bpc": img[4],
+        "colorspace": img[5],
+        "filter": img[8],
+    }
+
+
+def check_image(info, rules=None):
+    """메타데이터 규칙 검사 - 통과하면 None, 아니면 제외 사유 반환"""
+    rules = rules or IMAGE_FILTER_RULES
+    width, height = info["width"], info["height"]
+
+    if min(width, height) < rules["min_side"]:
+        return "too_small"
+    if width * height < rules["min_area"]:
+        return "small_area"
+    if max(width, height) / max(min(width, height), 1) > rules["max_aspect"]:
+        return "aspect"
+    if rules["reject_bilevel"] and (info["bpc"] == 1 or info["filter"] in BILEVEL_FILTERS):
+        return "bilevel"
+    if rules["reject_masked"] and info["smask"]:
+        return "masked"
+    return None
+
+
+def rules_key(rules=None):
+    """매니페스트 옵션 구분용 규칙 문자열"""
+    rules = rules or IMAGE_FILTER_RULES
+    return ",".join(f"{k}={rules[k]}" for k in sorted(rules))
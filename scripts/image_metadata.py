@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+상품 이미지 메타데이터 (크기, 용량, 흐린 미리보기, 대표 색)
+프론트엔드가 다운로드 전에 자리를 잡을 수 있도록 image_metadata 테이블에 기록
+(ProductsService.findAll/findOne에서 반환)
+추출 직후 새로 저장된 파일(save_metadata)과 기존 uploads 트리(main())를 같은 프로세스 풀로 채운다
+"""
+
+import io
+import os
+import base64
+import argparse
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageFilter
+
+from ingest_config import DB_PATH, UPLOADS_ROOT, VARIANT_DIR
+from image_store import file_digest
+from image_variants import scan_sources, source_relpath
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+# 미리보기 가로/세로 최대 픽셀 (data URI로 응답에 그대로 실림)
+PLACEHOLDER_SIZE = 16
+
+# 대표 색 계산용 축소 크기와 채널당 양자화 비트
+SAMPLE_SIZE = 32
+COLOR_BITS = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS "image_metadata" (
+    "sourcePath" varchar PRIMARY KEY NOT NULL,
+    "contentHash" varchar NOT NULL,
+    "width" integer NOT NULL,
+    "height" integer NOT NULL,
+    "bytes" integer NOT NULL,
+    "placeholder" text NOT NULL,
+    "dominantColor" varchar NOT NULL,
+    "createdAt" datetime NOT NULL DEFAULT (datetime('now'))
+)
+"""
+
+UPSERT = """
+INSERT OR REPLACE INTO "image_metadata"
+    ("sourcePath", "contentHash", "width", "height", "bytes", "placeholder", "dominantColor")
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def dominant_color(img):
+    """RGB 이미지에서 가장 많은 양자화 색 구간의 평균색 (#rrggbb)"""
+    # numpy는 풀 워커에서만 필요하다 (save_metadata만 쓰는 시드 스크립트는 불러오지 않음)
+    import numpy as np
+
+    pixels = np.asarray(img).reshape(-1, 3)
+    bins = (pixels >> (8 - COLOR_BITS)).astype(np.int32)
+    keys = (bins[:, 0] << (2 * COLOR_BITS)) | (bins[:, 1] << COLOR_BITS) | bins[:, 2]
+    top = np.bincount(keys).argmax()
+    r, g, b = pixels[keys == top].mean(axis=0).round().astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def describe_image(path):
+    """이미지 파일 하나의 메타데이터 - 프로세스 풀 워커
+
+    디코딩은 한 번만: SAMPLE_SIZE로 줄인 이미지(JPEG는 축소 디코딩)로 대표 색과
+    미리보기를 함께 만든다. 원본 크기의 RGB 사본은 만들지 않는다.
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+        img.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE))
+        sample = img.convert("RGB")
+
+    tiny = sample.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    out = io.BytesIO()
+    tiny.filter(ImageFilter.GaussianBlur(1)).save(out, "JPEG", quality=50)
+
+    return {
+        "width": width,
+        "height": height,
+        "bytes": os.path.getsize(path),
+        "placeholder": "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode("ascii"),
+        "dominantColor": dominant_color(sample),
+    }
+
+
+def describe_source(path):
+    """backfill 워커 - (콘텐츠 해시, 메타데이터), 읽지 못하면 메타데이터 None"""
+    try:
+        return file_digest(path), describe_image(path)
+    except (OSError, ValueError):
+        return None, None
+
+
+def metadata_row(source, digest, meta):
+    """UPSERT 파라미터"""
+    return (source, digest, meta["width"], meta["height"], meta["bytes"], meta["placeholder"], meta["dominantColor"])
+
+
+def pending_paths(conn, paths):
+    """아직 image_metadata에 없는 경로 (중복 제거, 순서 유지)"""
+    conn.execute(SCHEMA)
+    done = {row[0] for row in conn.execute('SELECT "sourcePath" FROM "image_metadata"')}
+    return [p for p in dict.fromkeys(str(p) for p in paths) if source_relpath(p) not in done]
+
+
+def describe_rows(paths, workers=None):
+    """경로들의 UPSERT 파라미터를 프로세스 풀에서 계산 (읽지 못한 이미지는 출력만 하고 건너뜀)"""
+    with stage("describe", items=len(paths)), ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, (digest, meta) in zip(paths, pool.map(describe_source, paths, chunksize=32)):
+            if meta is None:
+                print(f"  읽기 실패: {path}")
+                continue
+            yield metadata_row(source_relpath(path), digest, meta)
+
+
+def save_metadata(conn, records, workers=None):
+    """추출 기록 중 메타데이터가 없는 저장 파일을 계산해 image_metadata에 기록 (커밋은 호출한 쪽에서)
+
+    추출 쓰기 스레드를 막지 않도록 추출이 끝난 뒤 한 번에 프로세스 풀로 계산한다.
+    이미 기록된 파일(중복 이미지)과 uploads 밖에 저장된 기록은 건너뛴다.
+    반환값은 새로 기록한 이미지 수.
+    """
+    paths = []
+    for r in records:
+        if not r.get("path"):
+            continue
+        try:
+            source_relpath(r["path"])
+        except ValueError:
+            continue
+        paths.append(r["path"])
+
+    pending = pending_paths(conn, paths)
+    if not pending:
+        return 0
+    rows = list(describe_rows(pending, workers))
+    conn.executemany(UPSERT, rows)
+    return len(rows)
+
+
+def backfill_metadata(conn, paths, workers=None, batch_size=500):
+    """기록이 없는 이미지들의 메타데이터를 병렬 계산해 image_metadata에 기록
+
+    batch_size행마다 커밋한다. 반환값은 새로 기록한 이미지 수.
+    """
+    pending = pending_paths(conn, paths)
+    if not pending:
+        return 0
+
+    rows = []
+    written = 0
+
+    def flush():
+        conn.executemany(UPSERT, rows)
+        conn.commit()
+        rows.clear()
+
+    for row in describe_rows(pending, workers):
+        rows.append(row)
+        written += 1
+        if len(rows) >= batch_size:
+            flush()
+
+    flush()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 이미지 메타데이터(크기, 미리보기, 대표 색) 채우기")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    print("=" * 60)
+    print("상품 이미지 메타데이터 채우기")
+    print("=" * 60)
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        count = backfill_metadata(conn, scan_sources(UPLOADS_ROOT, VARIANT_DIR), args.workers)
+        print(f"\n이미지 {count}개 기록")
+    finally:
+        conn.close()
+        write_run("image_metadata", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+웹 호환 이미지 포맷 정규화
+PDF가 담고 있는 그대로 추출된 JPX/JBIG2/TIFF, CMYK JPEG 등을 sRGB JPEG/WebP로 변환
+결과는 원본 콘텐츠 해시 이름으로 저장소에 두므로 같은 원본은 한 번만 변환된다 (파일이 곧 캐시)
+추출 중에는 pdf_ingest 쓰기 단계에서, 이미 저장된 파일은 main()에서 프로세스 풀로 일괄 변환
+"""
+
+import io
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ingest_config import DB_PATH, UPLOADS_ROOT, UPLOAD_DIR, NORMALIZE_RULES
+from image_store import image_digest, store_image, store_relpath, is_store_path
+from db_session import open_session, close_session
+from migrate_uploads import rewrite_urls
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+# PIL 저장 포맷 이름
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+# JPEG 저장 시 투명 영역을 채울 배경색
+BACKGROUND = (255, 255, 255)
+
+
+def normalize_key(rules=None):
+    """정규화 규칙을 매니페스트 옵션 문자열로 (규칙이 바뀌면 다시 추출)"""
+    rules = rules or NORMALIZE_RULES
+    return f"{rules['format']}:{rules['quality']}:{','.join(sorted(rules['keep_exts']))}"
+
+
+def needs_normalizing(ext, colorspace=None, rules=None):
+    """브라우저에 그대로 내보내면 안 되는 이미지인지 (포맷 또는 CMYK 색공간)"""
+    rules = rules or NORMALIZE_RULES
+    return ext not in rules["keep_exts"] or colorspace == 4
+
+
+def to_srgb(img):
+    """임베디드 ICC 프로파일이 있으면 sRGB로 변환, 없으면 RGB/RGBA로만 변환"""
+    from PIL import ImageCms
+
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+    mode = "RGBA" if has_alpha else "RGB"
+    icc = img.info.get("icc_profile")
+    if icc and img.mode in ("RGB", "RGBA", "CMYK", "L"):
+        try:
+            src = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+            dst = ImageCms.createProfile("sRGB")
+            return ImageCms.profileToProfile(img, src, dst, outputMode="RGBA" if img.mode == "RGBA" else "RGB")
+        except (ImageCms.PyCMSError, OSError):
+            pass
+    return img.convert(mode) if img.mode != mode else img
+
+
+def normalize_image(image_bytes, rules=None):
+    """이미지 바이트 -> sRGB JPEG/WebP 바이트 (EXIF/ICC 등 메타데이터는 쓰지 않음)"""
+    from PIL import Image
+
+    rules = rules or NORMALIZE_RULES
+    fmt = rules["format"]
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img.load()
+        img = to_srgb(img)
+        if img.mode == "RGBA" and fmt == "jpeg":
+            flat = Image.new("RGB", img.size, BACKGROUND)
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+
+        out = io.BytesIO()
+        options = {"quality": rules["quality"]}
+        if fmt == "jpeg":
+            options.update(optimize=True, progressive=True)
+        img.save(out, PIL_FORMATS[fmt], **options)
+        return out.getvalue()
+
+
+def store_web_image(root, image_bytes, ext, colorspace=None, rules=None):
+    """이미지를 웹 호환 포맷으로 저장소에 저장 - pdf_ingest 쓰기 스레드에서 호출
+
+    반환값은 (원본 해시, 상대 경로, 새로 썼는지 여부, 저장 포맷). 변환 대상이면
+    원본 해시 이름의 변환 파일이 이미 있을 때 디코딩/인코딩을 건너뛴다.
+    변환에 실패하면 원본 바이트를 그대로 저장한다.
+    """
+    rules = rules or NORMALIZE_RULES
+    with stage("hash", len(image_bytes)):
+        digest = image_digest(image_bytes)
+    if not needs_normalizing(ext, colorspace, rules):
+        return (*store_image(root, image_bytes, ext, digest), ext)
+
+    target = rules["format"]
+    relpath = store_relpath(digest, target)
+    if (Path(root) / relpath).exists():
+        return digest, relpath, False, target
+
+    try:
+        with stage("normalize", len(image_bytes)):
+            data = normalize_image(image_bytes, rules)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"    포맷 변환 실패 ({ext}): {e} - 원본 저장")
+        return (*store_image(root, image_bytes, ext, digest), ext)
+    return (*store_image(root, data, target, digest), target)
+
+
+def normalize_file(path, rules=None):
+    """저장소 파일 하나를 변환 - 프로세스 풀 워커
+
+    변환했으면 (기존 상대 경로, 새 상대 경로, 줄어든 바이트), 대상이 아니거나 읽지 못하면 None.
+    같은 해시 이름으로 쓰므로 포맷이 같으면(CMYK JPEG) 제자리에서 교체된다.
+    """
+    from PIL import Image
+
+    rules = rules or NORMALIZE_RULES
+    path = Path(path)
+    ext = path.suffix[1:].lower()
+    try:
+        # 깨진 파일 하나가 풀 전체를 멈추지 않도록 열기부터 건너뜀 대상
+        if ext in rules["keep_exts"]:
+            with Image.open(path) as img:
+                if img.mode != "CMYK":
+                    return None
+        data = path.read_bytes()
+        normalized = normalize_image(data, rules)
+    except (OSError, ValueError) as e:
+        print(f"  변환 실패 {path.name}: {e}")
+        return None
+
+    root = path.parent.parent.parent
+    target = root / store_relpath(path.stem, rules["format"])
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(normalized)
+    os.replace(tmp_path, target)
+    return path.relative_to(root).as_posix(), target.relative_to(root).as_posix(), len(data) - len(normalized)
+
+
+def scan_store(root=UPLOAD_DIR):
+    """저장소(ab/cd/<해시>.ext) 파일 경로"""
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif is_store_path(entry.path):
+                    yield entry.path
+
+
+def normalize_store(paths, workers=None, rules=None):
+    """저장소 파일들을 병렬 변환 - {기존 상대 경로: 새 상대 경로}와 줄어든 바이트 반환"""
+    rules = rules or NORMALIZE_RULES
+    paths = list(paths)
+    renamed = {}
+    saved = 0
+    with stage("normalize", items=len(paths)), ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(normalize_file, paths, [rules] * len(paths), chunksize=16):
+            if result is None:
+                continue
+            old, new, delta = result
+            saved += delta
+            if old != new:
+                renamed[old] = new
+    return renamed, saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 상품 이미지를 웹 호환 포맷으로 일괄 변환")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--format", choices=list(PIL_FORMATS), default=NORMALIZE_RULES["format"])
+    parser.add_argument("--quality", type=int, default=NORMALIZE_RULES["quality"])
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+    rules = {**NORMALIZE_RULES, "format": args.format, "quality": args.quality}
+
+    print("=" * 60)
+    print("상품 이미지 포맷 정규화")
+    print("=" * 60)
+
+    renamed, saved = normalize_store(scan_store(), args.workers, rules)
+    print(f"\n포맷 변경 {len(renamed)}개, {saved / 1024 / 1024:.1f}MB 절약")
+
+    if renamed:
+        # 저장소 경로 -> uploads 기준 경로로 바꿔 업로드 URL 재작성 (옛 파일은 gc_uploads.py로 정리)
+        prefix = Path(UPLOAD_DIR).resolve().relative_to(Path(UPLOADS_ROOT).resolve()).as_posix()
+        mapping = {f"{prefix}/{old}": f"{prefix}/{new}" for old, new in renamed.items()}
+        session = open_session(DB_PATH)
+        try:
+            changed = rewrite_urls(session, mapping)
+        finally:
+            close_session(session)
+        print(f"URL 재작성 행: {changed}개")
+
+    write_run("image_normalize", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
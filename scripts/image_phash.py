@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+지각 해시(dHash/pHash) 기반 근사 중복 이미지 인덱스
+재인코딩되어 콘텐츠 해시는 달라도 눈으로 보면 같은 사진을 찾아 클러스터로 묶는다
+인덱스는 매니페스트 DB에 두고 새로 추출된 이미지만 해시를 계산 (증분)
+"""
+
+import argparse
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from PIL import Image
+
+from ingest_config import UPLOAD_DIR, NEAR_DUPLICATE_RULES
+from image_store import file_digest
+from image_variants import scan_sources
+from ingest_state import open_state
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_hashes (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    dhash INTEGER NOT NULL,
+    phash INTEGER NOT NULL,
+    hashedAt TEXT NOT NULL
+);
+"""
+
+# pHash 계산용 축소 크기와 사용하는 저주파 DCT 계수 크기
+PHASH_SIZE = 32
+PHASH_LOW = 8
+
+# 클러스터 후보를 찾을 때 블록마다 뒤집어 보는 최대 비트 수 (블록 수는 거리에 맞춰 정함)
+BLOCK_RADIUS = 2
+
+# 최소 블록 수 - 블록이 22비트 이하여야 블록 값별 버킷 표(4M칸)를 만들 수 있다
+MIN_BLOCKS = 3
+
+# 바이트별 1비트 개수 (해밍 거리 계산용)
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dct_matrix(n):
+    """n x n DCT-II 변환 행렬"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+DCT = dct_matrix(PHASH_SIZE)
+
+
+def pack_bits(bits):
+    """불리언 64개 -> 부호 있는 64비트 정수 (SQLite INTEGER에 그대로 저장)"""
+    value = int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def perceptual_hashes(path):
+    """이미지 하나의 (콘텐츠 해시, 가로, 세로, dHash, pHash) - 프로세스 풀 워커"""
+    with Image.open(path) as img:
+        width, height = img.size
+        img.draft("L", (PHASH_SIZE, PHASH_SIZE))
+        gray = img.convert("L")
+
+    # dHash: 9x8로 줄여 가로로 이웃한 픽셀 밝기 비교
+    small = np.asarray(gray.resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    dhash = pack_bits(small[:, 1:] > small[:, :-1])
+
+    # pHash: 32x32 DCT의 저주파 8x8 계수를 중앙값과 비교 (DC 성분 제외)
+    pixels = np.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), Image.LANCZOS), dtype=np.float64)
+    coeffs = (DCT @ pixels @ DCT.T)[:PHASH_LOW, :PHASH_LOW]
+    phash = pack_bits(coeffs > np.median(coeffs.ravel()[1:]))
+
+    return file_digest(path), width, height, dhash, phash
+
+
+def hash_source(path):
+    """perceptual_hashes 워커 - 읽지 못하거나 깨진 이미지는 (None, 오류 메시지)"""
+    try:
+        return perceptual_hashes(path)
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+
+def update_index(conn, paths, workers=None):
+    """아직 인덱스에 없는 이미지만 지각 해시를 계산해 추가 - 새로 추가한 수 반환
+
+    읽지 못한 이미지는 출력만 하고 건너뛴다 (다음 실행에서 다시 시도).
+    """
+    conn.executescript(SCHEMA)
+    known = set()
+    for digest, path in conn.execute("SELECT hash, path FROM image_hashes"):
+        known.update((digest, path))
+
+    pending = []
+    for path in dict.fromkeys(str(p) for p in paths):
+        if path in known:
+            continue
+        try:
+            digest = file_digest(path)
+        except OSError as e:
+            print(f"  해시 실패 {path}: {e}")
+            continue
+        if digest not in known:
+            known.add(digest)
+            pending.append(path)
+    if not pending:
+        return 0
+
+    now = datetime.now().isoformat()
+    rows = []
+    with stage("phash", items=len(pending)), ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, result in zip(pending, pool.map(hash_source, pending, chunksize=16)):
+            if result[0] is None:
+                print(f"  해시 실패 {path}: {result[1]}")
+                continue
+            digest, width, height, dhash, phash = result
+            rows.append((digest, path, width, height, dhash, phash, now))
+    conn.executemany("INSERT OR IGNORE INTO image_hashes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    return len(rows)
+
+
+def load_index(conn):
+    """인덱스 전체를 NumPy 배열로 (등록 순서 유지)"""
+    conn.executescript(SCHEMA)
+    rows = conn.execute(
+        "SELECT hash, path, width * height, dhash, phash FROM image_hashes ORDER BY rowid"
+    ).fetchall()
+    return {
+        "hash": [r[0] for r in rows],
+        "path": [r[1] for r in rows],
+        "area": np.array([r[2] for r in rows], dtype=np.int64),
+        "dhash": np.array([r[3] for r in rows], dtype=np.int64).view(np.uint64),
+        "phash": np.array([r[4] for r in rows], dtype=np.int64).view(np.uint64),
+    }
+
+
+def hamming(value, values):
+    """64비트 해시 하나와 해시 배열 사이의 해밍 거리 배열"""
+    diff = np.ascontiguousarray(values ^ value)
+    return POPCOUNT[diff.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def match_mask(index, i, start=0, rules=None):
+    """index[start:] 중 i번째 이미지와 근사 중복인 위치 마스크"""
+    rules = rules or NEAR_DUPLICATE_RULES
+    mask = hamming(index["phash"][i], index["phash"][start:]) <= rules["phash"]
+    mask &= hamming(index["dhash"][i], index["dhash"][start:]) <= rules["dhash"]
+    return mask
+
+
+def near_duplicates(index, digest, rules=None):
+    """콘텐츠 해시 하나와 근사 중복인 이미지 해시 목록 (자기 자신 제외)"""
+    i = index["hash"].index(digest)
+    return [index["hash"][j] for j in np.flatnonzero(match_mask(index, i, 0, rules)) if j != i]
+
+
+def flip_masks(bits, radius):
+    """bits비트 값에서 radius개 이하의 비트를 뒤집는 XOR 마스크 목록"""
+    return [
+        sum(1 << b for b in flipped)
+        for r in range(radius + 1)
+        for flipped in combinations(range(bits), r)
+    ]
+
+
+def candidate_pairs(values, distance):
+    """해밍 거리가 distance 이하일 수 있는 (i, j) 배열 쌍 (i < j, 중복 포함) - 블록별로 생성
+
+    64비트를 블록 m개로 나누면 거리가 distance 이하인 두 해시는 적어도 한 블록에서
+    distance // m 비트 이하로 다르다 (비둘기집 원리). 블록 값별 버킷으로 나눠 두고
+    그만큼 뒤집은 값의 버킷끼리만 짝지으므로 모든 쌍(n²)을 비교하지 않는다.
+    """
+    blocks = min(64, max(MIN_BLOCKS, distance // (BLOCK_RADIUS + 1) + 1))
+    edges = [64 * b // blocks for b in range(blocks + 1)]
+    positions = np.arange(len(values))
+    for start, end in zip(edges, edges[1:]):
+        bits = end - start
+        masks = flip_masks(bits, distance // blocks)
+        keys = ((values >> np.uint64(start)) & np.uint64((1 << bits) - 1)).astype(np.int64)
+        order = np.argsort(keys, kind="stable")
+        # 블록 값 -> 정렬된 위치에서의 버킷 시작/크기
+        counts = np.bincount(keys, minlength=1 << bits)
+        offsets = np.cumsum(counts) - counts
+        for mask in masks:
+            probe = keys ^ mask
+            lo = offsets[probe]
+            sizes = counts[probe]
+            total = int(sizes.sum())
+            if not total:
+                continue
+            # i마다 같은 구간의 j를 모두 펼침
+            starts = np.repeat(lo - (np.cumsum(sizes) - sizes), sizes)
+            i = np.repeat(positions, sizes)
+            j = order[starts + np.arange(total)]
+            keep = i < j
+            yield i[keep], j[keep]
+
+
+def duplicate_clusters(index, rules=None):
+    """근사 중복 클러스터 목록 (이미지 2개 이상인 것만)
+
+    각 클러스터의 첫 해시는 대표 이미지(가장 큰 해상도, 같으면 먼저 등록된 것)이다.
+    후보 쌍은 pHash 블록 버킷에서만 뽑아 dHash/pHash 거리를 확인한다.
+    """
+    rules = rules or NEAR_DUPLICATE_RULES
+    count = len(index["hash"])
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidate_pairs(index["phash"], rules["phash"]):
+        matched = hamming(index["phash"][i], index["phash"][j]) <= rules["phash"]
+        matched &= hamming(index["dhash"][i], index["dhash"][j]) <= rules["dhash"]
+        for a, b in zip(i[matched].tolist(), j[matched].tolist()):
+            parent[find(b)] = find(a)
+
+    groups = {}
+    for i in range(count):
+        groups.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) > 1:
+            members.sort(key=lambda m: (-index["area"][m], m))
+            clusters.append([index["hash"][m] for m in members])
+    return clusters
+
+
+def canonical_map(clusters):
+    """콘텐츠 해시 -> 클러스터 대표 해시 (중복이 아닌 이미지는 포함되지 않음)"""
+    return {digest: cluster[0] for cluster in clusters for digest in cluster}
+
+
+def collapse_records(conn, records, workers=None, rules=None):
+    """추출 기록을 인덱스에 반영하고 콘텐츠 해시 -> 대표 해시 매핑 반환 (seeder용)"""
+    update_index(conn, [r["path"] for r in records if r["filename"]], workers)
+    return canonical_map(duplicate_clusters(load_index(conn), rules))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="근사 중복 이미지 인덱스 갱신 및 클러스터 보고")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--phash", type=int, default=NEAR_DUPLICATE_RULES["phash"], help="pHash 최대 해밍 거리")
+    parser.add_argument("--dhash", type=int, default=NEAR_DUPLICATE_RULES["dhash"], help="dHash 최대 해밍 거리")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    print("=" * 60)
+    print("근사 중복 이미지 검사")
+    print("=" * 60)
+
+    conn = open_state()
+    try:
+        added = update_index(conn, scan_sources(UPLOAD_DIR), args.workers)
+        index = load_index(conn)
+        with stage("cluster", items=len(index["hash"])):
+            clusters = duplicate_clusters(index, {"phash": args.phash, "dhash": args.dhash})
+    finally:
+        conn.close()
+        write_run("image_phash", args.metrics, args.trace)
+
+    print(f"인덱스: 이미지 {len(index['hash'])}개 (신규 {added}개)")
+    for cluster in clusters:
+        print(f"\n  대표 {cluster[0]} + 중복 {len(cluster) - 1}개")
+        for digest in cluster[1:]:
+            print(f"    - {digest}")
+
+    duplicates = sum(len(c) - 1 for c in clusters)
+    print(f"\n중복 클러스터 {len(clusters)}개, 합칠 수 있는 이미지 {duplicates}개")
+
+
+if __name__ == "__main__":
+    main()
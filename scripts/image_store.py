@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+콘텐츠 주소 기반 이미지 저장소
+같은 이미지(해시)는 한 번만 저장하고, 해시 앞 2자리/다음 2자리로 두 단계 디렉토리를 나눈다
+(기존 평평한 파일과 한 단계 샤딩 파일은 migrate_uploads.py로 이전)
+"""
+
+import os
+import re
+import hashlib
+from pathlib import Path
+
+from ingest_metrics import stage
+
+
+# 저장소 파일명 (확장자 제외)이 곧 콘텐츠 해시 (blake2b 128비트, 32자리 hex)
+DIGEST_NAME = re.compile(r"^[0-9a-f]{32}$")
+DIGEST_SIZE = 16
+
+# 저장소 레이아웃 버전 (바뀌면 수집 매니페스트의 이전 기록을 쓰지 않음)
+STORE_LAYOUT = "blake2b-2"
+
+# 파일 해시 계산 시 읽기 단위
+READ_CHUNK = 1 << 20
+
+
+def image_digest(image_bytes):
+    """이미지 바이트의 콘텐츠 해시"""
+    return hashlib.blake2b(image_bytes, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def hash_file(path):
+    """파일 내용의 콘텐츠 해시 (큰 파일도 조금씩 읽음)"""
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def is_store_path(path):
+    """현재 레이아웃(ab/cd/<해시>.ext)에 놓인 저장소 파일인지"""
+    path = Path(path)
+    stem = path.stem
+    return (
+        DIGEST_NAME.match(stem) is not None
+        and path.parent.name == stem[2:4]
+        and path.parent.parent.name == stem[:2]
+    )
+
+
+def file_digest(path):
+    """이미지 파일의 콘텐츠 해시 (저장소 파일이면 파일명에서 바로 얻음)"""
+    if is_store_path(path):
+        return Path(path).stem
+    return hash_file(path)
+
+
+def shard_dir(digest):
+    """해시 -> 두 단계 샤드 디렉토리 (예: 3f/2a)"""
+    return f"{digest[:2]}/{digest[2:4]}"
+
+
+def store_relpath(digest, ext):
+    """해시 -> 저장소 내 상대 경로 (예: 3f/2a/3f2a...c1.jpeg)"""
+    return f"{shard_dir(digest)}/{digest}.{ext}"
+
+
+def store_image(root, image_bytes, ext, digest=None):
+    """이미지를 저장소에 저장
+
+    반환값은 (해시, 상대 경로, 새로 썼는지 여부). 이미 같은 해시의 파일이
+    있으면 디스크에 쓰지 않는다. 여러 프로세스가 동시에 같은 이미지를
+    저장해도 임시 파일 + os.replace로 원자적으로 교체된다.
+    """
+    if digest is None:
+        with stage("hash", len(image_bytes)):
+            digest = image_digest(image_bytes)
+    relpath = store_relpath(digest, ext)
+    filepath = Path(root) / relpath
+
+    if filepath.exists():
+        return digest, relpath, False
+
+    with stage("file_write", len(image_bytes)):
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(image_bytes)
+        os.replace(tmp_path, filepath)
+
+    return digest, relpath, True
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+업로드 URL 목록 컬럼(products.images / detailImages, assets.photos, rental_issues.evidencePhotos) 값 다루기
+TypeORM simple-array(쉼표 구분)와 스크립트가 써 넣은 JSON 배열,
+JSON 문자열로 한 번 더 감싼 값(이중 인코딩)을 모두 읽고 같은 형식으로 다시 쓴다
+새로 쓰는 값은 simple-array로 (예전 값은 data_migration.py normalize-images로 통일)
+"""
+
+import re
+import json
+from urllib.parse import unquote
+
+# 컬럼 값 형식
+CSV = "csv"              # a.jpg,b.jpg (TypeORM simple-array)
+JSON = "json"            # ["a.jpg", "b.jpg"]
+JSON_DOUBLE = "json2"    # "[\"a.jpg\", \"b.jpg\"]"
+JSON_NESTED = "json-nested"  # ["[\"a.jpg\", \"b.jpg\"]"] (예전 스크립트가 남긴 형식)
+
+UPLOADS_MARKER = "/uploads/"
+
+# 업로드 파일 URL 목록을 담는 컬럼 (테이블 -> 컬럼, 모두 simple-array)
+# 파일을 옮기거나 지우는 도구는 여기 있는 컬럼을 모두 확인해야 한다
+UPLOAD_COLUMNS = {
+    "products": ("images", "detailImages"),
+    "assets": ("photos",),
+    "rental_issues": ("evidencePhotos",),
+}
+
+# 형식과 관계없이 값 안의 업로드 경로 (따옴표/역슬래시/쉼표/괄호에서 끊음)
+UPLOAD_REF = re.compile(r"/uploads/([^\"'\\,\]\[?#\r\n]+)")
+
+
+def parse_images(value):
+    """컬럼 값 -> (URL 리스트, 형식)"""
+    if value is None or value in ("", "null"):
+        return [], CSV
+
+    text = value.strip()
+    if "," not in text and not text.startswith(("[", '"')):
+        # 대부분의 값은 URL 하나 (simple-array)
+        return ([text] if text else []), CSV
+
+    fmt = CSV
+    if text.startswith(("[", '"')):
+        try:
+            decoded = json.loads(text)
+        except ValueError:
+            decoded = None
+        if isinstance(decoded, str):
+            try:
+                decoded = json.loads(decoded)
+                fmt = JSON_DOUBLE
+            except ValueError:
+                decoded = None
+        elif isinstance(decoded, list):
+            fmt = JSON
+            if len(decoded) == 1 and isinstance(decoded[0], str) and decoded[0].startswith("["):
+                try:
+                    decoded = json.loads(decoded[0])
+                    fmt = JSON_NESTED
+                except ValueError:
+                    pass
+        if isinstance(decoded, list):
+            return [str(url) for url in decoded if url], fmt
+
+    return [url.strip() for url in text.split(",") if url.strip()], CSV
+
+
+def format_images(urls, fmt=CSV):
+    """URL 리스트 -> 컬럼 값 (parse_images가 돌려준 형식 유지)"""
+    if fmt == JSON:
+        return json.dumps(urls)
+    if fmt == JSON_DOUBLE:
+        return json.dumps(json.dumps(urls))
+    if fmt == JSON_NESTED:
+        return json.dumps([json.dumps(urls)])
+    return ",".join(urls)
+
+
+def url_relpath(url):
+    """업로드 URL -> uploads 기준 상대 경로 (업로드 파일이 아니면 None)"""
+    if UPLOADS_MARKER not in url:
+        return None
+    return url.split(UPLOADS_MARKER, 1)[1].split("?", 1)[0]
+
+
+def referenced_relpaths(value):
+    """컬럼 값이 참조하는 uploads 기준 상대 경로들
+
+    형식을 해석하지 않고 값 전체에서 /uploads/ 경로를 찾으므로 반쯤 깨진
+    값(쉼표로 잘린 JSON 등)에서도 참조를 놓치지 않는다.
+    """
+    if not value:
+        return []
+    return [unquote(path.strip()) for path in UPLOAD_REF.findall(value)]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+상품 이미지 반응형 변형(썸네일) 생성
+원본 콘텐츠 해시별로 고정 가로폭의 WebP/JPEG 변형을 프로세스 풀에서 한 번만 만들고
+image_variants 테이블에 원본 경로 -> 변형 URL을 기록 (ProductsService.findAll에서 반환)
+"""
+
+import os
+import argparse
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from ingest_config import DB_PATH, UPLOADS_ROOT, UPLOADS_URL, VARIANT_DIR, VARIANT_WIDTHS, VARIANT_FORMATS
+from image_store import file_digest, shard_dir
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+# PIL 저장 포맷 이름
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+# 투명 영역을 채울 배경색 (상품 목록 배경과 같은 흰색)
+BACKGROUND = (255, 255, 255)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS "image_variants" (
+    "sourcePath" varchar NOT NULL,
+    "width" integer NOT NULL,
+    "format" varchar NOT NULL,
+    "contentHash" varchar NOT NULL,
+    "height" integer NOT NULL,
+    "url" varchar NOT NULL,
+    "bytes" integer NOT NULL,
+    "createdAt" datetime NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY ("sourcePath", "width", "format")
+)
+"""
+
+
+def source_relpath(path, root=UPLOADS_ROOT):
+    """uploads 기준 상대 경로 (URL의 /uploads/ 뒷부분과 같은 형식)"""
+    return Path(path).resolve().relative_to(Path(root).resolve()).as_posix()
+
+
+def variant_relpath(digest, width, fmt):
+    """해시 -> 변형 파일 상대 경로 (예: 3f/2a/3f2a...c1_640.webp)"""
+    return f"{shard_dir(digest)}/{digest}_{width}.{fmt}"
+
+
+def flatten(img):
+    """RGB 이미지 - 투명 영역은 흰 배경에 합성 (convert("RGB")만 하면 검게 채워짐)"""
+    if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        flat = Image.new("RGB", img.size, BACKGROUND)
+        flat.paste(img, mask=img.getchannel("A"))
+        return flat
+    return img.convert("RGB")
+
+
+def render_variants(src_path, out_dir=VARIANT_DIR, widths=VARIANT_WIDTHS, formats=VARIANT_FORMATS):
+    """원본 하나의 변형 생성 - 프로세스 풀 워커
+
+    원본보다 좁은 폭만 만들고 (없으면 원본 폭 하나), 같은 해시의 변형
+    파일이 이미 있으면 다시 인코딩하지 않는다.
+    """
+    digest = file_digest(src_path)
+
+    variants = []
+    with Image.open(src_path) as img:
+        src_width, src_height = img.size
+        targets = [w for w in widths if w < src_width] or [src_width]
+
+        # JPEG는 필요한 최대 크기 근처로 축소 디코딩
+        img.draft("RGB", (max(targets), max(1, round(src_height * max(targets) / src_width))))
+        img = flatten(img)
+
+        for width in targets:
+            height = max(1, round(src_height * width / src_width))
+            resized = None
+
+            for fmt, quality in formats.items():
+                relpath = variant_relpath(digest, width, fmt)
+                path = Path(out_dir) / relpath
+
+                if not path.exists():
+                    if resized is None:
+                        resized = img if img.width == width else img.resize((width, height), Image.LANCZOS)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                    resized.save(tmp_path, PIL_FORMATS[fmt], quality=quality)
+                    os.replace(tmp_path, path)
+
+                variants.append({
+                    "width": width,
+                    "height": height,
+                    "format": fmt,
+                    "relpath": relpath,
+                    "bytes": path.stat().st_size,
+                })
+
+    return digest, variants
+
+
+def render_source(path):
+    """변형 생성 워커 - 읽지 못하거나 깨진 이미지는 (None, 오류 메시지)"""
+    try:
+        return render_variants(path)
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+
+def scan_sources(root=UPLOADS_ROOT, exclude=VARIANT_DIR):
+    """uploads 트리의 원본 이미지 경로 (변형 디렉토리 제외)"""
+    exclude = str(Path(exclude).resolve())
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if str(Path(dirpath, d).resolve()) != exclude]
+        for filename in filenames:
+            if Path(filename).suffix.lower() in IMAGE_EXTS:
+                yield os.path.join(dirpath, filename)
+
+
+def generate_variants(conn, paths, workers=None, batch_size=200):
+    """원본 이미지들의 변형을 병렬 생성하고 image_variants에 기록
+
+    이미 기록된 원본은 건너뛴다. 읽지 못한 원본은 출력만 하고 건너뛰며
+    (기록하지 않으므로 다음 실행에서 다시 시도) 반환값은 새로 처리한 원본 수.
+    """
+    conn.execute(SCHEMA)
+    done = {row[0] for row in conn.execute('SELECT DISTINCT "sourcePath" FROM "image_variants"')}
+    pending = [p for p in dict.fromkeys(str(p) for p in paths) if source_relpath(p) not in done]
+    if not pending:
+        return 0
+
+    variant_root = source_relpath(VARIANT_DIR)
+    rows = []
+    processed = 0
+
+    def flush():
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO "image_variants" ("sourcePath", "width", "format", "contentHash", "height", "url", "bytes")
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+        rows.clear()
+
+    with stage("render", items=len(pending)), ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(render_source, pending, chunksize=8)
+        for path, (digest, variants) in zip(pending, results):
+            if digest is None:
+                print(f"  변형 실패 {path}: {variants}")
+                continue
+            source = source_relpath(path)
+            for v in variants:
+                url = f"{UPLOADS_URL}/{variant_root}/{v['relpath']}"
+                rows.append((source, v["width"], v["format"], digest, v["height"], url, v["bytes"]))
+            processed += 1
+            if len(rows) >= batch_size:
+                flush()
+
+    flush()
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 이미지 반응형 변형 생성")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    print("=" * 60)
+    print("상품 이미지 변형 생성")
+    print("=" * 60)
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        count = generate_variants(conn, scan_sources(), args.workers)
+        print(f"\n원본 {count}개 처리 완료 (폭 {VARIANT_WIDTHS}, 포맷 {list(VARIANT_FORMATS)})")
+    finally:
+        conn.close()
+        write_run("image_variants", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+PDF 수집(ingestion) 공통 설정
+경로와 뮤지컬별 PDF 매니페스트를 스크립트들이 함께 사용
+"""
+
+from pathlib import Path
+
+# 경로 설정
+BASE_DIR = Path("c:/Users/parkm/stage-equipment-rental")
+SOURCE_DIR = BASE_DIR / "source"
+UPLOADS_ROOT = BASE_DIR / "backend" / "uploads"
+UPLOAD_DIR = UPLOADS_ROOT / "products"
+VARIANT_DIR = UPLOADS_ROOT / "variants"
+QUARANTINE_DIR = BASE_DIR / "backend" / "uploads_quarantine"  # 정적 서빙 밖 (gc_uploads.py)
+DB_PATH = BASE_DIR / "backend" / "stage_rental.db"
+STATE_DB_PATH = BASE_DIR / "backend" / "ingest_manifest.db"
+METRICS_DIR = BASE_DIR / "backend" / "ingest_metrics"
+
+# 업로드 파일 공개 URL
+UPLOADS_URL = "http://localhost:3001/uploads"
+UPLOAD_URL = f"{UPLOADS_URL}/products"
+
+# 반응형 이미지 변형 (가로 픽셀, 포맷, 품질)
+VARIANT_WIDTHS = [320, 640, 1280]
+VARIANT_FORMATS = {"webp": 80, "jpeg": 82}
+
+# 웹 호환 포맷 정규화 (JPX/JBIG2/TIFF, CMYK JPEG 등 -> sRGB, 메타데이터 제거)
+NORMALIZE_RULES = {
+    "format": "jpeg",   # jpeg | webp
+    "quality": 85,
+    "keep_exts": ["jpeg", "jpg", "png", "webp", "gif"],  # 그대로 저장하는 포맷 (CMYK는 변환)
+}
+
+# 디코딩 전 이미지 메타데이터 필터 (아이콘/로고/괘선 제외)
+IMAGE_FILTER_RULES = {
+    "min_side": 64,          # 가로/세로 최소 픽셀
+    "min_area": 96 * 96,     # 최소 픽셀 면적
+    "max_aspect": 8.0,       # 가로세로 비율 상한 (괘선, 띠 이미지)
+    "reject_bilevel": True,  # 1bpc 흑백 이미지 (글리프, 스캔 선화)
+    "reject_masked": False,  # 소프트 마스크(투명도)가 있는 이미지
+}
+
+# 근사 중복 이미지 판정 (64비트 지각 해시의 최대 해밍 거리, 둘 다 만족해야 중복)
+NEAR_DUPLICATE_RULES = {
+    "phash": 8,   # DCT 기반 pHash
+    "dhash": 10,  # 인접 픽셀 차이 dHash
+}
+
+# 이미지 <-> 캡션 레이아웃 매칭 (PDF 포인트 단위)
+CAPTION_RULES = {
+    "cell": 72,            # 공간 인덱스 격자 크기
+    "max_distance": 150,   # 이미지와 캡션 사이 최대 거리
+    "side_penalty": 1.5,   # 옆에 놓인 캡션의 거리 가중치 (위/아래 우선)
+}
+
+# 캡션 OCR (스캔 페이지처럼 텍스트 레이어가 없을 때)
+OCR_RULES = {
+    "backend": "tesseract",  # tesseract | none
+    "lang": "kor+eng",       # Tesseract 언어
+    "dpi": 300,              # 캡션 영역 래스터화 해상도
+    "band": 48,              # 이미지 아래 캡션 영역 높이 (PDF 포인트)
+    "batch_pages": 8,        # 프로세스 풀 작업 하나가 처리할 페이지 수
+}
+
+# 뮤지컬별 PDF 파일 매핑 (SOURCE_DIR 기준 상대 경로)
+MUSICAL_PDFS = {
+    "바람사": [
+        "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST -주조연 (1).pdf",
+        "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST - FE (1).pdf",
+        "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST - ME.pdf",
+        "바람사 의상파트 바이블/바람사 신발 및 액세서리 PHOTO LIST.pdf",
+        "40. 바람_2016_소품 BIBLE_0129.pdf",
+    ],
+    "오캐롤": [
+        "오캐롤 의상파트 바이블/8.2017 오!캐롤 -신발 바이블.pdf",
+        "오캐롤 의상파트 바이블/7.2017 오!캐롤 -악세사리 바이블.pdf",
+    ],
+    "나폴레옹": [
+        "나폴레옹 의상 파트 바이블/2017 나폴레옹 신발 바이블.pdf",
+        "나폴레옹 의상 파트 바이블/2017 나폴레옹 악세서리 바이블.pdf",
+        "나폴레옹 의상 파트 바이블/2017 나폴레옹 캐릭터별 사진 리스트.pdf",
+    ],
+    "에드거앨런포": [
+        "포_2016_소품 BIBLE_0719.pdf",
+        "포 대도구.pdf",
+        "2016 사람별의상바이블.pdf",
+    ],
+}
+
+# 작품(production) 이름 -> 시드 스크립트/제목 태그에 쓰인 다른 표기 (products.production은 왼쪽 이름으로)
+PRODUCTION_ALIASES = {
+    "바람사": ["바람과 함께 사라지다"],
+    "오캐롤": ["오!캐롤"],
+    "나폴레옹": [],
+    "에드거앨런포": ["에드거 앨런 포"],
+}
+
+# 기존 상품에 이미지를 채울 PDF (상품 제목 태그 -> PDF)
+PRODUCT_IMAGE_PDFS = [
+    {"musical": "바람사", "tag": "[바람사]", "pdf": "바람사 의상파트 바이블/바람사 장면별 PHOTO LIST - FE (1).pdf"},
+    {"musical": "오캐롤", "tag": "[오캐롤]", "pdf": "5.2017 오!캐롤 -배우별 의상바이블.pdf"},
+    {"musical": "나폴레옹", "tag": "[나폴레옹]", "pdf": "2017 나폴레옹 캐릭터별 사진 리스트.pdf"},
+    {"musical": "에드거앨런포", "tag": "[에드거 앨런 포]", "pdf": "2016 사람별의상바이블.pdf"},
+]
+
+
+def find_source_pdf(*candidates):
+    """후보 경로 중 존재하는 첫 PDF 반환 (없으면 첫 후보)"""
+    paths = [SOURCE_DIR / c for c in candidates]
+    for path in paths:
+        if path.exists():
+            return path
+    return paths[0]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+수집 스크립트 단계별 계측
+단계(PDF 열기, get_images, extract_image, 해시, 파일 쓰기, 카테고리 조회, INSERT, 커밋)별
+호출 수/누적 시간/바이트/행 수를 모으고, 실행이 끝나면 JSON 요약과 (선택) Chrome trace를 저장
+프로세스 풀 워커의 계측은 measured()로 감싸 부모 프로세스에 합친다
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from ingest_config import METRICS_DIR
+
+_lock = threading.Lock()
+_stages = {}
+_events = []
+_trace = {"enabled": False}
+_started = time.perf_counter()
+
+
+def enable_trace(enabled=True):
+    """Chrome trace 이벤트 기록 켜기"""
+    _trace["enabled"] = enabled
+
+
+def record(name, seconds, nbytes=0, items=0, start=None):
+    """단계 하나의 측정값 누적"""
+    with _lock:
+        stage = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "bytes": 0, "items": 0})
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        stage["bytes"] += nbytes
+        stage["items"] += items
+        if _trace["enabled"] and start is not None:
+            _events.append({
+                "name": name,
+                "ph": "X",
+                "ts": round((start - _started) * 1e6),
+                "dur": round(seconds * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"bytes": nbytes, "items": items} if nbytes or items else {},
+            })
+
+
+@contextmanager
+def stage(name, nbytes=0, items=0):
+    """with 블록 하나를 단계로 계측"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, nbytes, items, start)
+
+
+def snapshot(reset=False):
+    """현재 프로세스의 계측값 (프로세스 간 전달용)"""
+    with _lock:
+        snap = {"stages": {k: dict(v) for k, v in _stages.items()}, "events": list(_events)}
+        if reset:
+            _stages.clear()
+            _events.clear()
+    return snap
+
+
+def merge(snap):
+    """다른 프로세스의 계측값 합치기"""
+    with _lock:
+        for name, values in snap["stages"].items():
+            stage = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "bytes": 0, "items": 0})
+            for key, value in values.items():
+                stage[key] += value
+        _events.extend(snap["events"])
+
+
+def measured(fn, trace, *args):
+    """프로세스 풀 워커 - fn(*args) 결과와 이 호출의 계측값을 함께 반환"""
+    enable_trace(trace)
+    snapshot(reset=True)
+    result = fn(*args)
+    return result, snapshot(reset=True)
+
+
+def tracing():
+    """trace 기록 중인지 (워커에 전달용)"""
+    return _trace["enabled"]
+
+
+def summary(run_name):
+    """JSON 요약 (단계별 누적 시간 내림차순)"""
+    wall = time.perf_counter() - _started
+    with _lock:
+        stages = {
+            name: {
+                **values,
+                "seconds": round(values["seconds"], 4),
+                "mb_per_sec": round(values["bytes"] / 1024 / 1024 / values["seconds"], 2)
+                if values["bytes"] and values["seconds"] else None,
+            }
+            for name, values in sorted(_stages.items(), key=lambda kv: -kv[1]["seconds"])
+        }
+    return {
+        "run": run_name,
+        "finishedAt": datetime.now().isoformat(),
+        "wallSeconds": round(wall, 3),
+        # 스레드/프로세스에서 동시에 실행된 단계는 누적 시간이 벽시계 시간보다 클 수 있음
+        "stages": stages,
+    }
+
+
+def add_arguments(parser):
+    """계측 관련 명령행 옵션 추가"""
+    parser.add_argument("--metrics", default=None, help=f"계측 요약 JSON 경로 (기본: {METRICS_DIR}/<스크립트>-<시각>.json)")
+    parser.add_argument("--trace", default=None, help="Chrome trace 파일 경로 (chrome://tracing, Perfetto)")
+
+
+def write_run(run_name, metrics_path=None, trace_path=None):
+    """실행 종료 시 계측 요약(JSON)과 trace 저장, 단계별 요약 출력"""
+    result = summary(run_name)
+    if metrics_path is None:
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        metrics_path = METRICS_DIR / f"{run_name}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    Path(metrics_path).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if trace_path:
+        with _lock:
+            events = list(_events)
+        Path(trace_path).write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+
+    print(f"\n단계별 계측 (전체 {result['wallSeconds']}초) -> {metrics_path}")
+    for name, values in result["stages"].items():
+        line = f"  {name:<16} {values['calls']:>8}회 {values['seconds']:>10.3f}초"
+        if values["bytes"]:
+            line += f" {values['bytes'] / 1024 / 1024:>9.1f}MB"
+        if values["items"]:
+            line += f" {values['items']:>8}행"
+        print(line)
+    if trace_path:
+        print(f"  trace: {trace_path}")
+    return result
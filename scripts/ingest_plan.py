@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+PDF 수집 사전 계획 (dry-run)
+MUSICAL_PDFS의 모든 PDF를 메타데이터만으로 병렬 스캔해 페이지 수, 필터 통과 이미지,
+저장 예상 바이트, 예상 중복, 예상 상품 행 수를 JSON 보고서로 출력 (아무것도 쓰지 않음)
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import fitz  # PyMuPDF
+
+from ingest_config import MUSICAL_PDFS
+from image_filter import image_info, check_image, rules_key
+from pdf_ingest import build_jobs
+
+
+def stream_length(doc, xref):
+    """이미지 스트림의 압축된 길이 (/Length, 디코딩하지 않음)"""
+    kind, value = doc.xref_get_key(xref, "Length")
+    if kind == "int":
+        return int(value)
+    if kind == "xref":
+        # 간접 참조 (예: "12 0 R")
+        return int(doc.xref_object(int(value.split()[0])).strip())
+    return 0
+
+
+def plan_pdf(job, rules=None):
+    """PDF 하나의 메타데이터 스캔 - 프로세스 풀 워커"""
+    report = {
+        "musical": job["musical"],
+        "pdf": job["pdf"],
+        "path": job["path"],
+        "exists": os.path.exists(job["path"]),
+        "pages": 0,
+        "images": 0,
+        "candidates": 0,
+        "skipped": {},
+        "unique_xrefs": 0,
+        "estimated_bytes": 0,
+        "signatures": [],
+    }
+    if not report["exists"]:
+        return report
+
+    seen = {}
+    with fitz.open(job["path"]) as doc:
+        report["pages"] = len(doc)
+        for page in doc:
+            for img in page.get_images(full=True):
+                info = image_info(img)
+                report["images"] += 1
+                reason = check_image(info, rules)
+                if reason:
+                    report["skipped"][reason] = report["skipped"].get(reason, 0) + 1
+                    continue
+
+                report["candidates"] += 1
+                xref = info["xref"]
+                if xref not in seen:
+                    seen[xref] = stream_length(doc, xref)
+                    # 다른 PDF와의 중복 추정용 (크기, 형식, 스트림 길이가 모두 같은 이미지)
+                    report["signatures"].append(
+                        f"{info['width']}x{info['height']}|{info['bpc']}|{info['colorspace']}|{info['filter']}|{seen[xref]}"
+                    )
+
+    report["unique_xrefs"] = len(seen)
+    report["estimated_bytes"] = sum(seen.values())
+    return report
+
+
+def build_plan(jobs, workers=None, rules=None):
+    """작업 목록 전체의 수집 계획 보고서"""
+    started = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        reports = [plan_pdf(job, rules) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(plan_pdf, jobs, [rules] * len(jobs)))
+
+    # 서명이 같은 이미지는 (xref나 PDF가 달라도) 같은 파일로 저장될 것으로 추정
+    signature_bytes = {}
+    for report in reports:
+        for signature in report["signatures"]:
+            signature_bytes[signature] = int(signature.rsplit("|", 1)[1])
+
+    files = []
+    for report in reports:
+        signatures = report.pop("signatures")
+        report["duplicates"] = {
+            "xref": report["candidates"] - report["unique_xrefs"],
+            "signature": 0,
+        }
+        files.append((report, signatures))
+
+    owner = {}
+    for report, signatures in files:
+        for signature in signatures:
+            if signature in owner:
+                report["duplicates"]["signature"] += 1
+            else:
+                owner[signature] = report["path"]
+
+    totals = {
+        "pdfs": len(reports),
+        "missing": sum(1 for r in reports if not r["exists"]),
+        "pages": sum(r["pages"] for r in reports),
+        "images": sum(r["images"] for r in reports),
+        "candidates": sum(r["candidates"] for r in reports),
+        "duplicates": sum(r["duplicates"]["xref"] + r["duplicates"]["signature"] for r in reports),
+        "estimated_files": len(signature_bytes),
+        "estimated_bytes": sum(signature_bytes.values()),
+        # extract_and_seed는 필터를 통과한 이미지마다 상품 한 행, --collapse-duplicates면 파일마다 한 행
+        "predicted_products": sum(r["candidates"] for r in reports),
+        "predicted_products_collapsed": len(signature_bytes),
+    }
+
+    return {
+        "generatedAt": datetime.now().isoformat(),
+        "rules": rules_key(rules),
+        "scanSeconds": round(time.perf_counter() - started, 3),
+        "totals": totals,
+        "pdfs": reports,
+    }
+
+
+def write_plan(plan, output=None):
+    """보고서를 JSON 파일로 저장하고 요약 출력 (output이 없으면 표준 출력으로 JSON)"""
+    text = json.dumps(plan, ensure_ascii=False, indent=2)
+    if not output:
+        print(text)
+        return
+
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text)
+    totals = plan["totals"]
+    print(f"계획 저장: {output}")
+    print(f"  PDF {totals['pdfs']}개 (없음 {totals['missing']}개), 페이지 {totals['pages']}쪽")
+    print(f"  후보 이미지 {totals['candidates']}개, 예상 파일 {totals['estimated_files']}개 "
+          f"({totals['estimated_bytes'] / 1024 / 1024:.1f}MB), 예상 상품 {totals['predicted_products']}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 수집 사전 계획 (메타데이터만 읽는 dry-run)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--output", default=None, help="JSON 보고서 저장 경로 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    write_plan(build_plan(build_jobs(MUSICAL_PDFS), args.workers), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+PDF 수집 진행 상태 매니페스트 (SQLite)
+PDF별 크기/수정시각/해시와 페이지별 추출 결과를 기록해 변경 없는 PDF와
+이미 끝난 페이지는 건너뛰고, 중단된 실행은 마지막 체크포인트부터 재개
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+
+from ingest_config import STATE_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_files (
+    path TEXT NOT NULL,
+    options TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    hash TEXT NOT NULL,
+    pageCount INTEGER NOT NULL,
+    completedAt TEXT,
+    updatedAt TEXT NOT NULL,
+    PRIMARY KEY (path, options)
+);
+CREATE TABLE IF NOT EXISTS pdf_pages (
+    path TEXT NOT NULL,
+    options TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    records TEXT NOT NULL,
+    extractedAt TEXT NOT NULL,
+    PRIMARY KEY (path, options, page)
+);
+CREATE TABLE IF NOT EXISTS seed_runs (
+    seeder TEXT NOT NULL,
+    path TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    seededAt TEXT NOT NULL,
+    PRIMARY KEY (seeder, path)
+);
+"""
+
+
+def open_state(db_path=STATE_DB_PATH):
+    """매니페스트 DB 연결 (테이블이 없으면 생성)"""
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """PDF 파일 전체의 해시"""
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sync_pdf(conn, path, page_count, options):
+    """PDF를 매니페스트와 비교해 이미 추출된 페이지 번호(0부터) 집합 반환
+
+    크기/수정시각이 같으면 그대로 신뢰하고, 다르면 해시를 계산해 내용이
+    같을 때만 기존 기록을 유지한다. 내용이 바뀌었으면 페이지 기록을 비우고
+    처음부터 다시 추출하도록 한다. 기록은 추출 옵션(저장 위치, 필터)별로 따로 둔다.
+    """
+    stat = os.stat(path)
+    now = datetime.now().isoformat()
+    row = conn.execute(
+        "SELECT size, mtime, hash FROM pdf_files WHERE path = ? AND options = ?", (path, options)
+    ).fetchone()
+
+    if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+        return done_pages(conn, path, options)
+
+    digest = file_hash(path)
+
+    if row and row[2] == digest:
+        # 내용은 그대로 (복사/touch 등) - 수정시각만 갱신
+        conn.execute(
+            "UPDATE pdf_files SET size = ?, mtime = ?, updatedAt = ? WHERE path = ? AND options = ?",
+            (stat.st_size, stat.st_mtime, now, path, options),
+        )
+        conn.commit()
+        return done_pages(conn, path, options)
+
+    conn.execute("DELETE FROM pdf_pages WHERE path = ? AND options = ?", (path, options))
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO pdf_files (path, options, size, mtime, hash, pageCount, completedAt, updatedAt)
+        VALUES (?, ?, ?, ?, ?, ?, NULL, ?)
+        """,
+        (path, options, stat.st_size, stat.st_mtime, digest, page_count, now),
+    )
+    conn.commit()
+    return set()
+
+
+def done_pages(conn, path, options):
+    """이미 추출된 페이지 번호(0부터) 집합"""
+    rows = conn.execute("SELECT page FROM pdf_pages WHERE path = ? AND options = ?", (path, options))
+    return {page - 1 for (page,) in rows}
+
+
+def save_pages(conn, path, options, pages):
+    """샤드 하나의 결과(페이지 번호 -> 이미지 기록) 체크포인트 저장"""
+    now = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT OR REPLACE INTO pdf_pages (path, options, page, records, extractedAt) VALUES (?, ?, ?, ?, ?)",
+        [
+            (path, options, page, json.dumps(records, ensure_ascii=False), now)
+            for page, records in pages.items()
+        ],
+    )
+    conn.commit()
+
+
+def mark_complete(conn, path, options):
+    """모든 페이지 추출 완료 표시"""
+    conn.execute(
+        "UPDATE pdf_files SET completedAt = ? WHERE path = ? AND options = ?",
+        (datetime.now().isoformat(), path, options),
+    )
+    conn.commit()
+
+
+def load_records(conn, path, options):
+    """저장된 이미지 기록을 페이지/이미지 순서대로 반환"""
+    records = []
+    rows = conn.execute(
+        "SELECT records FROM pdf_pages WHERE path = ? AND options = ? ORDER BY page", (path, options)
+    )
+    for (page_records,) in rows:
+        records.extend(json.loads(page_records))
+    return records
+
+
+def current_hash(conn, path):
+    """매니페스트에 기록된 PDF의 최신 해시"""
+    row = conn.execute(
+        "SELECT hash FROM pdf_files WHERE path = ? ORDER BY updatedAt DESC LIMIT 1", (str(path),)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def needs_seeding(conn, seeder, path):
+    """seeder 스크립트가 현재 내용의 PDF를 아직 상품 DB에 반영하지 않았는지"""
+    row = conn.execute(
+        "SELECT hash FROM seed_runs WHERE seeder = ? AND path = ?", (seeder, str(path))
+    ).fetchone()
+    return not row or row[0] != current_hash(conn, path)
+
+
+def mark_seeded(conn, seeder, paths):
+    """상품 DB 반영(커밋) 완료 표시 - 커밋 이후에 호출"""
+    now = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT OR REPLACE INTO seed_runs (seeder, path, hash, seededAt) VALUES (?, ?, ?, ?)",
+        [(seeder, str(path), current_hash(conn, path), now) for path in paths],
+    )
+    conn.commit()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+업로드 이미지를 두 단계 샤딩 저장소로 이전
+평평한 uploads/, uploads/products/ 파일과 이전 한 단계 샤딩(ab/<md5>.ext) 파일을
+products/ab/cd/<blake2b>.ext 로 옮기고 업로드 URL 컬럼(상품 이미지, 자산 사진, 분쟁 증빙 사진, 알림 링크)을 일괄 재작성
+
+단계별로 진행 상황을 매니페스트 DB(upload_migration)에 남기므로 중단해도 이어서 실행된다.
+  copy    - 새 경로에 하드링크(안 되면 복사)를 만든다. 옛 파일은 그대로 서빙됨
+  rewrite - 업로드 URL 컬럼과 image_variants/image_metadata 원본 경로를 새 경로로 바꾼다
+  cleanup - (--remove-old) URL 재작성이 끝난 옛 파일만 지운다
+새 파일을 먼저 만들고, 옛 파일은 참조가 모두 바뀐 뒤에만 지우므로 서비스 중에도 실행 가능
+"""
+
+import os
+import shutil
+import argparse
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from ingest_config import DB_PATH, STATE_DB_PATH, UPLOADS_ROOT, UPLOAD_DIR, VARIANT_DIR
+from image_store import hash_file, is_store_path, store_relpath
+from image_urls import UPLOAD_COLUMNS, UPLOADS_MARKER, parse_images, format_images, url_relpath
+from db_session import open_session, close_session, queue, flush
+from product_images import sync_product_images
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+# 한 번에 읽는 상품 행 수
+PAGE_SIZE = 1000
+
+# URL 하나짜리 컬럼 (업로드 파일이 아닌 링크도 들어 있음)
+LINK_COLUMNS = {
+    "notifications": ("linkUrl",),
+}
+
+# 업로드 기준 상대 경로(sourcePath)로 원본을 가리키는 테이블
+SOURCE_TABLES = ("image_variants", "image_metadata")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_migration (
+    oldPath TEXT PRIMARY KEY,
+    newPath TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    copiedAt TEXT NOT NULL,
+    rewrittenAt TEXT,
+    removedAt TEXT
+);
+"""
+
+
+def open_migration(db_path=STATE_DB_PATH):
+    """이전 기록 DB 연결 (테이블이 없으면 생성)"""
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def table_columns(conn, table):
+    """테이블의 컬럼 이름 집합 (테이블이 없으면 빈 집합)"""
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def relpath(path, root=UPLOADS_ROOT):
+    """uploads 기준 상대 경로 (URL의 /uploads/ 뒷부분과 같은 형식)"""
+    return Path(path).resolve().relative_to(Path(root).resolve()).as_posix()
+
+
+def scan_legacy(root=UPLOADS_ROOT, exclude=VARIANT_DIR, store_dir=UPLOAD_DIR):
+    """이전 대상 파일 경로 (이미 저장소에 있는 파일과 변형 디렉토리 제외)
+
+    새 레이아웃(ab/cd/<해시>.ext)이어도 저장소(products/) 밖에 있으면 옮긴다.
+    디렉토리가 커도 os.scandir로 항목 stat 없이 훑는다.
+    """
+    exclude = os.path.realpath(exclude)
+    store_dir = os.path.realpath(store_dir)
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.realpath(entry.path) != exclude:
+                        stack.append(entry.path)
+                elif (
+                    entry.name[0] != "."
+                    and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTS
+                    and not (is_store_path(entry.path) and in_store(entry.path, store_dir))
+                ):
+                    yield entry.path
+
+
+def in_store(path, store_dir):
+    """ab/cd/<해시>.ext 파일이 저장소 바로 아래에 있는지"""
+    return os.path.realpath(os.path.dirname(os.path.dirname(os.path.dirname(path)))) == store_dir
+
+
+def link_or_copy(src, dst):
+    """src를 dst에 원자적으로 배치 (같은 파일시스템이면 하드링크)"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def place_file(path, store_dir=UPLOAD_DIR):
+    """파일 하나를 해시 저장소에 배치 - 스레드 풀 워커 (해시 계산은 GIL 밖에서 돔)"""
+    digest = hash_file(path)
+    ext = os.path.splitext(path)[1][1:].lower()
+    target = Path(store_dir) / store_relpath(digest, ext)
+    if not target.exists():
+        link_or_copy(path, target)
+    return digest, relpath(target), os.path.getsize(path)
+
+
+def copy_files(conn, paths, workers=8, batch_size=500):
+    """아직 기록되지 않은 파일을 새 경로에 배치하고 upload_migration에 기록
+
+    반환값은 새로 배치한 파일 수.
+    """
+    done = {row[0] for row in conn.execute("SELECT oldPath FROM upload_migration")}
+    pending = [p for p in paths if relpath(p) not in done]
+    if not pending:
+        return 0
+
+    rows = []
+
+    def flush():
+        conn.executemany(
+            "INSERT OR REPLACE INTO upload_migration (oldPath, newPath, hash, bytes, copiedAt) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+        rows.clear()
+
+    with stage("copy", items=len(pending)), ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, (digest, new_path, size) in zip(pending, pool.map(place_file, pending)):
+            rows.append((relpath(path), new_path, digest, size, datetime.now().isoformat()))
+            if len(rows) >= batch_size:
+                flush()
+
+    flush()
+    return len(pending)
+
+
+def remap_url(url, mapping):
+    """URL의 /uploads/ 뒷부분만 새 경로로 (상대/절대 URL 앞부분과 쿼리는 유지)"""
+    new_path = mapping.get(url_relpath(url) or "")
+    if not new_path:
+        return url
+    prefix, rest = url.split(UPLOADS_MARKER, 1)
+    _, sep, query = rest.partition("?")
+    return f"{prefix}{UPLOADS_MARKER}{new_path}{sep}{query}"
+
+
+def rewrite_urls(session, mapping, page_size=PAGE_SIZE):
+    """업로드 URL 컬럼(UPLOAD_COLUMNS, LINK_COLUMNS)의 URL을 새 경로로 재작성 (컬럼 값 형식은 유지)
+
+    옛 파일은 상품 이미지만이 아니라 자산 사진, 분쟁 증빙 사진, 알림 링크일 수도 있으므로
+    모든 컬럼을 바꾼 뒤에야 cleanup이 지울 수 있다. 바뀐 상품의 product_images도 다시 만든다.
+    반환값은 바뀐 행 수.
+    """
+    def remap_list(value):
+        urls, fmt = parse_images(value)
+        new_urls = [remap_url(url, mapping) for url in urls]
+        return format_images(new_urls, fmt) if new_urls != urls else value
+
+    def remap_link(value):
+        return remap_url(value, mapping) if value else value
+
+    conn = session["conn"]
+    changed = {}
+    for columns_by_table, remap in ((UPLOAD_COLUMNS, remap_list), (LINK_COLUMNS, remap_link)):
+        for table, columns in columns_by_table.items():
+            present = [c for c in columns if c in table_columns(conn, table)]
+            if present:
+                changed[table] = rewrite_table(session, table, present, remap, page_size)
+
+    # 대표 이미지 목록(product_images)도 새 URL로
+    flush(session)
+    sync_product_images(conn, changed.get("products", []))
+    conn.commit()
+    return sum(len(ids) for ids in changed.values())
+
+
+def rewrite_table(session, table, columns, remap, page_size=PAGE_SIZE):
+    """테이블 하나의 URL 컬럼 재작성 (remap: 컬럼 값 -> 새 값) - 바뀐 행 ID 리스트
+
+    id 순서로 page_size씩 읽어 바뀐 행만 세션에 쌓고 chunk 단위로 커밋한다.
+    """
+    select = ", ".join(f'"{c}"' for c in columns)
+    assignments = ", ".join(f'"{c}" = ?' for c in columns)
+    sql = f'UPDATE "{table}" SET {assignments} WHERE id = ?'
+    conn = session["conn"]
+    changed = []
+    last_id = ""
+
+    while True:
+        rows = conn.execute(
+            f'SELECT id, {select} FROM "{table}" WHERE id > ? ORDER BY id LIMIT ?', (last_id, page_size)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        for row_id, *values in rows:
+            updated = [remap(value) for value in values]
+            if updated != values:
+                queue(session, sql, (*updated, row_id))
+                changed.append(row_id)
+    return changed
+
+
+def rewrite_sources(session, mapping):
+    """image_variants/image_metadata의 원본 경로를 새 경로로 (이미 만든 변형과 메타데이터를 다시 계산하지 않도록)"""
+    conn = session["conn"]
+    for table in SOURCE_TABLES:
+        if "sourcePath" not in table_columns(conn, table):
+            continue
+        for old_path, new_path in mapping.items():
+            # 같은 내용의 옛 파일이 여러 개면 새 경로 하나로 모이고 나머지 행은 지움
+            queue(session, f'UPDATE OR IGNORE "{table}" SET "sourcePath" = ? WHERE "sourcePath" = ?',
+                  (new_path, old_path))
+            queue(session, f'DELETE FROM "{table}" WHERE "sourcePath" = ?', (old_path,))
+
+
+def rewrite(state, db_path=DB_PATH):
+    """copy 단계가 끝난 파일의 참조를 모두 재작성하고 rewrittenAt 기록"""
+    mapping = dict(state.execute("SELECT oldPath, newPath FROM upload_migration WHERE rewrittenAt IS NULL"))
+    if not mapping:
+        return 0
+
+    session = open_session(db_path)
+    try:
+        changed = rewrite_urls(session, mapping)
+        rewrite_sources(session, mapping)
+    finally:
+        close_session(session)
+
+    now = datetime.now().isoformat()
+    state.executemany(
+        "UPDATE upload_migration SET rewrittenAt = ? WHERE oldPath = ?", [(now, p) for p in mapping]
+    )
+    state.commit()
+    return changed
+
+
+def cleanup(state, root=UPLOADS_ROOT):
+    """재작성이 끝난 옛 파일 삭제 (새 파일과 같은 inode여도 새 경로는 남음)"""
+    rows = state.execute(
+        "SELECT oldPath, newPath FROM upload_migration WHERE rewrittenAt IS NOT NULL AND removedAt IS NULL"
+    ).fetchall()
+    removed = []
+    for old_path, new_path in rows:
+        if old_path == new_path or not (Path(root) / new_path).exists():
+            continue
+        try:
+            os.remove(Path(root) / old_path)
+        except FileNotFoundError:
+            pass
+        removed.append((datetime.now().isoformat(), old_path))
+
+    state.executemany("UPDATE upload_migration SET removedAt = ? WHERE oldPath = ?", removed)
+    state.commit()
+    return len(removed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업로드 이미지 샤딩 레이아웃 이전")
+    parser.add_argument("--workers", type=int, default=8, help="해시/복사 스레드 수")
+    parser.add_argument("--remove-old", action="store_true", help="URL 재작성이 끝난 옛 파일 삭제")
+    add_arguments(parser)
+    args = parser.parse_args()
+    if args.trace:
+        enable_trace()
+
+    print("=" * 60)
+    print("업로드 이미지 샤딩 레이아웃 이전")
+    print("=" * 60)
+
+    state = open_migration()
+    try:
+        copied = copy_files(state, list(scan_legacy()), args.workers)
+        print(f"\n[copy] 새 경로에 배치: {copied}개")
+
+        changed = rewrite(state)
+        print(f"[rewrite] URL 재작성 행: {changed}개")
+
+        if args.remove_old:
+            print(f"[cleanup] 옛 파일 삭제: {cleanup(state)}개")
+        else:
+            print("[cleanup] 건너뜀 (--remove-old 로 옛 파일 삭제)")
+    finally:
+        state.close()
+        write_run("migrate_uploads", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+캡션 영역 OCR
+텍스트 레이어가 없어 레이아웃 매칭(caption_layout)으로 캡션을 못 찾은 이미지에 대해
+이미지 바로 아래 영역만 래스터화해 OCR하고, 결과는 (PDF 해시, 페이지, 영역)별로 캐시
+OCR 엔진은 교체 가능 (tesseract: 로컬 Tesseract, none: 아무것도 읽지 않는 테스트용)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from ingest_config import OCR_RULES
+from ingest_state import file_hash, current_hash
+from caption_layout import parse_caption
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_cache (
+    pdfHash TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    text TEXT NOT NULL,
+    ocrAt TEXT NOT NULL,
+    PRIMARY KEY (pdfHash, page, region, backend)
+);
+"""
+
+
+def tesseract_ocr(image, lang):
+    """로컬 Tesseract로 인식 (pytesseract 필요)"""
+    try:
+        import pytesseract
+    except ImportError:
+        raise RuntimeError("pytesseract가 설치되어 있지 않습니다: pip install pytesseract (Tesseract 실행 파일도 필요)")
+    return pytesseract.image_to_string(image, lang=lang, config="--psm 6")
+
+
+def null_ocr(image, lang):
+    """아무것도 인식하지 않는 OCR (테스트, OCR 없이 실행할 때)"""
+    return ""
+
+
+# OCR 엔진 이름 -> 인식 함수 (이미지, 언어) -> 텍스트
+OCR_BACKENDS = {
+    "tesseract": tesseract_ocr,
+    "none": null_ocr,
+}
+
+
+def caption_region(rect, band):
+    """이미지 사각형 바로 아래 캡션 영역"""
+    x0, y0, x1, y1 = rect
+    return (round(x0, 1), round(y1, 1), round(x1, 1), round(y1 + band, 1))
+
+
+def region_key(region):
+    """캐시 키용 영역 문자열"""
+    return ",".join(f"{v:.1f}" for v in region)
+
+
+def ocr_batch(task):
+    """PDF 한 개의 여러 페이지 캡션 영역 OCR - 프로세스 풀 워커
+
+    task는 (PDF 경로, [(페이지 번호 1부터, 영역), ...], 엔진 이름, 언어, dpi).
+    반환값은 [(페이지, 영역, 텍스트), ...].
+    """
+    pdf_path, regions, backend, lang, dpi = task
+    recognize = OCR_BACKENDS[backend]
+    results = []
+    with fitz.open(pdf_path) as doc:
+        for page_num, region in regions:
+            page = doc[page_num - 1]
+            clip = fitz.Rect(region) & page.rect
+            if clip.is_empty:
+                results.append((page_num, region, ""))
+                continue
+            pix = page.get_pixmap(clip=clip, dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+            image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            results.append((page_num, region, recognize(image, lang).strip()))
+    return results
+
+
+def ocr_captions(conn, pdf_path, records, rules=None, workers=None):
+    """캡션이 없는 이미지 기록에 OCR 캡션을 채움 - 새로 OCR한 영역 수 반환
+
+    records는 layout=True로 추출한 기록 (rect 필요). 캐시에 있는 영역은
+    다시 래스터화하지 않고, 나머지는 batch_pages 페이지씩 묶어 프로세스
+    풀에서 처리한다. 인식 결과가 비어 있으면 caption은 None으로 남는다.
+    """
+    rules = rules or OCR_RULES
+    backend = rules["backend"]
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f"알 수 없는 OCR 엔진: {backend} (사용 가능: {', '.join(OCR_BACKENDS)})")
+
+    conn.executescript(SCHEMA)
+    pdf_hash = current_hash(conn, pdf_path) or file_hash(pdf_path)
+
+    targets = {}
+    for record in records:
+        if record["filename"] and not record.get("caption") and record.get("rect"):
+            region = caption_region(record["rect"], rules["band"])
+            targets.setdefault((record["page"], region), []).append(record)
+
+    texts = {}
+    for page, region in targets:
+        row = conn.execute(
+            "SELECT text FROM ocr_cache WHERE pdfHash = ? AND page = ? AND region = ? AND backend = ?",
+            (pdf_hash, page, region_key(region), backend),
+        ).fetchone()
+        if row:
+            texts[(page, region)] = row[0]
+
+    # 캐시에 없는 영역을 페이지 묶음 단위 작업으로
+    pending = sorted(key for key in targets if key not in texts)
+    pages = sorted({page for page, _ in pending})
+    batches = []
+    for i in range(0, len(pages), rules["batch_pages"]):
+        batch_pages = set(pages[i:i + rules["batch_pages"]])
+        regions = [key for key in pending if key[0] in batch_pages]
+        batches.append((str(pdf_path), regions, backend, rules["lang"], rules["dpi"]))
+
+    if workers == 1 or len(batches) <= 1:
+        results = [ocr_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(ocr_batch, batches))
+
+    now = datetime.now().isoformat()
+    rows = []
+    for batch in results:
+        for page, region, text in batch:
+            texts[(page, region)] = text
+            rows.append((pdf_hash, page, region_key(region), backend, text, now))
+    if rows:
+        conn.executemany("INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+
+    for key, matched in targets.items():
+        lines = [line.strip() for line in texts.get(key, "").splitlines() if line.strip()]
+        if lines:
+            for record in matched:
+                record["caption"] = parse_caption(lines)
+
+    return len(pending)
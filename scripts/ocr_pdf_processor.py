@@ -3,19 +3,24 @@
 OCR 기반 PDF 처리 스크립트
 나폴레옹, 오캐롤, 에드거앨런포 뮤지컬 의상 데이터 생성
 """
-import fitz  # PyMuPDF
 import os
+import argparse
 import sqlite3
 import uuid
-import hashlib
-from pathlib import Path
 from datetime import datetime
 
-# 경로 설정
-BASE_DIR = Path("c:/Users/parkm/stage-equipment-rental")
-SOURCE_DIR = BASE_DIR / "source"
-UPLOAD_DIR = BASE_DIR / "backend" / "uploads" / "products"
-DB_PATH = BASE_DIR / "backend" / "stage_rental.db"
+from ingest_config import SOURCE_DIR, UPLOAD_DIR, DB_PATH, UPLOAD_URL, OCR_RULES, find_source_pdf
+from pdf_ingest import make_job, ingest, group_by_page, extract_page_images
+from caption_layout import caption_costumes
+from ocr_backend import OCR_BACKENDS, ocr_captions
+from bulk_loader import open_loader, finish_loader, supplier_id, add_product, source_key, retire_missing
+from image_metadata import save_metadata
+from stats import product_stats
+from ingest_metrics import enable_trace, add_arguments, write_run
+from ingest_state import open_state, needs_seeding, mark_seeded
+
+# 매니페스트에서 이 스크립트의 상품 반영 기록을 구분하는 이름
+SEEDER = "ocr_pdf_processor"
 
 # 업로드 디렉토리 생성
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -150,82 +155,13 @@ POE_COSTUMES = [
     {"character": "붉은 죽음의 가면", "scene": "무도회", "costume": "붉은 망토와 가면", "page": 13, "image_index": 0},
 ]
 
-def get_category_id(conn, category_name="의상"):
-    """카테고리 ID 조회 또는 생성"""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM categories WHERE name LIKE ?", (f"%{category_name}%",))
-    result = cursor.fetchone()
-
-    if result:
-        return result[0]
-
-    # 카테고리가 없으면 생성
-    cat_id = str(uuid.uuid4())
-    now = datetime.now().isoformat()
-    cursor.execute(
-        "INSERT INTO categories (id, name, slug, description, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?, ?)",
-        (cat_id, category_name, category_name.lower(), f"{category_name} 카테고리", now, now)
-    )
-    return cat_id
-
-def get_supplier_id(conn):
-    """공급자 ID 조회"""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM users WHERE role = 'supplier' OR role = 'admin' LIMIT 1")
-    result = cursor.fetchone()
-    return result[0] if result else None
-
 def extract_images_from_page(doc, page_num, musical_name):
-    """특정 페이지에서 이미지 추출"""
-    images = []
-    page = doc[page_num]
-    image_list = page.get_images()
-
-    for img_index, img in enumerate(image_list):
-        xref = img[0]
-        try:
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            image_ext = base_image["ext"]
-
-            # 최소 크기 필터 (5KB 이상)
-            if len(image_bytes) < 5000:
-                continue
-
-            # 파일명 생성
-            img_hash = hashlib.md5(image_bytes).hexdigest()[:8]
-            filename = f"{musical_name}_p{page_num+1}_img{img_index+1}_{img_hash}.{image_ext}"
-            filepath = UPLOAD_DIR / filename
-
-            # 이미지 저장
-            with open(filepath, "wb") as f:
-                f.write(image_bytes)
-
-            images.append({
-                "filename": filename,
-                "path": str(filepath),
-                "index": img_index,
-                "size": len(image_bytes)
-            })
-        except Exception as e:
-            pass  # 이미지 추출 실패 무시
-
-    return images
-
-def clear_old_products(conn, musical_keyword):
-    """기존 상품 삭제"""
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM products WHERE title LIKE ?", (f"%{musical_keyword}%",))
-    deleted = cursor.rowcount
-    print(f"  기존 '{musical_keyword}' 상품 {deleted}개 삭제됨")
-    return deleted
-
-def create_product(conn, costume, image_url, supplier_id, musical_name):
-    """상품 생성"""
-    cursor = conn.cursor()
-    product_id = str(uuid.uuid4())
-    category_id = get_category_id(conn, "의상")
+    """특정 페이지에서 이미지 추출 (메타데이터 필터 통과분만 저장)"""
+    records = extract_page_images(doc, page_num, UPLOAD_DIR)
+    return [r for r in records if r["filename"]]
 
+def create_product(loader, costume, image_url, supplier_id, musical_name, pdf_path):
+    """상품 생성 또는 갱신 (PDF/페이지/이미지 순번이 같은 기존 상품은 ID 유지)"""
     title = f"[{musical_name}] {costume['character']} - {costume['scene']} {costume['costume']}"
 
     description = f"""뮤지컬 '{musical_name}'의 {costume['character']} 캐릭터 의상입니다.
@@ -236,153 +172,186 @@ def create_product(conn, costume, image_url, supplier_id, musical_name):
 무대 공연, 연극, 뮤지컬, 코스프레 등 다양한 용도로 대여 가능합니다."""
 
     price = 50000
-    now = datetime.now().isoformat()
-
-    cursor.execute("""
-        INSERT INTO products (id, supplierId, title, description, images, categoryId, baseDailyPrice, status, createdAt, updatedAt)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        product_id,
-        supplier_id,
-        title,
-        description,
-        image_url,
-        category_id,
-        price,
-        "active",
-        now,
-        now
-    ))
-
-    return product_id
-
-def process_musical(conn, supplier_id, pdf_path, musical_name, costumes):
-    """뮤지컬 PDF 처리"""
+
+    key = source_key(musical_name, pdf_path, costume["page"], costume["image_index"])
+    return add_product(
+        loader, supplier_id, title, description, image_url, "의상", price, key=key,
+        production=musical_name, character=costume["character"], scene=costume["scene"],
+    )
+
+def process_musical(loader, supplier_id, pdf_path, musical_name, costumes, state, seeded, force=False,
+                    collapse=False, layout=False, ocr=None):
+    """뮤지컬 PDF 처리 (PDF가 바뀌지 않았으면 기존 상품 유지)
+
+    상품은 자연 키로 기존 행을 갱신하고, PDF에서 사라진 상품은 비활성화한다.
+
+    collapse면 근사 중복 사진은 클러스터 대표 이미지 URL 하나로 통일한다.
+    layout이면 수작업 의상 목록 대신 페이지에서 이미지 옆 캡션을 읽어 상품을 만든다.
+    ocr(엔진 이름)을 주면 텍스트 레이어에서 캡션을 못 찾은 이미지는 OCR로 읽는다.
+    """
+    layout = layout or bool(ocr)
     print(f"\n{'=' * 60}")
     print(f"{musical_name} - 상품 생성")
     print("=" * 60)
 
-    # 기존 상품 삭제
-    clear_old_products(conn, musical_name)
-
     if not pdf_path.exists():
         print(f"  PDF 파일 없음: {pdf_path}")
         return 0
 
-    doc = fitz.open(pdf_path)
-    print(f"  PDF 열기 성공: {len(doc)} 페이지")
+    # 페이지 샤드 단위 병렬 추출 (이미 추출된 페이지는 매니페스트에서 읽음)
+    job = make_job(musical_name.replace(" ", ""), pdf_path)
+    records = ingest([job], UPLOAD_DIR, state=state, layout=layout)[job["path"]]
+    save_metadata(loader["conn"], records)
+
+    if not force and not needs_seeding(state, SEEDER, pdf_path):
+        print("  PDF 변경 없음, 기존 상품 유지")
+        return 0
+
+    seeded.append(pdf_path)
 
     created_count = 0
-    page_images = {}
+    page_images = group_by_page(records)
+
+    if collapse:
+        from image_phash import collapse_records
+
+        canonical = collapse_records(state, records)
+        filenames = {r["hash"]: r["filename"] for r in records if r["filename"]}
+        for images in page_images.values():
+            for img in images:
+                key = canonical.get(img["hash"], img["hash"])
+                if key in filenames:
+                    img["filename"] = filenames[key]
 
-    # 각 페이지별 이미지 추출
-    for page_num in range(len(doc)):
-        images = extract_images_from_page(doc, page_num, musical_name.replace(" ", ""))
-        page_images[page_num + 1] = images
-        if images:
-            print(f"  페이지 {page_num + 1}: {len(images)}개 이미지 추출")
+    for page, images in sorted(page_images.items()):
+        print(f"  페이지 {page}: {len(images)}개 이미지 추출")
+
+    if ocr:
+        count = ocr_captions(state, pdf_path, records, {**OCR_RULES, "backend": ocr})
+        print(f"  캡션 OCR: {count}개 영역 인식 (나머지는 캐시)")
+
+    if layout:
+        captioned = caption_costumes(records)
+        print(f"  캡션 매칭: {len(captioned)}개 이미지")
+        if captioned:
+            costumes = captioned
 
     # 의상 데이터와 이미지 매칭하여 상품 생성
     for costume in costumes:
+        if costume.get("filename"):
+            # 캡션으로 매칭된 이미지
+            try:
+                create_product(loader, costume, f"{UPLOAD_URL}/{costume['filename']}", supplier_id, musical_name,
+                               pdf_path)
+                created_count += 1
+            except Exception as e:
+                print(f"  상품 생성 실패: {e}")
+            continue
+
         page = costume["page"]
         img_idx = costume["image_index"]
 
         images = page_images.get(page, [])
 
         if img_idx < len(images):
-            image_url = f"http://localhost:3001/uploads/products/{images[img_idx]['filename']}"
+            image_url = f"{UPLOAD_URL}/{images[img_idx]['filename']}"
         else:
             # 이미지가 없으면 해당 페이지의 첫 번째 이미지 사용
             if images:
-                image_url = f"http://localhost:3001/uploads/products/{images[0]['filename']}"
+                image_url = f"{UPLOAD_URL}/{images[0]['filename']}"
             else:
                 # 가장 가까운 페이지의 이미지 사용
-                for p in range(page, min(page + 5, len(doc) + 1)):
+                for p in range(page, page + 5):
                     if page_images.get(p):
-                        image_url = f"http://localhost:3001/uploads/products/{page_images[p][0]['filename']}"
+                        image_url = f"{UPLOAD_URL}/{page_images[p][0]['filename']}"
                         break
                 else:
                     image_url = ""
 
         try:
-            create_product(conn, costume, image_url, supplier_id, musical_name)
+            create_product(loader, costume, image_url, supplier_id, musical_name, pdf_path)
             created_count += 1
         except Exception as e:
             print(f"  상품 생성 실패: {e}")
 
-    doc.close()
-    print(f"  {musical_name}: {created_count}개 상품 생성 완료")
+    retired = retire_missing(loader, musical_name, pdf_path)
+    print(f"  {musical_name}: {created_count}개 상품 반영 완료 (비활성화 {retired}개)")
     return created_count
 
 def main():
+    parser = argparse.ArgumentParser(description="뮤지컬 의상 데이터 생성")
+    parser.add_argument("--full", action="store_true", help="PDF 변경 여부와 관계없이 전체 재생성")
+    parser.add_argument("--collapse-duplicates", action="store_true", help="근사 중복 사진은 대표 이미지 하나로 통일")
+    parser.add_argument("--layout", action="store_true", help="수작업 의상 목록 대신 PDF 캡션으로 상품 생성")
+    parser.add_argument("--ocr", choices=list(OCR_BACKENDS), default=None,
+                        help="텍스트 레이어가 없는 캡션을 OCR로 읽음 (--layout 포함)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
     print("=" * 60)
     print("뮤지컬 의상 데이터 생성 (나폴레옹, 오캐롤, 에드거앨런포)")
     print("=" * 60)
 
     conn = sqlite3.connect(str(DB_PATH))
+    state = open_state()
+    seeded = []
+
+    # 상품 적재/갱신 전체를 한 트랜잭션으로 (카테고리/공급자는 캐시)
+    loader = open_loader(conn)
 
     # 공급자 ID 가져오기
-    supplier_id = get_supplier_id(conn)
-    if not supplier_id:
+    supplier = supplier_id(loader)
+    if not supplier:
         print("공급자 없음. 기본 공급자 생성 중...")
         cursor = conn.cursor()
-        supplier_id = str(uuid.uuid4())
+        supplier = str(uuid.uuid4())
         now = datetime.now().isoformat()
         cursor.execute("""
             INSERT INTO users (id, email, password, name, role, createdAt, updatedAt)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (supplier_id, "supplier@example.com", "hashed_password", "기본 공급자", "supplier", now, now))
+        """, (supplier, "supplier@example.com", "hashed_password", "기본 공급자", "supplier", now, now))
 
     # 각 뮤지컬 처리
     total_created = 0
 
     # 나폴레옹
-    napoleon_pdf = SOURCE_DIR / "나폴레옹 의상 파트 바이블" / "2017 나폴레옹 캐릭터별 사진 리스트.pdf"
-    if not napoleon_pdf.exists():
-        napoleon_pdf = SOURCE_DIR / "2017 나폴레옹 캐릭터별 사진 리스트.pdf"
-    total_created += process_musical(conn, supplier_id, napoleon_pdf, "나폴레옹", NAPOLEON_COSTUMES)
+    napoleon_pdf = find_source_pdf(
+        "나폴레옹 의상 파트 바이블/2017 나폴레옹 캐릭터별 사진 리스트.pdf",
+        "2017 나폴레옹 캐릭터별 사진 리스트.pdf",
+    )
+    total_created += process_musical(loader, supplier, napoleon_pdf, "나폴레옹", NAPOLEON_COSTUMES,
+                                     state, seeded, args.full, args.collapse_duplicates, args.layout, args.ocr)
 
     # 오캐롤
-    ocarol_pdf = SOURCE_DIR / "오캐롤 의상파트 바이블" / "5.2017 오!캐롤 -배우별 의상바이블.pdf"
-    if not ocarol_pdf.exists():
-        ocarol_pdf = SOURCE_DIR / "5.2017 오!캐롤 -배우별 의상바이블.pdf"
-    total_created += process_musical(conn, supplier_id, ocarol_pdf, "오캐롤", OCAROL_COSTUMES)
+    ocarol_pdf = find_source_pdf(
+        "오캐롤 의상파트 바이블/5.2017 오!캐롤 -배우별 의상바이블.pdf",
+        "5.2017 오!캐롤 -배우별 의상바이블.pdf",
+    )
+    total_created += process_musical(loader, supplier, ocarol_pdf, "오캐롤", OCAROL_COSTUMES,
+                                     state, seeded, args.full, args.collapse_duplicates, args.layout, args.ocr)
 
     # 에드거 앨런 포
     poe_pdf = SOURCE_DIR / "2016 사람별의상바이블.pdf"
-    total_created += process_musical(conn, supplier_id, poe_pdf, "에드거앨런포", POE_COSTUMES)
+    total_created += process_musical(loader, supplier, poe_pdf, "에드거앨런포", POE_COSTUMES,
+                                     state, seeded, args.full, args.collapse_duplicates, args.layout, args.ocr)
 
-    conn.commit()
+    finish_loader(loader)
+    mark_seeded(state, SEEDER, seeded)
+    state.close()
 
     # 결과 확인
-    cursor = conn.cursor()
     print("\n" + "=" * 60)
     print("최종 결과")
     print("=" * 60)
 
-    cursor.execute("""
-        SELECT
-            CASE
-                WHEN title LIKE '%바람%' THEN '바람과 함께 사라지다'
-                WHEN title LIKE '%나폴레옹%' THEN '나폴레옹'
-                WHEN title LIKE '%오캐롤%' THEN '오캐롤'
-                WHEN title LIKE '%에드거%' OR title LIKE '%포%' THEN '에드거앨런포'
-                ELSE '기타'
-            END as musical,
-            COUNT(*) as count
-        FROM products
-        GROUP BY musical
-        ORDER BY musical
-    """)
-
-    for row in cursor.fetchall():
-        print(f"  {row[0]}: {row[1]}개")
-
-    cursor.execute("SELECT COUNT(*) FROM products")
-    total = cursor.fetchone()[0]
-    print(f"\n총 상품 수: {total}개")
+    summary = product_stats(conn)
+    for musical, count in summary["byMusical"].items():
+        print(f"  {musical}: {count}개")
+    print(f"\n총 상품 수: {summary['total']}개")
 
     conn.close()
+    write_run(SEEDER, args.metrics, args.trace)
 
 if __name__ == "__main__":
     main()
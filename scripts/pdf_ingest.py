@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+PDF 이미지 추출 엔진
+뮤지컬 -> PDF 매니페스트를 페이지 구간(샤드) 단위로 나눠 프로세스 풀에서 병렬 추출
+메타데이터 필터(image_filter)를 통과한 이미지만 디코딩해 콘텐츠 주소 저장소(image_store)에 저장
+브라우저용이 아닌 포맷/색공간(JPX, JBIG2, CMYK 등)은 저장하면서 sRGB JPEG/WebP로 변환 (image_normalize)
+디코딩은 제너레이터로 하나씩, 해시/저장은 쓰기 스레드 풀에서 (대기 이미지 수 제한)
+매니페스트(ingest_state)를 넘기면 변경 없는 PDF/페이지는 건너뛰고 샤드마다 체크포인트
+"""
+
+import fitz  # PyMuPDF
+import os
+import time
+import argparse
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from ingest_config import SOURCE_DIR, UPLOAD_DIR, DB_PATH, MUSICAL_PDFS
+from image_store import STORE_LAYOUT
+from image_normalize import store_web_image, normalize_key
+from image_filter import image_info, check_image, rules_key
+from caption_layout import page_layout
+from ingest_state import open_state, sync_pdf, save_pages, mark_complete, load_records
+from ingest_metrics import stage, measured, merge, tracing, enable_trace, add_arguments, write_run
+from ingest_metrics import record as record_stage
+
+# 샤드 하나가 담당하는 페이지 수
+SHARD_PAGES = 16
+
+# 디코딩 후 저장을 기다리는 이미지 최대 개수 (워커당 메모리 상한)
+MAX_IN_FLIGHT = 8
+
+# 워커당 해시 계산/디스크 쓰기 스레드 수
+WRITER_THREADS = 4
+
+# Pillow가 읽지 못하는 원본 스트림 (PyMuPDF로 풀어 PNG로 넘김)
+PIXMAP_EXTS = {"jb2", "jbig2"}
+
+
+def make_job(musical_name, pdf_path, pdf_name=None):
+    """PDF 하나에 대한 추출 작업"""
+    return {
+        "musical": musical_name,
+        "pdf": pdf_name or Path(pdf_path).name,
+        "path": str(pdf_path),
+    }
+
+
+def build_jobs(manifest=None, source_dir=SOURCE_DIR):
+    """뮤지컬 -> PDF 매니페스트를 추출 작업 목록으로 변환"""
+    jobs = []
+    for musical, pdf_files in (manifest or MUSICAL_PDFS).items():
+        for pdf_file in pdf_files:
+            pdf_path = Path(source_dir) / pdf_file
+            jobs.append(make_job(musical, pdf_path, pdf_file))
+    return jobs
+
+
+def page_runs(pages, max_len):
+    """정렬된 페이지 번호를 연속 구간 (최대 max_len 페이지)으로 묶기"""
+    runs = []
+    for page in pages:
+        if runs and page == runs[-1][1] and runs[-1][1] - runs[-1][0] < max_len:
+            runs[-1][1] = page + 1
+        else:
+            runs.append([page, page + 1])
+    return [tuple(run) for run in runs]
+
+
+def plan_shards(jobs, shard_pages=SHARD_PAGES, state=None, options=""):
+    """작업을 페이지 구간 샤드로 분할 (없는 PDF, 이미 추출된 페이지는 제외)"""
+    shards = []
+    for job in jobs:
+        if not os.path.exists(job["path"]):
+            print(f"  파일 없음: {job['pdf']}")
+            continue
+
+        with stage("pdf_open"), fitz.open(job["path"]) as doc:
+            page_count = len(doc)
+
+        done = sync_pdf(state, job["path"], page_count, options) if state is not None else set()
+        pending = [page for page in range(page_count) if page not in done]
+        if done:
+            print(f"  {job['pdf']}: {len(done)}/{page_count} 페이지 추출됨, {len(pending)} 페이지 남음")
+
+        for start, end in page_runs(pending, shard_pages):
+            shards.append({**job, "start": start, "end": end})
+    return shards
+
+
+def decode_page_images(doc, page_num, xref_cache, rules=None, layout=False):
+    """한 페이지의 이미지를 하나씩 디코딩하는 제너레이터 - (기록, 이미지 바이트) 생성
+
+    메타데이터 규칙에 걸렸거나, 추출에 실패했거나, xref_cache에 있는(이미
+    디코딩한) 이미지는 바이트 없이 None으로 넘긴다. 소비하는 쪽이 당겨갈 때만
+    다음 이미지를 디코딩하므로 메모리에는 대기 중인 이미지만 남는다.
+    layout이면 같은 페이지 순회에서 이미지 위치(rect)와 가장 가까운 캡션도 붙인다.
+    """
+    with stage("get_images"):
+        page = doc[page_num]
+        images = page.get_images(full=True)
+    if layout:
+        with stage("layout"):
+            placements = page_layout(page, images)
+    else:
+        placements = {}
+
+    for img_index, img in enumerate(images):
+        info = image_info(img)
+        xref = info["xref"]
+        record = {
+            "page": page_num + 1,
+            "index": img_index,
+            "xref": xref,
+            "width": info["width"],
+            "height": info["height"],
+            "size": 0,
+            "ext": None,
+            "hash": None,
+            "filename": None,
+            "path": None,
+            "stored": False,
+            "skipped": check_image(info, rules),
+        }
+        if layout:
+            record.update(placements.get(xref, {"rect": None, "caption": None}))
+
+        if record["skipped"] or xref in xref_cache:
+            yield record, None
+            continue
+
+        try:
+            started = time.perf_counter()
+            base_image = doc.extract_image(xref)
+            record_stage("extract_image", time.perf_counter() - started, len(base_image["image"]), start=started)
+        except Exception as e:
+            print(f"    이미지 추출 실패 (페이지 {page_num+1}, 이미지 {img_index+1}): {e}")
+            yield record, None
+            continue
+
+        if base_image["ext"] in PIXMAP_EXTS:
+            pix = fitz.Pixmap(doc, xref)
+            base_image = {"image": pix.tobytes("png"), "ext": "png", "colorspace": pix.n - pix.alpha}
+
+        # 저장이 끝나기 전이라도 같은 xref는 다시 디코딩하지 않음
+        xref_cache[xref] = None
+        record["size"] = len(base_image["image"])
+        record["ext"] = base_image["ext"]
+        record["colorspace"] = base_image.get("colorspace")
+        yield record, base_image["image"]
+
+
+def store_stream(items, output_dir, writers, xref_cache, max_in_flight=MAX_IN_FLIGHT, normalize=None):
+    """(기록, 이미지 바이트) 스트림을 쓰기 스레드 풀에서 해시/변환/저장하고 기록을 순서대로 생성
+
+    저장 대기 중인 이미지는 최대 max_in_flight개로 제한한다. 대기열이 차면
+    가장 오래된 저장이 끝날 때까지 다음 디코딩을 멈춘다. 입력 순서대로
+    내보내므로 중복 xref 기록은 항상 첫 기록의 저장이 끝난 뒤에 채워진다.
+    """
+    in_flight = deque()
+
+    def finish(record, future):
+        if future is not None:
+            digest, relpath, stored, ext = future.result()
+            result = {
+                "size": record["size"],
+                "ext": ext,
+                "hash": digest,
+                "filename": relpath,
+                "path": str(Path(output_dir) / relpath),
+            }
+            xref_cache[record["xref"]] = result
+            record.update(result, stored=stored)
+        elif not record["skipped"] and xref_cache.get(record["xref"]):
+            record.update(xref_cache[record["xref"]], stored=False)
+        return record
+
+    for record, image_bytes in items:
+        future = None
+        if image_bytes is not None:
+            future = writers.submit(
+                store_web_image, output_dir, image_bytes, record["ext"], record["colorspace"], normalize
+            )
+        in_flight.append((record, future))
+
+        while len(in_flight) >= max_in_flight:
+            yield finish(*in_flight.popleft())
+
+    while in_flight:
+        yield finish(*in_flight.popleft())
+
+
+def iter_images(doc, pages, output_dir, rules=None, xref_cache=None, writers=WRITER_THREADS, layout=False,
+                normalize=None):
+    """페이지들의 이미지 기록을 스트리밍으로 생성 (디코딩과 저장을 겹쳐 실행)
+
+    xref_cache를 넘기면 같은 문서에서 여러 페이지에 쓰인 이미지(xref)는
+    한 번만 디코딩한다. filename은 저장소(output_dir) 기준 상대 경로이다.
+    normalize는 포맷 정규화 규칙 (기본 NORMALIZE_RULES).
+    """
+    if xref_cache is None:
+        xref_cache = {}
+
+    def decode():
+        for page_num in pages:
+            yield from decode_page_images(doc, page_num, xref_cache, rules, layout)
+
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        yield from store_stream(decode(), str(output_dir), pool, xref_cache, normalize=normalize)
+
+
+def extract_page_images(doc, page_num, output_dir, rules=None, xref_cache=None):
+    """한 페이지의 이미지 추출
+
+    페이지 내 모든 이미지에 대해 기록을 반환한다. 메타데이터 규칙에 걸리면
+    디코딩하지 않고 skipped에 사유를 남기며, 걸렸거나 추출에 실패한 이미지는
+    filename이 None으로 남는다.
+    """
+    return list(iter_images(doc, [page_num], output_dir, rules, xref_cache))
+
+
+def extract_shard(shard, output_dir, rules=None, layout=False, normalize=None):
+    """샤드(한 PDF의 페이지 구간) 추출 - 프로세스 풀 워커"""
+    records = []
+    pages = range(shard["start"], shard["end"])
+    with stage("pdf_open"):
+        doc = fitz.open(shard["path"])
+    with doc:
+        for record in iter_images(doc, pages, output_dir, rules, layout=layout, normalize=normalize):
+            record.update(musical=shard["musical"], pdf=shard["pdf"])
+            records.append(record)
+    return records
+
+
+def iter_pdf_images(pdf_path, output_dir, musical_name, rules=None, layout=False, normalize=None):
+    """PDF 하나를 현재 프로세스에서 순차 추출하며 기록을 하나씩 생성"""
+    pdf_name = Path(pdf_path).name
+    with stage("pdf_open"):
+        doc = fitz.open(pdf_path)
+    with doc:
+        for record in iter_images(doc, range(len(doc)), output_dir, rules, layout=layout, normalize=normalize):
+            record.update(musical=musical_name, pdf=pdf_name)
+            yield record
+
+
+def extract_pdf(pdf_path, output_dir, musical_name, rules=None, layout=False, normalize=None):
+    """PDF 하나를 현재 프로세스에서 순차 추출"""
+    return list(iter_pdf_images(pdf_path, output_dir, musical_name, rules, layout, normalize))
+
+
+def ingest(jobs, output_dir=UPLOAD_DIR, workers=None, shard_pages=SHARD_PAGES, rules=None, state=None,
+           layout=False, normalize=None):
+    """작업 목록 전체를 병렬 추출
+
+    반환값은 PDF 경로 -> 이미지 기록 리스트 (페이지/이미지 순서 유지).
+    state(ingest_state 연결)를 넘기면 끝난 샤드마다 페이지 결과를 저장하고,
+    이전 실행에서 추출된 페이지는 다시 열지 않고 저장된 기록을 돌려준다.
+    layout이면 기록마다 이미지 위치(rect)와 캡션(caption_layout)이 붙는다.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    options = f"{output_dir}|{STORE_LAYOUT}|{rules_key(rules)}|{normalize_key(normalize)}"
+    if layout:
+        options += "|layout"
+    shards = plan_shards(jobs, shard_pages, state, options)
+    results = {job["path"]: [] for job in jobs}
+
+    def collect(shard, records):
+        if state is None:
+            results[shard["path"]].extend(records)
+            return
+        # 이미지가 없는 페이지도 완료로 기록
+        pages = {page + 1: [] for page in range(shard["start"], shard["end"])}
+        for record in records:
+            pages[record["page"]].append(record)
+        with stage("checkpoint", items=len(pages)):
+            save_pages(state, shard["path"], options, pages)
+
+    if workers == 1 or len(shards) <= 1:
+        for shard in shards:
+            collect(shard, extract_shard(shard, str(output_dir), rules, layout, normalize))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(measured, extract_shard, tracing(), shard, str(output_dir), rules, layout, normalize): shard
+                for shard in shards
+            }
+            for future in as_completed(futures):
+                records, metrics = future.result()
+                merge(metrics)
+                collect(futures[future], records)
+
+    for job in jobs:
+        if state is not None and os.path.exists(job["path"]):
+            mark_complete(state, job["path"], options)
+            results[job["path"]] = load_records(state, job["path"], options)
+        else:
+            results[job["path"]].sort(key=lambda r: (r["page"], r["index"]))
+
+    return results
+
+
+def group_by_page(records):
+    """저장된 이미지 기록을 페이지 번호별로 묶기"""
+    pages = {}
+    for record in records:
+        if record["filename"]:
+            pages.setdefault(record["page"], []).append(record)
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="뮤지컬 PDF 이미지 병렬 추출")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--shard-pages", type=int, default=SHARD_PAGES, help="샤드당 페이지 수")
+    parser.add_argument("--full", action="store_true", help="매니페스트를 무시하고 전체 재추출")
+    parser.add_argument("--variants", action="store_true", help="추출 후 반응형 이미지 변형도 생성")
+    parser.add_argument("--plan", action="store_true", help="추출하지 않고 메타데이터만으로 계획 보고서(JSON) 출력")
+    parser.add_argument("--output", default=None, help="--plan 보고서 저장 경로 (기본: 표준 출력)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    if args.plan:
+        from ingest_plan import build_plan, write_plan
+
+        write_plan(build_plan(build_jobs(), args.workers), args.output)
+        return
+
+    print("=" * 60)
+    print("PDF 이미지 병렬 추출")
+    print("=" * 60)
+
+    state = None if args.full else open_state()
+    results = ingest(build_jobs(), UPLOAD_DIR, args.workers, args.shard_pages, state=state)
+
+    total = 0
+    written = 0
+    for pdf_path, records in results.items():
+        saved = sum(1 for r in records if r["filename"])
+        stored = sum(1 for r in records if r["stored"])
+        skipped = sum(1 for r in records if r["skipped"])
+        total += saved
+        written += stored
+        print(f"  {Path(pdf_path).name}: 이미지 {saved}개 (신규 파일 {stored}개, 필터 제외 {skipped}개)")
+
+    print(f"\n총 {total}개 이미지 추출, 신규 파일 {written}개 저장 (중복 {total - written}개)")
+
+    # Pillow/numpy가 필요한 단계라 사용할 때만 불러온다
+    from image_metadata import save_metadata
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        count = save_metadata(conn, [r for records in results.values() for r in records], args.workers)
+        conn.commit()
+        print(f"이미지 메타데이터 기록: {count}개")
+
+        if args.variants:
+            from image_variants import generate_variants
+
+            paths = [r["path"] for records in results.values() for r in records if r["filename"]]
+            count = generate_variants(conn, paths, args.workers)
+            print(f"이미지 변형 생성: 원본 {count}개")
+    finally:
+        conn.close()
+
+    write_run("pdf_ingest", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+상품 작품/캐릭터/장면 속성 (products.production / character / scene)
+시드 스크립트는 의상 dict에서 바로 채우고, 예전 상품은 제목/설명을 파싱해 채운다
+  "[바람사] 스칼렛 - 초록 드레스", "[나폴레옹] 나폴레옹 - 대관식 황제 예복",
+  "나폴레옹 - 신발 #3-1a2b3c4d", 설명의 "뮤지컬 '...'의 ... 캐릭터", "■ 장면: ..."
+작품 이름은 PRODUCTION_ALIASES 기준 이름으로 통일 ("바람과 함께 사라지다" -> "바람사")
+
+  python scripts/data_migration.py product-attributes   # 예전 상품 채우기 (프로세스 풀, 이어서 실행)
+"""
+
+import re
+
+from ingest_config import PRODUCTION_ALIASES
+
+ATTRIBUTE_COLUMNS = ("production", "character", "scene")
+
+# Product 엔티티의 @Index와 같은 이름/컬럼 (작품별 조회는 모두 인덱스로)
+ATTRIBUTE_INDEXES = {
+    "IDX_products_production_status": ("production", "status"),
+    "IDX_products_production_character": ("production", "character"),
+    "IDX_products_production_scene": ("production", "scene"),
+}
+
+TITLE_TAG = re.compile(r"^\s*\[([^\]]+)\]\s*(.*)$")
+DESCRIPTION_CHARACTER = re.compile(r"뮤지컬 '([^']+)'의 (.+?) 캐릭터")
+DESCRIPTION_PRODUCTION = re.compile(r"뮤지컬 '([^']+)'")
+DESCRIPTION_SCENE = re.compile(r"■ 장면:\s*(.+)")
+
+# 비교할 때 무시하는 문자 (공백, 문장 부호)
+NOISE = re.compile(r"[\s!?.,·:'\"-]+")
+
+
+def squash(text):
+    """비교용 - 공백/문장 부호 제거"""
+    return NOISE.sub("", text or "")
+
+
+# 표기 -> 기준 이름 (기준 이름 자신 포함)
+_ALIASES = {
+    squash(alias): name for name, aliases in PRODUCTION_ALIASES.items() for alias in [name, *aliases]
+}
+
+
+def production_name(text):
+    """작품 표기 -> 기준 이름 (모르는 작품이면 표기 그대로, 비어 있으면 None)
+
+    잘린 제목 태그("[바람과 ]")도 알려진 표기의 앞부분이면 같은 작품으로 본다.
+    """
+    key = squash(text)
+    if not key:
+        return None
+    if key in _ALIASES:
+        return _ALIASES[key]
+    if len(key) >= 2:
+        for alias, name in _ALIASES.items():
+            if alias.startswith(key):
+                return name
+    return text.strip()
+
+
+def parse_attributes(title, description):
+    """제목/설명 -> (작품, 캐릭터, 장면) - 알 수 없는 항목은 None
+
+    설명의 "뮤지컬 'X'의 Y 캐릭터" / "■ 장면: Z"가 제목보다 정확하므로 먼저 본다.
+    """
+    production = character = scene = None
+    description = description or ""
+    title = title or ""
+
+    match = DESCRIPTION_CHARACTER.search(description)
+    if match:
+        production, character = match.group(1), match.group(2)
+    else:
+        match = DESCRIPTION_PRODUCTION.search(description)
+        if match:
+            production = match.group(1)
+
+    match = DESCRIPTION_SCENE.search(description)
+    if match:
+        scene = match.group(1).strip()
+
+    tagged = TITLE_TAG.match(title)
+    if tagged:
+        tag, rest = tagged.groups()
+        production = production or tag
+        # "[작품] 캐릭터 - 의상"
+        if character is None and " - " in rest:
+            character = rest.split(" - ", 1)[0].strip()
+    elif production is None and " - " in title:
+        # "작품 - 카테고리 #페이지-해시" (extract_and_seed.py)
+        production = title.split(" - ", 1)[0]
+
+    return production_name(production), (character or None), (scene or None)
+
+
+def fill_attributes(values):
+    """data_migration 변환 - (제목, 설명, 작품, 캐릭터, 장면) -> 비어 있던 속성만 채운 값 (그대로면 None)"""
+    title, description, *current = values
+    parsed = parse_attributes(title, description)
+    updated = tuple(old if old else new for old, new in zip(current, parsed))
+    return updated if updated != tuple(current) else None
+
+
+def ensure_attribute_columns(conn):
+    """products 속성 컬럼과 복합 인덱스가 없으면 생성"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info("products")')}
+    for column in ATTRIBUTE_COLUMNS:
+        if column not in columns:
+            conn.execute(f'ALTER TABLE "products" ADD COLUMN "{column}" varchar')
+    for name, indexed in ATTRIBUTE_INDEXES.items():
+        quoted = ", ".join('"' + c + '"' for c in indexed)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "products" ({quoted})')
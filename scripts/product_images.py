@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+상품 이미지 정규화 테이블 (product_images)
+products.images / detailImages 문자열(simple-array, JSON, 이중 인코딩)을 풀어
+(상품, 역할, 순서)마다 한 행으로 - 목록 조회는 대표 이미지(main, 0번)만 읽는다
+크기/콘텐츠 해시는 image_metadata에서 채운다 (없으면 NULL, 메타데이터를 채운 뒤 다시 실행)
+
+이미지 컬럼을 쓰는 스크립트는 sync_product_images() (값을 들고 있으면 replace_images())로 바뀐 상품의 행을 다시 만들고,
+main()은 전체 상품을 id 키셋 페이지로 훑어 다시 만든다.
+"""
+
+import argparse
+import sqlite3
+
+from ingest_config import DB_PATH
+from image_urls import parse_images, url_relpath
+from data_migration import iter_pages
+from db_session import apply_pragmas
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+# 이미지 컬럼 -> 역할 (ProductImageRole)
+IMAGE_ROLES = {"images": "main", "detailImages": "detail"}
+
+# 한 페이지(트랜잭션 하나)에 처리하는 상품 수
+PAGE_SIZE = 1000
+
+# SQLite 바인딩 변수 한도 안에서 IN (...) 하나에 넣는 값 수
+IN_CHUNK = 500
+
+# ProductImage 엔티티와 같은 테이블 (TypeORM 동기화와 겹치지 않도록)
+# 목록 조회는 기본 키로만 읽으므로 보조 인덱스는 두지 않는다 (상품마다 쓰는 B-트리 수를 줄임)
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS "product_images" (
+        "productId" varchar NOT NULL,
+        "role" varchar NOT NULL,
+        "position" integer NOT NULL,
+        "url" varchar NOT NULL,
+        "contentHash" varchar,
+        "width" integer,
+        "height" integer,
+        PRIMARY KEY ("productId", "role", "position"),
+        FOREIGN KEY ("productId") REFERENCES "products" ("id") ON DELETE CASCADE
+    )
+    """,
+)
+
+# 예전 스키마의 보조 인덱스 (읽는 쿼리가 없어 적재 비용만 늘림)
+DROPPED_INDEXES = ("IDX_product_images_url", "IDX_product_images_contentHash")
+
+INSERT_IMAGE = (
+    'INSERT INTO "product_images" ("productId", "role", "position", "url", "contentHash", "width", "height") '
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def ensure_schema(conn):
+    """product_images 테이블이 없으면 생성하고 예전 보조 인덱스 제거 (트랜잭션 안에서도 호출 가능)"""
+    for sql in SCHEMA:
+        conn.execute(sql)
+    for name in DROPPED_INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+def chunks(values, size=IN_CHUNK):
+    """리스트를 size개씩"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def lookup_metadata(conn, paths):
+    """uploads 기준 경로 -> (콘텐츠 해시, 가로, 세로) - image_metadata가 없으면 빈 dict"""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'image_metadata'").fetchone():
+        return {}
+    result = {}
+    for part in chunks(sorted(paths)):
+        rows = conn.execute(
+            f'SELECT "sourcePath", "contentHash", "width", "height" FROM "image_metadata" '
+            f'WHERE "sourcePath" IN ({", ".join("?" for _ in part)})',
+            part,
+        )
+        result.update((path, rest) for path, *rest in rows)
+    return result
+
+
+def image_rows(conn, products, columns=tuple(IMAGE_ROLES)):
+    """[(상품 ID, 컬럼 값...)] -> product_images 행 리스트 (모든 형식을 한 번에 파싱)"""
+    roles = [IMAGE_ROLES[c] for c in columns]
+    parsed = []
+    paths = set()
+    for product_id, *values in products:
+        for role, value in zip(roles, values):
+            urls, _ = parse_images(value)
+            for position, url in enumerate(urls):
+                path = url_relpath(url)
+                parsed.append((product_id, role, position, url, path))
+                if path:
+                    paths.add(path)
+
+    metadata = lookup_metadata(conn, paths)
+    return [
+        (product_id, role, position, url, *metadata.get(path, (None, None, None)))
+        for product_id, role, position, url, path in parsed
+    ]
+
+
+def replace_images(conn, products, columns=tuple(IMAGE_ROLES), new=False):
+    """상품들의 product_images 행(columns에 해당하는 역할만)을 지우고 다시 삽입 (커밋하지 않음)
+
+    products는 [(상품 ID, columns 순서의 컬럼 값...)]. new면 방금 삽입한 상품이라 지우지 않는다.
+    """
+    with stage("product_images", items=len(products)):
+        rows = image_rows(conn, products, columns)
+        if not new:
+            roles = ", ".join(f"'{IMAGE_ROLES[c]}'" for c in columns)
+            for part in chunks([p[0] for p in products]):
+                conn.execute(
+                    f'DELETE FROM "product_images" WHERE "role" IN ({roles}) '
+                    f'AND "productId" IN ({", ".join("?" for _ in part)})',
+                    part,
+                )
+        conn.executemany(INSERT_IMAGE, rows)
+    return len(rows)
+
+
+def sync_product_images(conn, product_ids):
+    """이미지 컬럼이 바뀐 상품들의 product_images 다시 만들기 (커밋하지 않음)"""
+    product_ids = list(dict.fromkeys(product_ids))
+    if not product_ids:
+        return 0
+    ensure_schema(conn)
+    columns = ", ".join(f'"{c}"' for c in IMAGE_ROLES)
+    products = []
+    for part in chunks(product_ids):
+        products.extend(conn.execute(
+            f'SELECT "id", {columns} FROM "products" WHERE "id" IN ({", ".join("?" for _ in part)})', part
+        ))
+    return replace_images(conn, products)
+
+
+def backfill(conn, page_size=PAGE_SIZE):
+    """전체 상품의 product_images를 다시 만들고 페이지마다 커밋 - (상품 수, 이미지 행 수)"""
+    ensure_schema(conn)
+    conn.commit()
+    scanned = 0
+    written = 0
+    for rows in iter_pages(conn, tuple(IMAGE_ROLES), "", page_size):
+        written += replace_images(conn, rows)
+        scanned += len(rows)
+        conn.commit()
+    # 그 사이 지워진 상품의 행 (외래 키 검사가 꺼진 연결에서 지운 경우)
+    conn.execute('DELETE FROM "product_images" WHERE "productId" NOT IN (SELECT "id" FROM "products")')
+    conn.commit()
+    return scanned, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="product_images 테이블 채우기 (images / detailImages 파싱)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="트랜잭션 하나에 처리할 상품 수")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    print("=" * 60)
+    print("상품 이미지 테이블 채우기")
+    print("=" * 60)
+
+    conn = sqlite3.connect(str(DB_PATH))
+    apply_pragmas(conn)
+    try:
+        scanned, written = backfill(conn, args.page_size)
+        print(f"\n상품 {scanned}개, 이미지 {written}개 기록")
+    finally:
+        conn.close()
+        write_run("product_images", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+상품 검색 색인 (SQLite FTS5, trigram 토크나이저)
+상품마다 제목/설명/태그/카테고리 텍스트를 한 행으로 색인해 ProductsService.search가
+4중 조인 LIKE 대신 색인 조회 + BM25 순위로 찾는다
+한글은 음절 단위 trigram이라 3글자 이상 검색어는 부분 문자열도 색인으로 찾고,
+1~2글자 검색어는 색인 테이블 한 곳만 LIKE로 훑는다 (조인으로 행이 불어나지 않음)
+
+색인은 products / product_tags / tags / categories 트리거로 동기화되므로
+백엔드나 다른 스크립트가 쓰는 경우에도 따로 호출할 것이 없다.
+TypeORM synchronize가 테이블을 다시 만들며 지운 트리거는 백엔드가 시작할 때 다시 만든다
+(backend/src/products/search-index.ts에 같은 정의).
+
+  python scripts/search_index.py                 # 색인/트리거 생성 후 전체 다시 만들기
+  python scripts/search_index.py --query 드레스   # 검색해 보기
+"""
+
+import time
+import argparse
+import sqlite3
+
+from ingest_config import DB_PATH
+from db_session import apply_pragmas
+from ingest_metrics import stage, add_arguments, enable_trace, write_run
+
+# trigram 토크나이저가 색인으로 찾을 수 있는 최소 글자 수
+MIN_MATCH_LENGTH = 3
+
+# 열별 BM25 가중치 (제목, 설명, 태그, 카테고리) - 색인 설정(rank)에 저장되어 백엔드도 같은 순위
+RANK = "bm25(10.0, 1.0, 5.0, 2.0)"
+
+# 상품 -> 색인 행 번호 (FTS5 rowid는 정수라 uuid 상품 ID를 여기서 이어 준다)
+ROWS_TABLE = """
+CREATE TABLE IF NOT EXISTS "product_search_rows" (
+    "id" INTEGER PRIMARY KEY,
+    "productId" varchar NOT NULL UNIQUE
+)
+"""
+
+SEARCH_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS "product_search" USING fts5(
+    title, description, tags, category,
+    tokenize = 'trigram'
+)
+"""
+
+# 상품 p의 색인 행 (태그는 공백으로 이어 붙임)
+DOCUMENT = """
+    SELECT r."id", p."title", p."description",
+        (SELECT group_concat(t."name", ' ') FROM "product_tags" pt JOIN "tags" t ON t."id" = pt."tagId"
+         WHERE pt."productId" = p."id"),
+        (SELECT c."name" FROM "categories" c WHERE c."id" = p."categoryId")
+    FROM "products" p JOIN "product_search_rows" r ON r."productId" = p."id"
+"""
+
+
+def refresh_sql(where):
+    """where(상품 p 조건)에 해당하는 상품들의 색인 행을 다시 쓰는 트리거 본문"""
+    return f"""
+        INSERT OR IGNORE INTO "product_search_rows" ("productId") SELECT p."id" FROM "products" p WHERE {where};
+        DELETE FROM "product_search" WHERE rowid IN (
+            SELECT r."id" FROM "product_search_rows" r JOIN "products" p ON p."id" = r."productId" WHERE {where}
+        );
+        INSERT INTO "product_search" (rowid, title, description, tags, category) {DOCUMENT} WHERE {where};
+    """
+
+
+# 백엔드(backend/src/products/search-index.ts)에 같은 정의가 있으므로 바꾸면 함께 바꿀 것
+TRIGGERS = {
+    "TRG_product_search_insert": ('AFTER INSERT ON "products"', refresh_sql('p."id" = new."id"')),
+    "TRG_product_search_update": (
+        'AFTER UPDATE OF "title", "description", "categoryId" ON "products"', refresh_sql('p."id" = new."id"'),
+    ),
+    "TRG_product_search_delete": ('AFTER DELETE ON "products"', """
+        DELETE FROM "product_search" WHERE rowid = (
+            SELECT "id" FROM "product_search_rows" WHERE "productId" = old."id"
+        );
+        DELETE FROM "product_search_rows" WHERE "productId" = old."id";
+    """),
+    "TRG_product_search_tag_insert": ('AFTER INSERT ON "product_tags"', refresh_sql('p."id" = new."productId"')),
+    "TRG_product_search_tag_delete": ('AFTER DELETE ON "product_tags"', refresh_sql('p."id" = old."productId"')),
+    "TRG_product_search_tag_rename": ('AFTER UPDATE OF "name" ON "tags"', refresh_sql(
+        'p."id" IN (SELECT "productId" FROM "product_tags" WHERE "tagId" = new."id")'
+    )),
+    "TRG_product_search_category_rename": (
+        'AFTER UPDATE OF "name" ON "categories"', refresh_sql('p."categoryId" = new."id"'),
+    ),
+}
+
+
+def ensure_search_index(conn):
+    """색인 테이블과 동기화 트리거가 없으면 생성 (트리거 정의가 바뀌었으면 다시 생성)"""
+    conn.execute(ROWS_TABLE)
+    conn.execute(SEARCH_TABLE)
+    conn.execute('INSERT INTO "product_search" ("product_search", rank) VALUES (\'rank\', ?)', (RANK,))
+    for name, (event, body) in TRIGGERS.items():
+        conn.execute(f'DROP TRIGGER IF EXISTS "{name}"')
+        conn.execute(f'CREATE TRIGGER "{name}" {event} BEGIN {body} END')
+
+
+def rebuild(conn):
+    """전체 상품 색인을 다시 만들고 커밋 - 색인한 상품 수"""
+    with stage("ensure"):
+        ensure_search_index(conn)
+    with stage("rebuild"):
+        conn.execute('DELETE FROM "product_search"')
+        conn.execute('DELETE FROM "product_search_rows"')
+        conn.execute('INSERT INTO "product_search_rows" ("productId") SELECT "id" FROM "products" ORDER BY "id"')
+        # 태그 텍스트는 상품별로 한 번에 묶어 조인 (행마다 하위 쿼리를 돌리지 않도록)
+        conn.execute("""
+            INSERT INTO "product_search" (rowid, title, description, tags, category)
+            SELECT r."id", p."title", p."description", t."names", c."name"
+            FROM "products" p
+            JOIN "product_search_rows" r ON r."productId" = p."id"
+            LEFT JOIN "categories" c ON c."id" = p."categoryId"
+            LEFT JOIN (
+                SELECT pt."productId", group_concat(t."name", ' ') AS "names"
+                FROM "product_tags" pt JOIN "tags" t ON t."id" = pt."tagId"
+                GROUP BY pt."productId"
+            ) t ON t."productId" = p."id"
+        """)
+    with stage("optimize"):
+        conn.execute('INSERT INTO "product_search" ("product_search") VALUES (\'optimize\')')
+        # 통계가 없으면 플래너가 status 인덱스(값 두 개)를 선택적이라 보고 검색 결과 대신 전체 상품을 훑는다
+        conn.execute('ANALYZE "products"')
+        conn.commit()
+    return conn.execute('SELECT COUNT(*) FROM "product_search_rows"').fetchone()[0]
+
+
+def match_phrase(text):
+    """검색어 -> FTS5 MATCH 구문 (검색어 전체를 한 구절로, 예전 LIKE '%검색어%'와 같은 의미)"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+# 검색어로 찾은 상품 (productId, rank) - 긴 검색어는 색인 MATCH, 짧은 검색어는 색인 테이블 LIKE
+MATCH_QUERY = """
+    SELECT r."productId", s.rank FROM "product_search" s
+    JOIN "product_search_rows" r ON r."id" = s.rowid
+    WHERE s."product_search" MATCH ?
+"""
+LIKE_QUERY = """
+    SELECT r."productId", NULL AS rank FROM "product_search" s
+    JOIN "product_search_rows" r ON r."id" = s.rowid
+    WHERE s.title LIKE ? OR s.description LIKE ? OR s.tags LIKE ? OR s.category LIKE ?
+"""
+
+
+def search_query(text):
+    """검색어 -> (productId, rank)를 돌려주는 SQL과 파라미터"""
+    text = text.strip()
+    if len(text) >= MIN_MATCH_LENGTH:
+        return MATCH_QUERY, [match_phrase(text)]
+    return LIKE_QUERY, [f"%{text}%"] * 4
+
+
+def search(conn, text, limit=None):
+    """[(상품 ID, 순위)] 순위순 - 짧은 검색어는 순위 없음 (None)"""
+    sql, params = search_query(text)
+    sql += " ORDER BY rank"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 검색 색인 (FTS5) 생성/다시 만들기")
+    parser.add_argument("--query", default=None, help="다시 만들지 않고 검색만 해 보기")
+    parser.add_argument("--limit", type=int, default=20, help="--query 결과 수")
+    add_arguments(parser)
+    args = parser.parse_args()
+    enable_trace(bool(args.trace))
+
+    conn = sqlite3.connect(str(DB_PATH))
+    try:
+        if args.query:
+            started = time.perf_counter()
+            results = search(conn, args.query, args.limit)
+            elapsed = (time.perf_counter() - started) * 1000
+            titles = dict(conn.execute(
+                f'SELECT "id", "title" FROM "products" WHERE "id" IN ({", ".join("?" for _ in results)})',
+                [product_id for product_id, _ in results],
+            ))
+            for product_id, rank in results:
+                print(f"  {'-' if rank is None else f'{rank:8.3f}'}  {titles.get(product_id)}")
+            print(f"\n{len(results)}개, {elapsed:.1f}ms")
+            return
+
+        print("=" * 60)
+        print("상품 검색 색인 다시 만들기")
+        print("=" * 60)
+        apply_pragmas(conn)
+        started = time.perf_counter()
+        count = rebuild(conn)
+        print(f"\n상품 {count}개 색인, {time.perf_counter() - started:.2f}초")
+    finally:
+        conn.close()
+        write_run("search_index", args.metrics, args.trace)
+
+
+if __name__ == "__main__":
+    main()
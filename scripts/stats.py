@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+카탈로그 통계 (대시보드용 JSON)
+상품/이미지 커버리지/카테고리/뮤지컬/자산/렌탈 상태를 인덱스를 타는 집계 쿼리 몇 개로 계산
+(check_db.py, check_users.py, scripts/check_db.py, fix_image_urls2.py를 대신함)
+
+  python scripts/stats.py                 # 표준 출력으로 JSON
+  python scripts/stats.py -o stats.json   # 파일로 저장
+"""
+
+import sys
+import json
+import time
+import argparse
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from ingest_config import DB_PATH, PRODUCT_IMAGE_PDFS
+
+# 상품의 뮤지컬: production 컬럼, 비어 있으면 시드 자연 키(뮤지컬|PDF|페이지|순번)의 앞부분,
+# 키도 없으면 제목의 첫 대괄호 태그
+KEY_MUSICAL = """substr("sourceKey", 1, instr("sourceKey", '|') - 1)"""
+TAG_MUSICAL = """CASE WHEN "title" LIKE '[%]%' THEN substr("title", 2, instr("title", ']') - 2) END"""
+
+# 이미지 컬럼 값 형식 (image_urls.parse_images와 같은 구분, 값을 해석하지 않고 첫 글자로)
+IMAGE_FORMAT_EXPR = """
+    CASE
+        WHEN "images" IS NULL OR "images" IN ('', 'null', '[]') THEN 'none'
+        WHEN "images" LIKE '["[%' THEN 'json-nested'
+        WHEN "images" LIKE '[%' THEN 'json'
+        WHEN "images" LIKE '"%' THEN 'json2'
+        ELSE 'csv'
+    END
+"""
+
+HAS_DETAIL_EXPR = """("detailImages" IS NOT NULL AND "detailImages" NOT IN ('', 'null', '[]'))"""
+
+# 제목 태그 -> 뮤지컬 이름 (예: "에드거 앨런 포" -> "에드거앨런포")
+MUSICAL_TAGS = {entry["tag"][1:-1]: entry["musical"] for entry in PRODUCT_IMAGE_PDFS}
+
+# 반납 기한이 지났는데 아직 대여 중인 렌탈
+OVERDUE_STATUSES = ("rented",)
+
+# 종결된 파손/분실 이슈
+CLOSED_ISSUE_STATUSES = ("resolved", "paid")
+
+
+def table_columns(conn, table):
+    """테이블의 컬럼 이름 집합 (테이블이 없으면 빈 집합)"""
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def tally(rows):
+    """(키, 개수) 행 -> 개수 내림차순 dict"""
+    counts = {}
+    for key, count in rows:
+        key = "(없음)" if key is None else key
+        counts[key] = counts.get(key, 0) + count
+    return dict(sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0]))))
+
+
+def product_stats(conn):
+    """상태/카테고리/뮤지컬/이미지 형식별 상품 수
+
+    차원마다 따로 묶되 status, categoryId, production, sourceKey는 인덱스만 훑어 집계하고
+    행 전체를 읽는 것은 이미지 컬럼 집계 한 번뿐이다.
+    """
+    columns = table_columns(conn, "products")
+    if not columns:
+        return None
+
+    by_status = conn.execute('SELECT "status", COUNT(*) FROM "products" GROUP BY 1').fetchall()
+    by_category = conn.execute('SELECT "categoryId", COUNT(*) FROM "products" GROUP BY 1').fetchall()
+    names = dict(conn.execute('SELECT "id", "name" FROM "categories"')) if table_columns(conn, "categories") else {}
+
+    # production이 없는 행만 sourceKey/제목 태그로 (컬럼이 생기기 전 DB는 전부)
+    produced = []
+    pending = []
+    if "production" in columns:
+        produced = conn.execute(
+            'SELECT "production", COUNT(*) FROM "products" WHERE "production" IS NOT NULL GROUP BY 1'
+        ).fetchall()
+        pending.append('"production" IS NULL')
+    keyed = []
+    if "sourceKey" in columns:
+        keyed_where = " AND ".join(pending + ['"sourceKey" IS NOT NULL'])
+        keyed = conn.execute(
+            f'SELECT {KEY_MUSICAL}, COUNT(*) FROM "products" WHERE {keyed_where} GROUP BY 1'
+        ).fetchall()
+        pending.append('"sourceKey" IS NULL')
+    tagged_where = f'WHERE {" AND ".join(pending)}' if pending else ""
+    tagged = conn.execute(f'SELECT {TAG_MUSICAL}, COUNT(*) FROM "products" {tagged_where} GROUP BY 1').fetchall()
+
+    formats = conn.execute(
+        f'SELECT {IMAGE_FORMAT_EXPR}, COUNT(*), SUM({HAS_DETAIL_EXPR}) FROM "products" GROUP BY 1'
+    ).fetchall()
+    last_created = conn.execute('SELECT MAX("createdAt") FROM "products"').fetchone()[0]
+
+    total = sum(count for _, count in by_status)
+    with_images = sum(count for fmt, count, _ in formats if fmt != "none")
+    return {
+        "total": total,
+        "lastCreatedAt": last_created,
+        "byStatus": tally(by_status),
+        "byCategory": tally((names.get(cat_id, cat_id), count) for cat_id, count in by_category),
+        "byMusical": tally(
+            (MUSICAL_TAGS.get(musical, musical) if musical else "기타", count)
+            for musical, count in produced + keyed + tagged
+        ),
+        "seeded": sum(count for _, count in keyed),
+        "images": {
+            "withImages": with_images,
+            "withoutImages": total - with_images,
+            "withDetailImages": sum(detail or 0 for _, _, detail in formats),
+            "coverage": round(with_images / total, 4) if total else None,
+            "byFormat": tally((fmt, count) for fmt, count, _ in formats if fmt != "none"),
+        },
+    }
+
+
+def image_stats(conn):
+    """이미지 메타데이터/변형이 준비된 원본 수"""
+    result = {}
+    if table_columns(conn, "image_metadata"):
+        result["described"] = conn.execute('SELECT COUNT(*) FROM "image_metadata"').fetchone()[0]
+    if table_columns(conn, "image_variants"):
+        sources, variants = conn.execute(
+            'SELECT COUNT(DISTINCT "sourcePath"), COUNT(*) FROM "image_variants"'
+        ).fetchone()
+        result["variantSources"] = sources
+        result["variants"] = variants
+    return result
+
+
+def asset_stats(conn):
+    """자산 상태/등급별 개수와 자산이 있는 상품 수"""
+    if not table_columns(conn, "assets"):
+        return None
+    rows = conn.execute(
+        'SELECT "status", "conditionGrade", COUNT(*) FROM "assets" GROUP BY 1, 2'
+    ).fetchall()
+    return {
+        "total": sum(r[2] for r in rows),
+        "byStatus": tally((r[0], r[2]) for r in rows),
+        "byGrade": tally((r[1], r[2]) for r in rows),
+        "products": conn.execute('SELECT COUNT(DISTINCT "productId") FROM "assets"').fetchone()[0],
+    }
+
+
+def rental_stats(conn):
+    """렌탈 상태별 개수, 연체, 미해결 이슈"""
+    if not table_columns(conn, "rentals"):
+        return None
+    overdue = ", ".join(f"'{s}'" for s in OVERDUE_STATUSES)
+    rows = conn.execute(f"""
+        SELECT "status", COUNT(*), SUM("status" IN ({overdue}) AND "endDate" < date('now'))
+        FROM "rentals"
+        GROUP BY 1
+    """).fetchall()
+    result = {
+        "total": sum(r[1] for r in rows),
+        "byStatus": tally((r[0], r[1]) for r in rows),
+        "overdue": sum(r[2] or 0 for r in rows),
+    }
+    if table_columns(conn, "rental_issues"):
+        closed = ", ".join(f"'{s}'" for s in CLOSED_ISSUE_STATUSES)
+        rows = conn.execute(f"""
+            SELECT "type", COUNT(*), SUM("status" NOT IN ({closed})) FROM "rental_issues" GROUP BY 1
+        """).fetchall()
+        result["issues"] = {
+            "total": sum(r[1] for r in rows),
+            "open": sum(r[2] or 0 for r in rows),
+            "byType": tally((r[0], r[1]) for r in rows),
+        }
+    return result
+
+
+def user_stats(conn):
+    """사용자 역할/상태별 개수"""
+    if not table_columns(conn, "users"):
+        return None
+    rows = conn.execute('SELECT "role", "status", COUNT(*) FROM "users" GROUP BY 1, 2').fetchall()
+    return {
+        "total": sum(r[2] for r in rows),
+        "byRole": tally((r[0], r[2]) for r in rows),
+        "byStatus": tally((r[1], r[2]) for r in rows),
+    }
+
+
+def collect_stats(conn):
+    """전체 통계 dict"""
+    started = time.perf_counter()
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+    result = {
+        "generatedAt": datetime.now().isoformat(timespec="seconds"),
+        "tables": tables,
+        "products": product_stats(conn),
+        "images": image_stats(conn),
+        "assets": asset_stats(conn),
+        "rentals": rental_stats(conn),
+        "users": user_stats(conn),
+    }
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카탈로그 통계 (JSON)")
+    parser.add_argument("--db", default=str(DB_PATH), help="SQLite DB 경로")
+    parser.add_argument("-o", "--output", default=None, help="저장할 JSON 경로 (기본: 표준 출력)")
+    parser.add_argument("--compact", action="store_true", help="들여쓰기 없이 한 줄로")
+    args = parser.parse_args()
+
+    # 읽기 전용으로 열어 서비스 중인 DB에 잠금을 걸지 않는다
+    conn = sqlite3.connect(Path(args.db).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        stats = collect_stats(conn)
+    finally:
+        conn.close()
+
+    text = json.dumps(stats, ensure_ascii=False, indent=None if args.compact else 2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
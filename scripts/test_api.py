@@ -27,6 +27,7 @@ print(f"\n이미지 있는 상품: {count}개")
 
 # 새로 추가된 상품 (바람사, 나폴레옹 등)
 print("\n새로 추가된 뮤지컬 상품 검색:")
-for musical in ['바람사', '나폴레옹', '오캐롤', '에드거']:
-    found = [p for p in data if musical in p.get('title', '')]
+for musical in ['바람사', '나폴레옹', '오캐롤', '에드거앨런포']:
+    # production 컬럼 인덱스로 작품별 조회 (제목 부분 문자열 비교 대신)
+    found = requests.get("http://localhost:3001/api/products/search", params={"production": musical}).json()
     print(f"  {musical}: {len(found)}개")
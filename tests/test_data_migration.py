@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+import sys
+import sqlite3
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from data_migration import run_migration
+
+
+def test_dry_run_leaves_schema_unchanged():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE "products" ("id" varchar PRIMARY KEY, "title" varchar, "description" text)')
+    conn.execute("""INSERT INTO "products" VALUES ('1', '[레미제] 장발장 - 죄수복', '뮤지컬 ''레미제라블''의 장발장 캐릭터 의상입니다.')""")
+    conn.commit()
+    before = conn.execute('PRAGMA table_info("products")').fetchall()
+    indexes = conn.execute('PRAGMA index_list("products")').fetchall()
+
+    result = run_migration(conn, "product-attributes", workers=0, dry_run=True)
+
+    assert result["scanned"] == 1
+    assert conn.execute('PRAGMA table_info("products")').fetchall() == before
+    assert conn.execute('PRAGMA index_list("products")').fetchall() == indexes
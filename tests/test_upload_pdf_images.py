@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from upload_pdf_images import match_by_caption
+
+
+def caption(character, scene=None, costume=None):
+    return {"character": character, "scene": scene, "costume": costume}
+
+
+def test_match_by_caption_uses_each_image_once():
+    # 두 상품 제목이 모두 같은 이미지 캡션에 가장 가깝다
+    products = [
+        {"id": 1, "title": "레미제라블 - 장발장 죄수복"},
+        {"id": 2, "title": "레미제라블 - 장발장 시장 정장"},
+    ]
+    records = [
+        {"filename": "a.png", "caption": caption("장발장")},
+        {"filename": "b.png", "caption": caption("자베르")},
+        {"filename": None, "caption": None},
+    ]
+
+    matches = {product["id"]: record["filename"] for product, record in match_by_caption(products, records)}
+
+    assert matches == {1: "a.png", 2: "b.png"}
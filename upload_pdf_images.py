@@ -1,270 +1,117 @@
 # -*- coding: utf-8 -*-
-import fitz
 import os
-import json
-import requests
-import shutil
-import sqlite3
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+
+from ingest_config import DB_PATH, UPLOAD_DIR, UPLOAD_URL, PRODUCT_IMAGE_PDFS, find_source_pdf
+from pdf_ingest import make_job, ingest
+from db_session import open_session, close_session, queue, flush, product_index
+from image_urls import format_images
+from product_images import sync_product_images
+from image_metadata import save_metadata
+from ingest_metrics import write_run
+
 # 설정
 BACKEND_URL = "http://localhost:3001/api"
-UPLOAD_DIR = "c:/Users/parkm/stage-equipment-rental/backend/uploads"
-DB_PATH = "c:/Users/parkm/stage-equipment-rental/backend/stage_rental.db"
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-def get_products_from_db():
-    """DB에서 직접 상품 조회"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, title, images FROM products WHERE status = 'active'")
-    products = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return products
+def get_products_from_db(session):
+    """DB에서 활성 상품을 한 번 읽어 제목 태그별 색인으로"""
+    return product_index(session)
 
-def update_product_images(product_id, image_urls):
-    """DB에서 직접 상품 이미지 업데이트"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+def update_product_images(session, product_id, image_urls):
+    """상품 이미지 업데이트 (simple-array 형식, 세션에 쌓았다가 묶어서 커밋)"""
+    queue(
+        session,
         "UPDATE products SET images = ? WHERE id = ?",
-        (json.dumps(image_urls), product_id)
+        (format_images(image_urls), product_id)
     )
-    conn.commit()
-    conn.close()
-
-def extract_and_save_image(doc, page_num, img_idx, xref, product_id):
-    """이미지 추출 및 저장"""
-    try:
-        base_image = doc.extract_image(xref)
-        image_bytes = base_image["image"]
-        image_ext = base_image["ext"]
-
-        # 이미지 크기 체크 (너무 작은 이미지 제외)
-        if len(image_bytes) < 5000:  # 5KB 미만은 아이콘 등으로 간주
-            return None
-
-        filename = f"product_{product_id}_p{page_num}_i{img_idx}.{image_ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-
-        with open(filepath, "wb") as f:
-            f.write(image_bytes)
-
-        return f"http://localhost:3001/uploads/{filename}"
-    except Exception as e:
-        print(f"  이미지 추출 실패: {e}")
-        return None
-
-def process_baramsa_pdf():
-    """바람사 PDF 처리"""
-    pdf_path = "c:/Users/parkm/stage-equipment-rental/source/바람사 의상파트 바이블/바람사 장면별 PHOTO LIST - FE (1).pdf"
-
-    products = get_products_from_db()
-    baramsa_products = [p for p in products if '[바람사]' in p['title']]
-    print(f"바람사 상품: {len(baramsa_products)}개")
-
-    doc = fitz.open(pdf_path)
-    print(f"PDF 페이지: {len(doc)}")
-
-    updated_count = 0
-    product_idx = 0
-
-    for page_num in range(len(doc)):
-        if product_idx >= len(baramsa_products):
-            break
-
-        page = doc[page_num]
-        images = page.get_images()
-
-        for img_idx, img in enumerate(images):
-            if product_idx >= len(baramsa_products):
-                break
-
-            product = baramsa_products[product_idx]
-
-            # 이미 이미지가 있으면 스킵
-            if product['images'] and product['images'] != 'null':
-                product_idx += 1
-                continue
-
-            xref = img[0]
-            image_url = extract_and_save_image(doc, page_num + 1, img_idx + 1, xref, product['id'])
-
-            if image_url:
-                update_product_images(product['id'], [image_url])
-                print(f"  {product['title'][:30]}... -> 이미지 업로드 완료")
-                updated_count += 1
-
-            product_idx += 1
-
-    doc.close()
-    return updated_count
-
-def process_ocarol_pdf():
-    """오캐롤 PDF 처리"""
-    pdf_path = "c:/Users/parkm/stage-equipment-rental/source/5.2017 오!캐롤 -배우별 의상바이블.pdf"
-
-    products = get_products_from_db()
-    ocarol_products = [p for p in products if '[오캐롤]' in p['title']]
-    print(f"오캐롤 상품: {len(ocarol_products)}개")
-
-    if not os.path.exists(pdf_path):
-        print(f"PDF 파일 없음: {pdf_path}")
-        return 0
-
-    doc = fitz.open(pdf_path)
-    print(f"PDF 페이지: {len(doc)}")
-
-    updated_count = 0
-    product_idx = 0
-
-    for page_num in range(len(doc)):
-        if product_idx >= len(ocarol_products):
-            break
 
-        page = doc[page_num]
-        images = page.get_images()
-
-        for img_idx, img in enumerate(images):
-            if product_idx >= len(ocarol_products):
-                break
-
-            product = ocarol_products[product_idx]
-
-            if product['images'] and product['images'] != 'null':
-                product_idx += 1
-                continue
-
-            xref = img[0]
-            image_url = extract_and_save_image(doc, page_num + 1, img_idx + 1, xref, product['id'])
-
-            if image_url:
-                update_product_images(product['id'], [image_url])
-                print(f"  {product['title'][:30]}... -> 이미지 업로드 완료")
-                updated_count += 1
-
-            product_idx += 1
-
-    doc.close()
-    return updated_count
-
-def process_napoleon_pdf():
-    """나폴레옹 PDF 처리"""
-    pdf_path = "c:/Users/parkm/stage-equipment-rental/source/2017 나폴레옹 캐릭터별 사진 리스트.pdf"
-
-    products = get_products_from_db()
-    napoleon_products = [p for p in products if '[나폴레옹]' in p['title']]
-    print(f"나폴레옹 상품: {len(napoleon_products)}개")
-
-    if not os.path.exists(pdf_path):
-        print(f"PDF 파일 없음: {pdf_path}")
-        return 0
-
-    doc = fitz.open(pdf_path)
-    print(f"PDF 페이지: {len(doc)}")
-
-    updated_count = 0
-    product_idx = 0
-
-    for page_num in range(len(doc)):
-        if product_idx >= len(napoleon_products):
-            break
-
-        page = doc[page_num]
-        images = page.get_images()
-
-        for img_idx, img in enumerate(images):
-            if product_idx >= len(napoleon_products):
-                break
-
-            product = napoleon_products[product_idx]
-
-            if product['images'] and product['images'] != 'null':
-                product_idx += 1
-                continue
-
-            xref = img[0]
-            image_url = extract_and_save_image(doc, page_num + 1, img_idx + 1, xref, product['id'])
-
-            if image_url:
-                update_product_images(product['id'], [image_url])
-                print(f"  {product['title'][:30]}... -> 이미지 업로드 완료")
-                updated_count += 1
-
-            product_idx += 1
-
-    doc.close()
-    return updated_count
-
-def process_poe_pdf():
-    """에드거 앨런 포 PDF 처리"""
-    pdf_path = "c:/Users/parkm/stage-equipment-rental/source/2016 사람별의상바이블.pdf"
-
-    products = get_products_from_db()
-    poe_products = [p for p in products if '[에드거 앨런 포]' in p['title']]
-    print(f"에드거 앨런 포 상품: {len(poe_products)}개")
-
-    if not os.path.exists(pdf_path):
-        print(f"PDF 파일 없음: {pdf_path}")
+def caption_score(title, caption):
+    """상품 제목에 캡션의 캐릭터/장면/의상이 얼마나 들어 있는지"""
+    if not caption:
         return 0
+    return sum(len(caption[key]) for key in ("character", "scene", "costume") if caption[key] and caption[key] in title)
 
-    doc = fitz.open(pdf_path)
-    print(f"PDF 페이지: {len(doc)}")
+def match_by_caption(products, records):
+    """캡션이 제목과 가장 잘 맞는 이미지를 상품에 매칭, 남은 상품은 순서대로 매칭"""
+    candidates = [r for r in records if r["filename"]]
+    matches = {}
+    used = set()
 
-    updated_count = 0
-    product_idx = 0
+    for product in products:
+        free = [r for r in candidates if id(r) not in used]
+        best = max(free, key=lambda r: caption_score(product['title'], r.get("caption")), default=None)
+        if best and caption_score(product['title'], best.get("caption")) > 0:
+            matches[product['id']] = best
+            used.add(id(best))
 
-    for page_num in range(len(doc)):
-        if product_idx >= len(poe_products):
-            break
+    # 한 이미지는 한 상품에만 - 남은 상품은 아직 안 쓴 이미지로
+    remaining = [r for r in candidates if id(r) not in used]
+    unmatched = [p for p in products if p['id'] not in matches]
+    for product, record in zip(unmatched, remaining):
+        matches[product['id']] = record
 
-        page = doc[page_num]
-        images = page.get_images()
+    return [(product, matches[product['id']]) for product in products if product['id'] in matches]
 
-        for img_idx, img in enumerate(images):
-            if product_idx >= len(poe_products):
-                break
+def process_pdf(session, entry, records, products):
+    """PDF 추출 결과를 해당 뮤지컬 상품에 매칭 (캡션 우선, 없으면 순서대로) - 갱신한 상품 ID 리스트"""
+    musical_products = products.get(entry["tag"], [])
+    print(f"{entry['musical']} 상품: {len(musical_products)}개")
 
-            product = poe_products[product_idx]
+    updated = []
 
-            if product['images'] and product['images'] != 'null':
-                product_idx += 1
-                continue
+    for product, record in match_by_caption(musical_products, records):
+        # 이미 이미지가 있으면 스킵
+        if product['images'] and product['images'] != 'null':
+            continue
 
-            xref = img[0]
-            image_url = extract_and_save_image(doc, page_num + 1, img_idx + 1, xref, product['id'])
+        # 필터에 걸렸거나 추출 실패한 이미지는 건너뜀
+        if not record["filename"]:
+            continue
 
-            if image_url:
-                update_product_images(product['id'], [image_url])
-                print(f"  {product['title'][:30]}... -> 이미지 업로드 완료")
-                updated_count += 1
+        image_url = f"{UPLOAD_URL}/{record['filename']}"
+        update_product_images(session, product['id'], [image_url])
+        print(f"  {product['title'][:30]}... -> 이미지 업로드 완료")
+        updated.append(product['id'])
 
-            product_idx += 1
-
-    doc.close()
-    return updated_count
+    return updated
 
 if __name__ == "__main__":
     print("=" * 50)
     print("PDF 이미지 추출 및 상품 업로드")
     print("=" * 50)
 
-    total = 0
+    # 모든 PDF를 페이지 샤드 단위로 병렬 추출 (이미지 옆 캡션 포함)
+    jobs = {}
+    for entry in PRODUCT_IMAGE_PDFS:
+        jobs[entry["tag"]] = make_job(entry["musical"], find_source_pdf(entry["pdf"]))
+    extracted = ingest(list(jobs.values()), UPLOAD_DIR, layout=True)
 
-    print("\n[1] 바람사 처리 중...")
-    total += process_baramsa_pdf()
+    session = open_session(DB_PATH)
+    updated = []
 
-    print("\n[2] 오캐롤 처리 중...")
-    total += process_ocarol_pdf()
+    try:
+        save_metadata(session["conn"], [r for records in extracted.values() for r in records])
+        session["conn"].commit()
+        products = get_products_from_db(session)
 
-    print("\n[3] 나폴레옹 처리 중...")
-    total += process_napoleon_pdf()
+        for i, entry in enumerate(PRODUCT_IMAGE_PDFS, 1):
+            print(f"\n[{i}] {entry['musical']} 처리 중...")
+            updated += process_pdf(session, entry, extracted[jobs[entry["tag"]]["path"]], products)
 
-    print("\n[4] 에드거 앨런 포 처리 중...")
-    total += process_poe_pdf()
+        # 목록 조회용 대표 이미지(product_images)도 함께
+        flush(session)
+        sync_product_images(session["conn"], updated)
+        session["conn"].commit()
+    finally:
+        close_session(session)
 
     print("\n" + "=" * 50)
-    print(f"총 {total}개 상품에 이미지 업로드 완료!")
+    print(f"총 {len(updated)}개 상품에 이미지 업로드 완료!")
     print("=" * 50)
+
+    write_run("upload_pdf_images")